@@ -18,6 +18,7 @@ import urllib3
 from pathlib import Path
 import sys
 import threading
+import asyncio
 import concurrent.futures
 
 # 导入日志器
@@ -31,6 +32,24 @@ except ImportError as e:
     logger.warning(f"[Autocomplete] 无法导入数据库管理器，将仅使用远程API模式: {e}")
     get_db_manager = None
 
+# 导入轻量标签记录（直接序列化为响应JSON）
+from ..shared.db.tag_record import dump_autocomplete, dump_search_results
+# 导入补全响应缓存（按数据库版本号失效）
+from ..shared.cache.response_cache import get_response_cache
+# 导入通用 LRU+TTL 缓存
+from ..shared.cache.lru_cache import LRUCache, get_all_cache_stats
+# 导入标签共现索引（从已加载帖子学习相关标签）
+from ..shared.db.cooccurrence import get_cooccurrence_collector, flush_cooccurrence, rank_related_tags
+# 导入内存统计（各子系统实际占用）
+from ..utils.memory_stats import deep_sizeof, register_memory_source, collect_memory_stats, tracemalloc_control
+# 导入前台优先门（交互请求期间后台同步暂停）
+from ..utils.priority_gate import foreground_request
+
+# 导入多模式短语自动机（整句中文提示词转换）
+from ..shared.translation.phrase_automaton import PhraseAutomaton, find_unmatched_cjk, contains_cjk
+# 导入拼音索引工具（拼音/首字母补全）
+from ..shared.translation.pinyin_index import HAS_PYPINYIN, is_pinyin_query, normalize_pinyin_key
+
 # 禁用 SSL 警告（如果需要禁用证书验证）
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -69,6 +88,18 @@ def clean_expired_cache():
 clean_thread = threading.Thread(target=clean_expired_cache, daemon=True)
 clean_thread.start()
 
+
+def _image_cache_memory_stats():
+    """内存统计：异步加载任务中的图像张量"""
+    with cache_lock:
+        tensors = [img["tensor"] for task in image_cache.values()
+                   for img in task.get("images", []) if img.get("tensor") is not None]
+        task_count = len(image_cache)
+    return {'bytes': deep_sizeof(tensors), 'tasks': task_count, 'images': len(tensors)}
+
+
+register_memory_source("gallery_image_cache", _image_cache_memory_stats)
+
 # ================================
 # 原始设置加载/保存函数（保持不变）
 # ================================
@@ -229,6 +260,10 @@ def save_ui_settings(ui_settings):
 # ================================
 # Tag翻译系统（保持不变）
 # ================================
+# 缓存未命中哨兵（缓存值本身可能为None）
+_CACHE_MISS = object()
+
+
 class TagTranslationSystem:
     """Tag翻译系统，负责加载、处理和查询汉化数据"""
     
@@ -237,9 +272,11 @@ class TagTranslationSystem:
         self.cn_to_en = {}  # 中文->英文映射
         self.cn_search_index = {}  # 中文搜索索引
         self.loaded = False
-        self._translation_cache = {}  # 翻译缓存
-        self._search_cache = {}  # 搜索缓存
         self.max_cache_size = 1000  # 最大缓存条目数
+        self._translation_cache = LRUCache("tag_translations", max_entries=self.max_cache_size)  # 翻译缓存
+        self._search_cache = LRUCache("chinese_tag_search", max_entries=self.max_cache_size)  # 搜索缓存
+        self._prompt_automaton = None  # 整句转换自动机（预加载时构建）
+        self._automaton_lock = threading.Lock()
         
     def load_translation_data(self):
         """加载所有汉化数据文件"""
@@ -363,12 +400,13 @@ class TagTranslationSystem:
             self.load_translation_data()
         
         tag_key = en_tag.strip()
-        if tag_key in self._translation_cache:
-            return self._translation_cache[tag_key]
+        # 未翻译的tag也会缓存（值为None），用哨兵区分未命中
+        translation = self._translation_cache.get(tag_key, _CACHE_MISS)
+        if translation is not _CACHE_MISS:
+            return translation
         
         translation = self.en_to_cn.get(tag_key)
-        if len(self._translation_cache) < self.max_cache_size:
-            self._translation_cache[tag_key] = translation
+        self._translation_cache.put(tag_key, translation)
         
         return translation
     
@@ -394,8 +432,9 @@ class TagTranslationSystem:
             return []
         
         cache_key = f"{query}:{limit}"
-        if cache_key in self._search_cache:
-            return self._search_cache[cache_key]
+        cached_results = self._search_cache.get(cache_key)
+        if cached_results is not None:
+            return cached_results
         
         matches = {}
         
@@ -446,13 +485,61 @@ class TagTranslationSystem:
                     'weight': weight
                 })
         
-        if len(self._search_cache) < self.max_cache_size:
-            self._search_cache[cache_key] = results
+        self._search_cache.put(cache_key, results)
         
         return results
 
+    def get_memory_stats(self):
+        """内存统计：翻译映射、中文搜索索引和整句转换自动机（共享字符串只计一次）"""
+        seen = set()
+        mappings = deep_sizeof(self.en_to_cn, seen=seen) + deep_sizeof(self.cn_to_en, seen=seen)
+        search_index = deep_sizeof(self.cn_search_index, seen=seen)
+        automaton = deep_sizeof(self._prompt_automaton, seen=seen) if self._prompt_automaton else 0
+        return {
+            'bytes': mappings + search_index + automaton,
+            'mappings': mappings,
+            'search_index': search_index,
+            'prompt_automaton': automaton,
+        }
+
+    @property
+    def prompt_automaton_ready(self):
+        """整句转换自动机是否已构建"""
+        return self._prompt_automaton is not None
+
+    def _get_prompt_automaton(self):
+        """获取整句转换自动机，基于全部cn_to_en键只构建一次"""
+        if self._prompt_automaton is None:
+            with self._automaton_lock:
+                if self._prompt_automaton is None:
+                    start_time = time.time()
+                    self._prompt_automaton = PhraseAutomaton(self.cn_to_en)
+                    logger.info(f"[翻译系统] 提示词转换自动机构建完成: "
+                                f"{self._prompt_automaton.phrase_count} 个短语, "
+                                f"耗时 {time.time() - start_time:.2f}s")
+        return self._prompt_automaton
+
+    def translate_prompt(self, prompt, underscore_to_space=False):
+        """将中英混合的提示词中所有可识别的中文短语一次性转换为Danbooru标签（最长匹配）"""
+        if not self.loaded:
+            self.load_translation_data()
+
+        automaton = self._get_prompt_automaton()
+        transform = (lambda tag: tag.replace('_', ' ')) if underscore_to_space else None
+        translated, matches = automaton.replace(prompt, transform=transform)
+
+        return {
+            'translated': translated,
+            'matches': [
+                {'chinese': phrase, 'english': tag, 'start': start, 'end': end}
+                for start, end, phrase, tag in matches
+            ],
+            'unmatched': find_unmatched_cjk(prompt, matches)
+        }
+
 # 全局翻译系统实例
 translation_system = TagTranslationSystem()
+register_memory_source("translation_system", translation_system.get_memory_stats)
 
 # 预加载翻译数据
 def preload_translation_data():
@@ -461,6 +548,9 @@ def preload_translation_data():
         success = translation_system.load_translation_data()
         if not success:
             logger.warning("[翻译系统] 预加载失败")
+            return
+        # 整句转换自动机也在启动时构建，首个请求不在事件循环中构建
+        translation_system._get_prompt_automaton()
     except Exception as e:
         logger.error(f"[翻译系统] 预加载异常: {e}")
 
@@ -716,7 +806,24 @@ async def verify_auth(request):
         logger.error(f"验证认证接口错误: {e}")
         return web.json_response({"success": False, "error": "网络错误", "network_error": True}, status=500)
 
+# 缓冲多少页帖子后自动刷新共现索引
+COOCCURRENCE_FLUSH_THRESHOLD = 10
+# 英文前缀结果少于此数量时才用拼音索引补充（英文结果充足时不额外查询）
+PINYIN_FALLBACK_MAX_RESULTS = 3
+_cooccurrence_flush_task = None
+
+
+async def _flush_cooccurrence_safe() -> int:
+    """刷新共现索引，失败只记录日志"""
+    try:
+        return await flush_cooccurrence(get_db_manager())
+    except Exception as e:
+        logger.warning(f"[RelatedTags] 更新共现索引失败: {e}")
+        return 0
+
+
 @PromptServer.instance.routes.get("/danbooru_gallery/posts")
+@foreground_request("posts")
 async def get_posts_for_front(request):
     query = request.query
     tags = query.get("search[tags]", "")
@@ -729,6 +836,13 @@ async def get_posts_for_front(request):
         posts_list = json.loads(posts_json_str)
     except json.JSONDecodeError:
         posts_list = []
+
+    # 累积足够帖子后在后台更新共现索引
+    global _cooccurrence_flush_task
+    if (get_db_manager and get_cooccurrence_collector().pending >= COOCCURRENCE_FLUSH_THRESHOLD
+            and (_cooccurrence_flush_task is None or _cooccurrence_flush_task.done())):
+        _cooccurrence_flush_task = asyncio.create_task(_flush_cooccurrence_safe())
+
     return web.json_response(posts_list, headers={
         "Cache-Control": "no-cache, no-store, must-revalidate",
         "Pragma": "no-cache",
@@ -736,6 +850,7 @@ async def get_posts_for_front(request):
     })
 
 @PromptServer.instance.routes.get("/danbooru_gallery/autocomplete")
+@foreground_request("autocomplete")
 async def get_autocomplete(request):
     """三层查询机制：数据库 → API → 空结果"""
     try:
@@ -749,21 +864,20 @@ async def get_autocomplete(request):
         if get_db_manager and config['cache'].get('use_database_query', True):
             try:
                 db = get_db_manager()
+                # 命中缓存直接返回已序列化的响应（同步完成后版本号变化自动失效）
+                response_cache = get_response_cache()
+                cache_key = ("autocomplete", query, limit)
+                generation = db.generation
+                cached_body = response_cache.get(cache_key, generation)
+                if cached_body is not None:
+                    return web.Response(body=cached_body, content_type='application/json')
                 db_results = await db.search_tags_by_prefix(query, limit)
                 if db_results:
-                    # 数据库有结果，转换格式并返回
-                    formatted_results = [
-                        {
-                            'name': tag['tag'],
-                            'category': tag['category'],
-                            'post_count': tag['post_count'],
-                            'translation': tag.get('translation_cn'),
-                            'aliases': tag.get('aliases', [])
-                        }
-                        for tag in db_results
-                    ]
-                    logger.debug(f"[Autocomplete] 数据库查询成功: '{query}' -> {len(formatted_results)}条结果")
-                    return web.json_response(formatted_results)
+                    # 数据库有结果，直接序列化为响应格式（不构造中间dict）
+                    logger.debug(f"[Autocomplete] 数据库查询成功: '{query}' -> {len(db_results)}条结果")
+                    body = dump_autocomplete(db_results).encode('utf-8')
+                    response_cache.put(cache_key, generation, body)
+                    return web.Response(body=body, content_type='application/json')
                 else:
                     logger.debug(f"[Autocomplete] 数据库无结果: '{query}'")
             except Exception as e:
@@ -917,7 +1031,37 @@ async def translate_tags_batch_route(request):
         logger.error(f"批量翻译tags接口错误: {e}")
         return web.json_response({"success": False, "error": str(e)})
 
+@PromptServer.instance.routes.post("/danbooru_gallery/translate_prompt")
+@foreground_request("translate_prompt")
+async def translate_prompt_route(request):
+    """整句中文提示词转换（多模式自动机，一次扫描）"""
+    try:
+        data = await request.json()
+        prompt = data.get("prompt", "")
+        underscore_to_space = bool(data.get("underscore_to_space", False))
+
+        if not isinstance(prompt, str):
+            return web.json_response({"success": False, "error": "prompt必须是字符串"})
+        if not prompt.strip():
+            return web.json_response({"success": True, "prompt": prompt, "translated": prompt,
+                                      "matches": [], "unmatched": []})
+
+        if translation_system.prompt_automaton_ready:
+            result = translation_system.translate_prompt(prompt, underscore_to_space)
+        else:
+            # 预加载未完成时需要加载数据并构建自动机，放到线程中避免阻塞事件循环
+            result = await asyncio.to_thread(translation_system.translate_prompt, prompt, underscore_to_space)
+        return web.json_response({
+            "success": True,
+            "prompt": prompt,
+            **result
+        })
+    except Exception as e:
+        logger.error(f"整句翻译接口错误: {e}")
+        return web.json_response({"success": False, "error": str(e)})
+
 @PromptServer.instance.routes.get("/danbooru_gallery/search_chinese")
+@foreground_request("search_chinese")
 async def search_chinese_route(request):
     """中文搜索匹配 - 优先使用FTS5数据库搜索"""
     try:
@@ -931,25 +1075,24 @@ async def search_chinese_route(request):
         if get_db_manager and config['cache'].get('use_database_query', True):
             try:
                 db = get_db_manager()
-                db_results = await db.search_tags_optimized(query, limit, search_type="chinese")
+                response_cache = get_response_cache()
+                cache_key = ("search_chinese", query, limit)
+                generation = db.generation
+                cached_body = response_cache.get(cache_key, generation)
+                if cached_body is not None:
+                    return web.Response(body=cached_body, content_type='application/json')
+                if HAS_PYPINYIN and not contains_cjk(query) and is_pinyin_query(query):
+                    # 拼音/首字母查询（如 bs -> 白丝），走拼音索引前缀查找
+                    db_results = await db.search_tags_by_pinyin(normalize_pinyin_key(query), limit)
+                else:
+                    db_results = await db.search_tags_optimized(query, limit, search_type="chinese")
                 if db_results:
-                    # 转换为前端期望的格式
-                    formatted_results = [
-                        {
-                            'tag': tag['tag'],
-                            'translation_cn': tag.get('translation_cn'),
-                            'category': tag['category'],
-                            'post_count': tag['post_count'],
-                            'match_score': tag.get('match_score', 5)
-                        }
-                        for tag in db_results
-                    ]
-                    logger.debug(f"[SearchChinese] FTS5数据库查询: '{query}' -> {len(formatted_results)}条结果")
-                    return web.json_response({
-                        "success": True,
-                        "query": query,
-                        "results": formatted_results
-                    })
+                    # 直接序列化为前端期望的格式
+                    logger.debug(f"[SearchChinese] FTS5数据库查询: '{query}' -> {len(db_results)}条结果")
+                    body = ('{"success":true,"query":' + json.dumps(query, ensure_ascii=False) +
+                            ',"results":' + dump_search_results(db_results) + '}').encode('utf-8')
+                    response_cache.put(cache_key, generation, body)
+                    return web.Response(body=body, content_type='application/json')
             except Exception as e:
                 logger.warning(f"[SearchChinese] FTS5查询失败: {e}，回退到translation_system")
         # ⚠️ Fallback: 使用旧的translation_system（线性搜索，较慢）
@@ -972,6 +1115,7 @@ async def search_chinese_route(request):
         return web.json_response({"success": False, "error": str(e)})
 
 @PromptServer.instance.routes.get("/danbooru_gallery/autocomplete_with_translation")
+@foreground_request("autocomplete")
 async def get_autocomplete_with_translation(request):
     """带翻译的自动补全API - 三层查询机制：数据库 → API → 空结果"""
     try:
@@ -985,21 +1129,27 @@ async def get_autocomplete_with_translation(request):
         if get_db_manager and config['cache'].get('use_database_query', True):
             try:
                 db = get_db_manager()
+                response_cache = get_response_cache()
+                cache_key = ("autocomplete_with_translation", query, limit)
+                generation = db.generation
+                cached_body = response_cache.get(cache_key, generation)
+                if cached_body is not None:
+                    return web.Response(body=cached_body, content_type='application/json')
                 db_results = await db.search_tags_by_prefix(query, limit)
+                # 英文前缀结果很少时，用拼音/首字母索引补充（如 bs -> 白丝）
+                if (len(db_results) < min(limit, PINYIN_FALLBACK_MAX_RESULTS)
+                        and HAS_PYPINYIN and is_pinyin_query(query)):
+                    pinyin_results = await db.search_tags_by_pinyin(normalize_pinyin_key(query), limit)
+                    seen_tags = {tag.tag for tag in db_results}
+                    db_results += [
+                        tag for tag in pinyin_results if tag.tag not in seen_tags
+                    ][:limit - len(db_results)]
                 if db_results:
-                    # 数据库有结果，转换格式（已包含translation_cn）
-                    formatted_results = [
-                        {
-                            'name': tag['tag'],
-                            'category': tag['category'],
-                            'post_count': tag['post_count'],
-                            'translation': tag.get('translation_cn'),
-                            'aliases': tag.get('aliases', [])
-                        }
-                        for tag in db_results
-                    ]
-                    logger.debug(f"[AutocompleteTranslation] 数据库查询成功: '{query}' -> {len(formatted_results)}条结果")
-                    return web.json_response(formatted_results)
+                    # 数据库有结果，直接序列化为响应格式（已包含translation_cn）
+                    logger.debug(f"[AutocompleteTranslation] 数据库查询成功: '{query}' -> {len(db_results)}条结果")
+                    body = dump_autocomplete(db_results).encode('utf-8')
+                    response_cache.put(cache_key, generation, body)
+                    return web.Response(body=body, content_type='application/json')
                 else:
                     logger.debug(f"[AutocompleteTranslation] 数据库无结果: '{query}'")
             except Exception as e:
@@ -1041,11 +1191,107 @@ async def get_autocomplete_with_translation(request):
         logger.error(f"[AutocompleteTranslation] 处理请求时发生错误: {e}")
         return web.json_response([])
 
+@PromptServer.instance.routes.get("/danbooru_gallery/autocomplete_cache_stats")
+async def get_autocomplete_cache_stats(request):
+    """补全响应缓存统计（命中率、条目数、当前数据库版本号），以及所有已注册 LRU 缓存的命中/未命中/淘汰统计"""
+    try:
+        stats = get_response_cache().get_stats()
+        stats["generation"] = get_db_manager().generation if get_db_manager else 0
+        return web.json_response({"success": True, "stats": stats, "caches": get_all_cache_stats()})
+    except Exception as e:
+        logger.error(f"[AutocompleteCache] 获取缓存统计失败: {e}")
+        return web.json_response({"success": False, "error": str(e)})
+
+@PromptServer.instance.routes.get("/danbooru_gallery/related_tags")
+@foreground_request("related_tags")
+async def get_related_tags(request):
+    """根据已浏览帖子的标签共现统计，返回与给定标签组合最相关的标签"""
+    try:
+        raw_tags = request.query.get("tags", "")
+        limit = min(int(request.query.get("limit", "20")), 100)
+        tags = [tag for tag in raw_tags.replace(",", " ").split() if tag]
+        if not tags or not get_db_manager:
+            return web.json_response({"success": True, "tags": tags, "results": []})
+
+        # 先把尚未计数的帖子合并进索引
+        await _flush_cooccurrence_safe()
+
+        db = get_db_manager()
+        rows = await db.get_cooccurrence_rows(tags)
+        ranked = rank_related_tags(rows, tags, limit)
+        records = await db.get_tags_by_names([tag for tag, _ in ranked])
+
+        results = []
+        for tag, score in ranked:
+            record = records.get(tag)
+            results.append({
+                "name": tag,
+                "score": round(score, 4),
+                "category": record.category if record else 0,
+                "post_count": record.post_count if record else 0,
+                "translation": record.translation_cn if record else None,
+            })
+
+        logger.debug(f"[RelatedTags] {tags} -> {len(results)} 个相关标签")
+        return web.json_response({"success": True, "tags": tags, "results": results})
+    except Exception as e:
+        logger.error(f"[RelatedTags] 获取相关标签失败: {e}")
+        return web.json_response({"success": False, "error": str(e), "results": []})
+
+@PromptServer.instance.routes.get("/danbooru_gallery/tag_relations")
+async def get_tag_relations(request):
+    """本地解析标签别名并展开蕴含关系（数据由标签同步导入，无需远程请求）"""
+    try:
+        raw_tags = request.query.get("tags", "")
+        tags = [tag.lower() for tag in raw_tags.replace(",", " ").split() if tag]
+        if not tags or not get_db_manager:
+            return web.json_response({"success": True, "tags": tags, "aliases": {}, "implications": {}})
+
+        db = get_db_manager()
+        aliases = await db.resolve_aliases(tags)
+        canonical = [aliases.get(tag, tag) for tag in tags]
+        implications = await db.get_implied_tags(canonical)
+
+        return web.json_response({
+            "success": True,
+            "tags": canonical,
+            "aliases": aliases,
+            "implications": implications,
+        })
+    except Exception as e:
+        logger.error(f"[TagRelations] 解析标签关系失败: {e}")
+        return web.json_response({"success": False, "error": str(e), "aliases": {}, "implications": {}})
+
+@PromptServer.instance.routes.get("/danbooru_gallery/memory_stats")
+async def get_memory_stats(request):
+    """
+    插件内存统计（按子系统实测）
+
+    Query参数:
+        tracemalloc: 可选 start / stop / snapshot（按需开启分配追踪）
+        top: snapshot 返回的分配位置数，默认20
+    """
+    try:
+        # 深度测量需要遍历（采样）大容器，放到线程中避免阻塞事件循环
+        stats = await asyncio.to_thread(collect_memory_stats)
+
+        action = request.query.get("tracemalloc")
+        if action:
+            top = int(request.query.get("top", "20"))
+            stats["tracemalloc"] = await asyncio.to_thread(tracemalloc_control, action, top)
+
+        return web.json_response({"success": True, **stats})
+    except Exception as e:
+        logger.error(f"[MemoryStats] 获取内存统计失败: {e}")
+        return web.json_response({"success": False, "error": str(e)})
+
 # ================================
 # 核心节点（删除尺寸输出后）
 # ================================
 class DanbooruGalleryNode:
-    _post_cache = {}
+    # 帖子列表响应缓存：最多200个请求、共64MB（按 UTF-8 字节计），过期时间取设置中的 max_cache_age
+    _post_cache = LRUCache("gallery_posts", max_entries=200, max_bytes=64 * 1024 * 1024,
+                           sizeof=lambda text: len(text.encode("utf-8")))
 
     @classmethod
     def INPUT_TYPES(s):
@@ -1263,10 +1509,9 @@ class DanbooruGalleryNode:
         cache_key = f"{tags}:{limit}:{page}:{rating}"
         # 如果启用了缓存，则检查缓存
         if cache_enabled:
-            if cache_key in DanbooruGalleryNode._post_cache:
-                cached_data, timestamp = DanbooruGalleryNode._post_cache[cache_key]
-                if time.time() - timestamp < max_cache_age:
-                    return (cached_data,)
+            cached_data = DanbooruGalleryNode._post_cache.get(cache_key)
+            if cached_data is not None:
+                return (cached_data,)
         posts_url = f"{BASE_URL}/posts.json"
         
         # 分离 date: 标签和其他标签
@@ -1303,14 +1548,13 @@ class DanbooruGalleryNode:
             response.raise_for_status()
             
             result_text = response.text
+
+            # 记录帖子标签用于共现索引（仅缓存原始文本，解析和计数在刷新时进行）
+            get_cooccurrence_collector().add_posts_json(result_text)
             
             # 如果启用了缓存，则存储结果
             if cache_enabled:
-                DanbooruGalleryNode._post_cache[cache_key] = (result_text, time.time())
-                # 清理旧缓存（可选，防止内存无限增长）
-                if len(DanbooruGalleryNode._post_cache) > 200:  # 假设最多缓存200个请求
-                    oldest_key = min(DanbooruGalleryNode._post_cache.keys(), key=lambda k: DanbooruGalleryNode._post_cache[k][1])
-                    del DanbooruGalleryNode._post_cache[oldest_key]
+                DanbooruGalleryNode._post_cache.put(cache_key, result_text, ttl=max_cache_age)
             
             return (result_text,)
         except requests.exceptions.RequestException as e:
@@ -1399,19 +1643,52 @@ class DanbooruAsyncImageLoader:
         img_array = np.array(img).astype(np.float32) / 255.0
         return torch.from_numpy(img_array)[None, ...]
 
+# ================================
+# 辅助节点：中文提示词转换
+# ================================
+class DanbooruPromptTranslator:
+    """辅助节点：将中英混合提示词中的中文短语转换为Danbooru标签"""
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "提示词": ("STRING", {"default": "", "multiline": True, "description": "中英混合的提示词"}),
+                "下划线转空格": ("BOOLEAN", {"default": False, "description": "输出标签时将下划线替换为空格"}),
+            },
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("提示词",)
+    FUNCTION = "translate"
+    CATEGORY = "danbooru"
+
+    def translate(self, 提示词, 下划线转空格=False):
+        if not 提示词 or not 提示词.strip():
+            return (提示词,)
+        try:
+            result = translation_system.translate_prompt(提示词, 下划线转空格)
+            if result['unmatched']:
+                logger.debug(f"[提示词转换] 未识别的中文片段: {result['unmatched']}")
+            return (result['translated'],)
+        except Exception as e:
+            logger.error(f"[提示词转换] 转换失败: {e}")
+            return (提示词,)
+
 # ================================
 # 节点映射（更新）
 # ================================
 def get_node_class_mappings():
     return {
         "DanbooruGalleryNode": DanbooruGalleryNode,
-        "DanbooruAsyncImageLoader": DanbooruAsyncImageLoader  # 新增辅助节点
+        "DanbooruAsyncImageLoader": DanbooruAsyncImageLoader,  # 新增辅助节点
+        "DanbooruPromptTranslator": DanbooruPromptTranslator
     }
 
 def get_node_display_name_mappings():
     return {
         "DanbooruGalleryNode": "D站画廊 (Danbooru Gallery)",
-        "DanbooruAsyncImageLoader": "D站异步图像加载器"  # 辅助节点显示名称
+        "DanbooruAsyncImageLoader": "D站异步图像加载器",  # 辅助节点显示名称
+        "DanbooruPromptTranslator": "D站中文提示词转换 (Danbooru Prompt Translator)"
     }
 
 NODE_CLASS_MAPPINGS = get_node_class_mappings()
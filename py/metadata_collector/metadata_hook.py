@@ -2,6 +2,7 @@ import sys
 import inspect
 from .metadata_registry import MetadataRegistry
 from ..utils.logger import get_logger
+from ..utils.priority_gate import get_priority_gate
 
 # 初始化logger
 logger = get_logger(__name__)
@@ -156,8 +157,9 @@ class MetadataHook:
             except Exception as e:
                 logger.error(f"Prompt tracking error: {e}")
 
-            # 调用原始函数（可能包含其他插件的 hook）
-            return original_execute(*args, **kwargs)
+            # 调用原始函数（可能包含其他插件的 hook），执行期间后台标签同步让路
+            with get_priority_gate().foreground("prompt"):
+                return original_execute(*args, **kwargs)
 
         # 添加标记
         execute_with_prompt_tracking.__wrapped__ = original_execute
@@ -236,8 +238,9 @@ class MetadataHook:
             except Exception as e:
                 logger.error(f"Async prompt tracking error: {e}")
 
-            # 调用原始函数（可能包含其他插件的 hook）
-            return await original_execute(*args, **kwargs)
+            # 调用原始函数（可能包含其他插件的 hook），执行期间后台标签同步让路
+            with get_priority_gate().foreground("prompt"):
+                return await original_execute(*args, **kwargs)
 
         # 添加标记
         async_execute_with_prompt_tracking.__wrapped__ = original_execute
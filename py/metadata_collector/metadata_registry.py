@@ -3,6 +3,7 @@ import threading
 from nodes import NODE_CLASS_MAPPINGS
 from .node_extractors import NODE_EXTRACTORS, GenericNodeExtractor
 from .constants import METADATA_CATEGORIES, IMAGES
+from ..utils.memory_stats import deep_sizeof, register_memory_source
 
 class MetadataRegistry:
     """A singleton registry to store and retrieve workflow metadata"""
@@ -33,6 +34,21 @@ class MetadataRegistry:
 
         # Categories we want to track and retrieve from cache
         self.metadata_categories = METADATA_CATEGORIES
+
+        register_memory_source("metadata_registry", self.get_memory_stats)
+
+    def get_memory_stats(self):
+        """Measured size of stored prompt metadata and the node cache (tensors by nbytes)"""
+        with self._lock:
+            seen = set()
+            prompt_metadata = deep_sizeof(self.prompt_metadata, seen=seen)
+            node_cache = deep_sizeof(self.node_cache, seen=seen)
+            return {
+                'bytes': prompt_metadata + node_cache,
+                'prompt_metadata': prompt_metadata,
+                'node_cache': node_cache,
+                'node_cache_entries': len(self.node_cache),
+            }
     
     def _clean_old_prompts(self):
         """Clean up old prompt metadata, keeping only recent ones"""
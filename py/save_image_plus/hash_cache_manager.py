@@ -3,18 +3,20 @@
 
 功能：
 - 内存LRU缓存（基于文件路径+修改时间）
-- JSON持久化存储
+- 追加写日志持久化（JSON Lines，按 路径+大小+修改时间 记录完整历史）
+- 批量、防抖写盘，计算哈希的线程不会在磁盘写入上串行等待
+- 启动时压缩日志（去重、去除已删除记录），旧版 JSON 缓存自动迁移
 - 线程安全操作
-- 自动清理过期缓存
 """
 
 import os
 import json
+import atexit
 import hashlib
 import threading
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
-from collections import OrderedDict
+from ..shared.cache.lru_cache import LRUCache
 from ..utils.logger import get_logger
 
 # 初始化logger
@@ -28,6 +30,9 @@ class HashCacheManager:
     _instance = None
     _instance_lock = threading.Lock()
 
+    # 新记录最多延迟多少秒写盘（期间的写入合并为一次追加）
+    FLUSH_DELAY = 2.0
+
     def __new__(cls, cache_file: str = None, max_memory_entries: int = 100):
         """单例模式，确保全局只有一个缓存实例"""
         if cls._instance is None:
@@ -41,7 +46,8 @@ class HashCacheManager:
         初始化缓存管理器
 
         Args:
-            cache_file: 缓存文件路径，默认为当前目录下的 hash_cache.json
+            cache_file: 缓存日志路径，默认为当前目录下的 hash_cache.jsonl
+                （同名 .json 旧版缓存文件会被自动迁移）
             max_memory_entries: 内存缓存最大条目数（LRU）
         """
         # 避免重复初始化
@@ -51,83 +57,180 @@ class HashCacheManager:
         self._initialized = True
         self.max_memory_entries = max_memory_entries
         self._cache_lock = threading.Lock()
+        # 保证多次写盘按顺序追加（不持有 _cache_lock，计算哈希的线程不受影响）
+        self._flush_lock = threading.Lock()
 
         # 设置缓存文件路径
         if cache_file is None:
             current_dir = Path(__file__).parent
-            cache_file = current_dir / "hash_cache.json"
-        self.cache_file = Path(cache_file)
+            cache_file = current_dir / "hash_cache.jsonl"
+        self.cache_file = Path(cache_file).with_suffix('.jsonl')
+        self.legacy_cache_file = self.cache_file.with_suffix('.json')
+
+        # 内存缓存：{file_path: (size, mtime, hash_value)}，大小或mtime不一致即视为过期
+        self._memory_cache = LRUCache("model_hashes", max_entries=max_memory_entries)
 
-        # 内存缓存：{(file_path, mtime): hash_value}
-        self._memory_cache: OrderedDict[Tuple[str, float], str] = OrderedDict()
+        # 磁盘日志的完整索引：{file_path: {(size, mtime): hash_value}}，不受LRU容量限制
+        self._disk_index: Dict[str, Dict[Tuple[int, float], str]] = {}
+
+        # 待写盘的日志记录和防抖定时器
+        self._pending: List[Dict] = []
+        self._flush_timer: Optional[threading.Timer] = None
 
         # 统计信息
         self._stats = {
             'hits': 0,
+            'disk_hits': 0,
             'misses': 0,
             'disk_loads': 0,
-            'disk_saves': 0
+            'disk_saves': 0,
+            'compactions': 0
         }
 
-        # 从磁盘加载缓存
+        # 从磁盘加载缓存（并压缩日志）
         self._load_cache_from_disk()
 
-    def _load_cache_from_disk(self):
-        """从JSON文件加载缓存"""
-        if not self.cache_file.exists():
-            return
+        # 进程退出前写入尚未落盘的记录
+        atexit.register(self.flush)
 
+    @staticmethod
+    def _file_key(file_path: str) -> Optional[Tuple[int, float]]:
+        """文件的 (大小, 修改时间)，文件不存在时返回 None"""
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                disk_cache = json.load(f)
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime
+
+    def _read_log(self) -> Tuple[int, bool]:
+        """
+        读取日志到 _disk_index（后写入的记录覆盖先写入的）
+
+        Returns:
+            (有效行数, 是否存在损坏行)
+        """
+        lines = 0
+        corrupt = False
+        with open(self.cache_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    file_path = record['path']
+                    if record.get('deleted'):
+                        self._disk_index.pop(file_path, None)
+                    else:
+                        versions = self._disk_index.setdefault(file_path, {})
+                        versions[(record['size'], record['mtime'])] = record['hash']
+                    lines += 1
+                except (ValueError, KeyError, TypeError):
+                    # 进程中断时最后一行可能只写了一半
+                    corrupt = True
+        return lines, corrupt
+
+    def _import_legacy_cache(self) -> int:
+        """导入旧版 JSON 缓存（{path: {mtime, hash}}），只保留文件仍存在且未修改的条目"""
+        with open(self.legacy_cache_file, 'r', encoding='utf-8') as f:
+            legacy_cache = json.load(f)
+
+        imported = 0
+        for file_path, cache_data in legacy_cache.items():
+            file_key = self._file_key(file_path)
+            cached_mtime = cache_data.get('mtime')
+            cached_hash = cache_data.get('hash')
+            if file_key and cached_mtime and cached_hash and abs(file_key[1] - cached_mtime) < 1.0:  # 允许1秒误差
+                self._disk_index.setdefault(file_path, {})[file_key] = cached_hash
+                imported += 1
+        return imported
+
+    def _write_compacted_log(self):
+        """把 _disk_index 重写为去重后的日志（先写临时文件再原子替换）"""
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix('.jsonl.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for file_path, (size, mtime), hash_value in self._iter_disk_entries():
+                f.write(json.dumps({'path': file_path, 'size': size, 'mtime': mtime, 'hash': hash_value},
+                                   ensure_ascii=False) + '\n')
+        os.replace(tmp_file, self.cache_file)
+
+    def _iter_disk_entries(self):
+        """遍历磁盘索引中的 (file_path, (size, mtime), hash_value)"""
+        for file_path, versions in self._disk_index.items():
+            for file_key, hash_value in versions.items():
+                yield file_path, file_key, hash_value
+
+    def _disk_entry_count(self) -> int:
+        """磁盘索引中的记录数（所有文件的所有版本）"""
+        return sum(len(versions) for versions in self._disk_index.values())
 
-            # 将磁盘缓存加载到内存，但不超过最大条目数
+    def _load_cache_from_disk(self):
+        """从日志加载缓存，日志中有重复/删除/损坏记录时压缩重写"""
+        try:
+            lines, corrupt = 0, False
+            if self.cache_file.exists():
+                lines, corrupt = self._read_log()
+
+            has_legacy = self.legacy_cache_file.exists()
+            migrated = self._import_legacy_cache() if has_legacy else 0
+
+            entry_count = self._disk_entry_count()
+            if corrupt or has_legacy or lines > entry_count:
+                self._write_compacted_log()
+                self._stats['compactions'] += 1
+                logger.info(f"哈希缓存日志已压缩: {lines} 行 -> {entry_count} 条"
+                            + (f"（迁移旧版缓存 {migrated} 条）" if has_legacy else ""))
+            if has_legacy:
+                # 旧版缓存只导入一次（即使没有仍有效的条目），之后不再读取
+                self.legacy_cache_file.unlink()
+
+            # 预热内存缓存：仍存在且未修改的文件（不超过最大条目数）
             loaded_count = 0
-            for file_path, cache_data in disk_cache.items():
+            for file_path, versions in self._disk_index.items():
                 if loaded_count >= self.max_memory_entries:
                     break
-
-                # 验证文件是否仍存在且修改时间匹配
-                if os.path.exists(file_path):
-                    cached_mtime = cache_data.get('mtime')
-                    cached_hash = cache_data.get('hash')
-
-                    if cached_mtime and cached_hash:
-                        current_mtime = os.path.getmtime(file_path)
-                        # 如果文件未修改，加载到内存
-                        if abs(current_mtime - cached_mtime) < 1.0:  # 允许1秒误差
-                            cache_key = (file_path, current_mtime)
-                            self._memory_cache[cache_key] = cached_hash
-                            loaded_count += 1
+                file_key = self._file_key(file_path)
+                hash_value = versions.get(file_key) if file_key else None
+                if hash_value is not None:
+                    self._memory_cache.put(file_path, (*file_key, hash_value))
+                    loaded_count += 1
 
             self._stats['disk_loads'] += 1
-            logger.info(f"从磁盘加载了 {loaded_count} 条缓存记录")
+            logger.info(f"从磁盘加载了 {entry_count} 条哈希记录（内存缓存 {loaded_count} 条）")
 
         except Exception as e:
             logger.error(f"加载缓存文件失败: {e}")
 
-    def _save_cache_to_disk(self):
-        """保存缓存到JSON文件"""
-        try:
-            # 准备保存的数据
-            disk_cache = {}
-            for (file_path, mtime), hash_value in self._memory_cache.items():
-                disk_cache[file_path] = {
-                    'mtime': mtime,
-                    'hash': hash_value
-                }
-
-            # 确保目录存在
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-
-            # 写入文件
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(disk_cache, f, indent=2, ensure_ascii=False)
-
-            self._stats['disk_saves'] += 1
-
-        except Exception as e:
-            logger.error(f"保存缓存文件失败: {e}")
+    def _schedule_flush(self):
+        """第一条待写记录之后 FLUSH_DELAY 秒写盘（调用方持有 _cache_lock）"""
+        if self._flush_timer is not None:
+            return
+        self._flush_timer = threading.Timer(self.FLUSH_DELAY, self.flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def flush(self):
+        """把待写记录一次性追加到日志"""
+        with self._flush_lock:
+            with self._cache_lock:
+                pending, self._pending = self._pending, []
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+            if not pending:
+                return
+
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.cache_file, 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in pending))
+                self._stats['disk_saves'] += 1
+            except Exception as e:
+                logger.error(f"保存缓存文件失败: {e}")
+                # 放回队列，下次写盘重试
+                with self._cache_lock:
+                    self._pending[:0] = pending
 
     def get_hash(self, file_path: str) -> Optional[str]:
         """
@@ -139,26 +242,28 @@ class HashCacheManager:
         Returns:
             哈希值，如果缓存未命中则返回 None
         """
-        if not os.path.exists(file_path):
+        # 获取文件大小和修改时间
+        file_key = self._file_key(file_path)
+        if file_key is None:
             return None
-
-        # 获取文件修改时间
-        mtime = os.path.getmtime(file_path)
-        cache_key = (file_path, mtime)
+        size, mtime = file_key
 
         with self._cache_lock:
-            # 检查内存缓存
-            if cache_key in self._memory_cache:
-                # LRU: 移动到末尾（最近使用）
-                self._memory_cache.move_to_end(cache_key)
-                self._stats['hits'] += 1
-                return self._memory_cache[cache_key]
-
-            # 检查是否有该文件的旧缓存（不同mtime）
-            for (cached_path, cached_mtime), cached_hash in list(self._memory_cache.items()):
-                if cached_path == file_path and cached_mtime != mtime:
-                    # 文件已修改，删除旧缓存
-                    del self._memory_cache[(cached_path, cached_mtime)]
+            # 检查内存缓存（命中时LRU自动移动到末尾）
+            entry = self._memory_cache.get(file_path)
+            if entry is not None:
+                if entry[:2] == file_key:
+                    self._stats['hits'] += 1
+                    return entry[2]
+                # 文件已修改，删除旧缓存
+                self._memory_cache.pop(file_path)
+
+            # 检查磁盘日志索引（包括被LRU淘汰的条目和文件的历史版本）
+            cached_hash = self._disk_index.get(file_path, {}).get(file_key)
+            if cached_hash is not None:
+                self._memory_cache.put(file_path, (size, mtime, cached_hash))
+                self._stats['disk_hits'] += 1
+                return cached_hash
 
             self._stats['misses'] += 1
             return None
@@ -170,25 +275,26 @@ class HashCacheManager:
         Args:
             file_path: 文件路径
             hash_value: 哈希值
-            auto_save: 是否自动保存到磁盘
+            auto_save: 是否自动保存到磁盘（防抖批量追加；False 时等到下次写盘）
         """
-        if not os.path.exists(file_path):
+        file_key = self._file_key(file_path)
+        if file_key is None:
             return
-
-        mtime = os.path.getmtime(file_path)
-        cache_key = (file_path, mtime)
+        size, mtime = file_key
 
         with self._cache_lock:
-            # 如果缓存已满，删除最旧的条目（LRU）
-            if len(self._memory_cache) >= self.max_memory_entries:
-                self._memory_cache.popitem(last=False)
+            # 添加到缓存（缓存已满时LRU自动淘汰最旧条目）
+            self._memory_cache.put(file_path, (size, mtime, hash_value))
 
-            # 添加到缓存
-            self._memory_cache[cache_key] = hash_value
+            # 记录到日志队列（相同记录已在日志中则跳过）
+            versions = self._disk_index.setdefault(file_path, {})
+            if versions.get(file_key) != hash_value:
+                versions[file_key] = hash_value
+                self._pending.append({'path': file_path, 'size': size, 'mtime': mtime, 'hash': hash_value})
 
             # 自动保存到磁盘
-            if auto_save:
-                self._save_cache_to_disk()
+            if auto_save and self._pending:
+                self._schedule_flush()
 
     def calculate_and_cache_hash(self, file_path: str, block_size: int = 128 * 1024) -> str:
         """
@@ -224,12 +330,12 @@ class HashCacheManager:
         清空缓存
 
         Args:
-            save_to_disk: 清空前是否保存到磁盘
+            save_to_disk: 清空前是否把待写记录保存到磁盘（磁盘日志本身保留）
         """
-        with self._cache_lock:
-            if save_to_disk:
-                self._save_cache_to_disk()
+        if save_to_disk:
+            self.flush()
 
+        with self._cache_lock:
             self._memory_cache.clear()
             logger.info("缓存已清空")
 
@@ -243,10 +349,15 @@ class HashCacheManager:
                 'memory_entries': len(self._memory_cache),
                 'max_entries': self.max_memory_entries,
                 'hits': self._stats['hits'],
+                'disk_hits': self._stats['disk_hits'],
                 'misses': self._stats['misses'],
                 'hit_rate': f"{hit_rate:.2f}%",
+                'evictions': self._memory_cache.get_stats()['evictions'],
                 'disk_loads': self._stats['disk_loads'],
-                'disk_saves': self._stats['disk_saves']
+                'disk_saves': self._stats['disk_saves'],
+                'disk_entries': self._disk_entry_count(),
+                'pending_writes': len(self._pending),
+                'compactions': self._stats['compactions']
             }
 
     def print_stats(self):
@@ -256,11 +367,12 @@ class HashCacheManager:
         logger.info("📊 哈希缓存统计信息")
         logger.info("=" * 50)
         logger.info(f"内存缓存条目: {stats['memory_entries']} / {stats['max_entries']}")
-        logger.info(f"缓存命中: {stats['hits']} 次")
+        logger.info(f"缓存命中: {stats['hits']} 次（磁盘日志命中 {stats['disk_hits']} 次）")
         logger.info(f"缓存未命中: {stats['misses']} 次")
         logger.info(f"命中率: {stats['hit_rate']}")
         logger.info(f"磁盘加载: {stats['disk_loads']} 次")
         logger.info(f"磁盘保存: {stats['disk_saves']} 次")
+        logger.info(f"磁盘记录: {stats['disk_entries']} 条（待写入 {stats['pending_writes']} 条）")
         logger.info("=" * 50 + "\n")
 
     def remove_file_cache(self, file_path: str):
@@ -271,18 +383,17 @@ class HashCacheManager:
             file_path: 文件路径
         """
         with self._cache_lock:
-            keys_to_remove = [
-                key for key in self._memory_cache.keys()
-                if key[0] == file_path
-            ]
-            for key in keys_to_remove:
-                del self._memory_cache[key]
+            self._memory_cache.pop(file_path)
+
+            # 从磁盘索引删除该文件的所有版本，并追加删除记录
+            if self._disk_index.pop(file_path, None):
+                self._pending.append({'path': file_path, 'deleted': True})
+                self._schedule_flush()
 
     def force_save(self):
         """强制保存当前缓存到磁盘"""
-        with self._cache_lock:
-            self._save_cache_to_disk()
-            logger.info("缓存已强制保存到磁盘")
+        self.flush()
+        logger.info("缓存已强制保存到磁盘")
 
 
 # 全局缓存管理器实例
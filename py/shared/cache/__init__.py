@@ -7,6 +7,9 @@ Supports two modes:
 2. Memory cache mode (optional): Preload tags into memory for extreme performance
 """
 
+from .lru_cache import LRUCache, get_all_cache_stats
 from .memory_cache import HotTagsCache, get_hot_tags_cache
+from .response_cache import ResponseCache, get_response_cache
 
-__all__ = ['HotTagsCache', 'get_hot_tags_cache']
+__all__ = ['LRUCache', 'get_all_cache_stats', 'HotTagsCache', 'get_hot_tags_cache',
+           'ResponseCache', 'get_response_cache']
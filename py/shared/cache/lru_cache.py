@@ -0,0 +1,216 @@
+"""
+Shared LRU cache primitive
+Thread-safe O(1) LRU with per-entry TTL, optional byte budget and hit/miss/eviction
+counters, used by every in-process cache of the plugin
+"""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from ...utils.memory_stats import deep_sizeof, register_memory_source
+
+# Logger导入
+from ...utils.logger import get_logger
+logger = get_logger(__name__)
+
+
+class LRUCache:
+    """
+    Least-recently-used cache with optional expiry and size weighting
+
+    Entries are kept in an OrderedDict in recency order, so lookups, inserts
+    and evictions are O(1). Expired entries are dropped when looked up (or
+    evicted in LRU order), never by scanning. With max_bytes set, each entry
+    is weighted by `sizeof(value)` and the oldest entries are evicted until
+    the total fits.
+    """
+
+    def __init__(self, name: str, max_entries: int = 1000,
+                 ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None,
+                 sizeof: Optional[Callable[[Any], int]] = None,
+                 register: bool = True):
+        """
+        Args:
+            name: Cache name shown in statistics
+            max_entries: Maximum number of entries
+            ttl: Default time-to-live in seconds (None = never expires)
+            max_bytes: Maximum total size (requires sizeof or explicit sizes)
+            sizeof: Function returning the size of a value in bytes
+            register: Add to the global registry used by get_all_cache_stats
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+
+        # key -> (value, expires_at or None, size)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+
+        if register:
+            register_cache(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a value and mark it as recently used
+
+        Returns:
+            Cached value, or default when missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+
+            value, expires_at, size = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._entries[key]
+                self._bytes -= size
+                self._expired += 1
+                self._misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any,
+            ttl: Optional[float] = None, size: Optional[int] = None):
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live for this entry (default: the cache's ttl)
+            size: Size in bytes (default: sizeof(value), or 0)
+        """
+        if ttl is None:
+            ttl = self.ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        if size is None:
+            size = self._sizeof(value) if self._sizeof else 0
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry and return its value"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._bytes -= entry[2]
+            return entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Membership test without touching recency or counters"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[1] is None or time.time() < entry[1])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of unexpired (key, value) pairs, least recently used first"""
+        now = time.time()
+        with self._lock:
+            return [(key, value) for key, (value, expires_at, _) in self._entries.items()
+                    if expires_at is None or now < expires_at]
+
+    def clear(self):
+        """Remove all entries (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def deep_size(self) -> int:
+        """Measured retained size of keys and values in bytes (sampled deep size)"""
+        with self._lock:
+            entries = list(self._entries.items())
+        return deep_sizeof(entries)
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'expired': self._expired,
+                'evictions': self._evictions,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+            }
+
+
+# ==================== Cache Registry ====================
+
+# Weak references so short-lived caches (e.g. in tools) do not linger here
+_registry: "weakref.WeakValueDictionary[str, LRUCache]" = weakref.WeakValueDictionary()
+_registry_lock = threading.Lock()
+
+
+def register_cache(cache: LRUCache):
+    """Add a cache to the global registry (a later cache with the same name replaces it)"""
+    with _registry_lock:
+        _registry[cache.name] = cache
+
+
+def get_all_cache_stats() -> Dict[str, Dict]:
+    """Get statistics of every registered cache, keyed by name"""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.get_stats() for cache in caches}
+
+
+def _lru_memory_stats() -> Dict:
+    """Memory source: measured size and hit/miss/eviction counts of every registered cache"""
+    with _registry_lock:
+        caches = list(_registry.values())
+
+    result = {}
+    for cache in caches:
+        stats = cache.get_stats()
+        result[cache.name] = {
+            'entries': stats['entries'],
+            'bytes': cache.deep_size(),
+            'tracked_bytes': stats['bytes'],
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'expired': stats['expired'],
+            'evictions': stats['evictions'],
+            'hit_rate': stats['hit_rate'],
+        }
+    return {'bytes': sum(stats['bytes'] for stats in result.values()), 'caches': result}
+
+
+register_memory_source("lru_caches", _lru_memory_stats)
@@ -9,21 +9,30 @@ Provides two working modes for tag autocomplete:
 
 2. Memory cache mode (optional):
    - <1ms query latency
-   - ~100MB memory usage
+   - Tag records plus a sorted name array (bisect) and top-K lists for short prefixes
    - Manual sync required
 
-Thread-safe with RLock protection.
+Thread-safe with RLock protection. Async callers (aiohttp routes) must use
+the *_async query methods; in database mode the synchronous ones refuse to
+run inside an event loop instead of blocking it until the query finishes.
 """
 
+import asyncio
+import heapq
 import threading
 import time
 import sys
+from array import array
+from bisect import bisect_left
 
 # Logger导入
 from ...utils.logger import get_logger
 logger = get_logger(__name__)
 from typing import List, Dict, Optional, Tuple
 
+from .lru_cache import LRUCache
+from ...utils.memory_stats import deep_sizeof, register_memory_source
+
 
 class HotTagsCache:
     """
@@ -33,6 +42,11 @@ class HotTagsCache:
     By default, it operates in database query mode (transparent pass-through).
     """
 
+    # Prefixes up to this length are answered from precomputed top-K lists (same
+    # split as TagDatabaseManager.prefix_topk), longer prefixes bisect the sorted names
+    PREFIX_TOPK_MAX_LENGTH = 2
+    PREFIX_TOPK_SIZE = 50
+
     def __init__(self, use_database_query: bool = True):
         """
         Initialize cache
@@ -49,9 +63,11 @@ class HotTagsCache:
         self.db_manager = None  # Will be initialized on first query
 
         # ========== Memory Cache Data (only used when use_database_query=False) ==========
-        self._tags_list: List[Dict] = []  # All tags list
-        self._prefix_index: Dict[str, List[int]] = {}  # prefix -> tag indices
-        self._translation_index: Dict[str, List[int]] = {}  # character -> tag indices
+        self._tags_list: List[Dict] = []  # All tags, most popular first (index = popularity rank)
+        self._sorted_names: List[str] = []  # Lowercase tag names in lexicographic order
+        self._sorted_ranks = array('i')  # Popularity rank of each entry in _sorted_names
+        self._prefix_topk: Dict[str, array] = {}  # short prefix -> most popular ranks
+        self._translation_index: Dict[str, object] = {}  # character -> ranks (array or int bitmap)
 
         # ========== State Flags ==========
         self._loaded: bool = False  # Whether data is loaded
@@ -61,9 +77,10 @@ class HotTagsCache:
         self._lock = threading.RLock()  # Recursive lock for thread safety
 
         # ========== Query Result Cache (LRU) ==========
-        self._query_result_cache: Dict[str, Tuple[float, List[Dict]]] = {}
-        self._query_cache_size: int = 500  # Max 500 cached queries
-        self._query_cache_ttl: float = 300.0  # Cache TTL: 5 minutes
+        # Max 500 cached queries, TTL 5 minutes
+        self._query_result_cache = LRUCache("hot_tags_queries", max_entries=500, ttl=300.0)
+
+        register_memory_source("hot_tags_cache", self.get_memory_stats)
 
         logger.info(f"初始化缓存（模式: {'数据库查询' if use_database_query else '内存缓存'}）")
 
@@ -163,6 +180,57 @@ class HotTagsCache:
 
         return results
 
+    # ==================== Async Query Interfaces ====================
+
+    async def search_by_prefix_async(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Async version of search_by_prefix (awaits the database directly)"""
+        if not prefix:
+            return []
+
+        prefix = prefix.lower().strip()
+
+        if self.use_database_query:
+            return await self._search_database_by_prefix_async(prefix, limit)
+        with self._lock:
+            return self._search_in_memory_by_prefix(prefix, limit)
+
+    async def search_by_translation_async(self, query: str, limit: int = 10) -> List[Dict]:
+        """Async version of search_by_translation (awaits the database directly)"""
+        if not query:
+            return []
+
+        query = query.strip()
+
+        if self.use_database_query:
+            return await self._search_database_by_translation_async(query, limit)
+        with self._lock:
+            return self._search_in_memory_by_translation(query, limit)
+
+    async def search_optimized_async(self, query: str, limit: int = 10,
+                                     search_type: str = "auto") -> List[Dict]:
+        """Async version of search_optimized, shares its query result cache"""
+        if not query:
+            return []
+
+        query = query.strip()
+
+        cache_key = f"{query}:{limit}:{search_type}"
+        cached_result = self._get_cached_query_result(cache_key)
+        if cached_result is not None:
+            return cached_result
+
+        if search_type == "auto":
+            search_type = self._detect_language(query)
+
+        if search_type == "chinese":
+            results = await self.search_by_translation_async(query, limit)
+        else:
+            results = await self.search_by_prefix_async(query, limit)
+
+        self._cache_query_result(cache_key, results)
+
+        return results
+
     # ==================== Data Management Interfaces ====================
 
     def load_tags(self, tags: List[Dict]) -> None:
@@ -185,7 +253,9 @@ class HotTagsCache:
 
         with self._lock:
             try:
-                self._tags_list = tags
+                # Popularity order lets rank comparisons replace post_count sorts
+                # (stable and near-linear for rows already ordered by the database)
+                self._tags_list = sorted(tags, key=lambda t: t.get('post_count', 0), reverse=True)
                 self._build_prefix_index()
                 self._build_translation_index()
                 self._loaded = True
@@ -203,7 +273,9 @@ class HotTagsCache:
         """Clear memory cache"""
         with self._lock:
             self._tags_list.clear()
-            self._prefix_index.clear()
+            self._sorted_names = []
+            self._sorted_ranks = array('i')
+            self._prefix_topk.clear()
             self._translation_index.clear()
             self._query_result_cache.clear()
             self._loaded = False
@@ -241,93 +313,80 @@ class HotTagsCache:
                 'mode': 'database' if self.use_database_query else 'memory',
                 'total_tags': len(self._tags_list),
                 'memory_size_mb': self._calculate_memory_size(),
-                'index_count': len(self._prefix_index) + len(self._translation_index),
+                'index_count': len(self._sorted_names) + len(self._prefix_topk) + len(self._translation_index),
                 'last_update': self._last_update,
             }
             return stats
 
     # ==================== Internal Implementation Methods ====================
 
-    def _search_database_by_prefix(self, prefix: str, limit: int) -> List[Dict]:
-        """Search by prefix using database (transparent pass-through)"""
-        try:
-            # Lazy-load database manager
-            if self.db_manager is None:
-                from ..db.db_manager import get_db_manager
-                self.db_manager = get_db_manager()
-
-            # Call database search (assumes async method exists)
-            # Note: If the database method is async, we need to handle it properly
-            # For now, assume it has a sync version or we're in async context
-            import asyncio
+    def _get_db_manager(self):
+        """Lazy-load database manager"""
+        if self.db_manager is None:
+            from ..db.db_manager import get_db_manager
+            self.db_manager = get_db_manager()
+        return self.db_manager
 
-            # Try to get event loop
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # We're in async context, but can't await here
-                    # Fall back to sync version or return empty
-                    logger.warning("Warning: 在异步上下文中无法同步调用数据库")
-                    return []
-                else:
-                    # Run the async method
-                    return loop.run_until_complete(
-                        self.db_manager.search_tags_by_prefix(prefix, limit)
-                    )
-            except RuntimeError:
-                # No event loop, try sync version
-                # For simplicity, return empty list (caller should use async version)
-                logger.warning("Warning: 数据库查询需要异步上下文")
-                return []
+    @staticmethod
+    def _run_sync(coro):
+        """
+        Run a database coroutine to completion from synchronous code (no running loop)
 
+        Raises:
+            RuntimeError: Called from a thread running an event loop (e.g. an
+                aiohttp route); waiting here would stall the loop for the whole
+                query, use the *_async methods instead
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        coro.close()
+        raise RuntimeError("HotTagsCache synchronous search called inside a running event loop, "
+                           "use the *_async methods")
+
+    async def _search_database_by_prefix_async(self, prefix: str, limit: int) -> List[Dict]:
+        """Search by prefix using database (transparent pass-through)"""
+        try:
+            return await self._get_db_manager().search_tags_by_prefix(prefix, limit)
         except Exception as e:
             logger.error(f"Warning: 数据库查询失败: {e}")
             return []
 
-    def _search_database_by_translation(self, query: str, limit: int) -> List[Dict]:
+    async def _search_database_by_translation_async(self, query: str, limit: int) -> List[Dict]:
         """Search by translation using database"""
         try:
-            if self.db_manager is None:
-                from ..db.db_manager import get_db_manager
-                self.db_manager = get_db_manager()
-
-            import asyncio
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    logger.warning("Warning: 在异步上下文中无法同步调用数据库")
-                    return []
-                else:
-                    return loop.run_until_complete(
-                        self.db_manager.search_tags_by_translation(query, limit)
-                    )
-            except RuntimeError:
-                logger.warning("Warning: 数据库查询需要异步上下文")
-                return []
-
+            return await self._get_db_manager().search_tags_by_translation(query, limit)
         except Exception as e:
             logger.error(f"Warning: 数据库查询失败: {e}")
             return []
 
+    def _search_database_by_prefix(self, prefix: str, limit: int) -> List[Dict]:
+        """Synchronous database prefix search"""
+        return self._run_sync(self._search_database_by_prefix_async(prefix, limit))
+
+    def _search_database_by_translation(self, query: str, limit: int) -> List[Dict]:
+        """Synchronous database translation search"""
+        return self._run_sync(self._search_database_by_translation_async(query, limit))
+
     def _search_in_memory_by_prefix(self, prefix: str, limit: int) -> List[Dict]:
         """Search by prefix in memory index"""
         if not self._loaded:
             logger.warning("Warning: 缓存未加载")
             return []
 
-        # Find matching indices
-        matching_indices = self._prefix_index.get(prefix, [])
-
-        # Get tag info
-        results = []
-        for idx in matching_indices[:limit]:
-            if idx < len(self._tags_list):
-                results.append(self._tags_list[idx].copy())
-
-        # Sort by post_count (descending)
-        results.sort(key=lambda x: x.get('post_count', 0), reverse=True)
+        if len(prefix) <= self.PREFIX_TOPK_MAX_LENGTH and limit <= self.PREFIX_TOPK_SIZE:
+            # Short prefix: precomputed, already in popularity order
+            ranks = self._prefix_topk.get(prefix, ())[:limit]
+        else:
+            # Names starting with prefix form one contiguous range of the sorted array,
+            # the most popular are the smallest ranks in that range
+            upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            lo = bisect_left(self._sorted_names, prefix)
+            hi = bisect_left(self._sorted_names, upper, lo)
+            ranks = heapq.nsmallest(limit, self._sorted_ranks[lo:hi])
 
-        return results[:limit]
+        return [self._tags_list[rank].copy() for rank in ranks]
 
     def _search_in_memory_by_translation(self, query: str, limit: int) -> List[Dict]:
         """Search by translation in memory index"""
@@ -335,64 +394,141 @@ class HotTagsCache:
             logger.warning("Warning: 缓存未加载")
             return []
 
-        # Find tags containing the query characters
-        matching_indices_set = set()
-
-        for char in query:
-            indices = self._translation_index.get(char, [])
-            if not matching_indices_set:
-                matching_indices_set = set(indices)
+        bitmaps = []
+        arrays = []
+        for char in set(query):
+            postings = self._translation_index.get(char)
+            if postings is None:
+                return []
+            if isinstance(postings, int):
+                bitmaps.append(postings)
             else:
-                matching_indices_set &= set(indices)
+                arrays.append(postings)
+        arrays.sort(key=len)
 
-        # Get tag info and filter by full match
+        # Candidates arrive in popularity order, so stop after `limit` full matches.
+        # Single characters need no substring check: every posting contains them.
+        needs_check = len(query) > 1
         results = []
-        for idx in matching_indices_set:
-            if idx < len(self._tags_list):
-                tag_info = self._tags_list[idx]
-                translation = tag_info.get('translation_cn', '')
-                if query in translation:
-                    results.append(tag_info.copy())
+        for rank in self._intersect_postings(bitmaps, arrays):
+            tag_info = self._tags_list[rank]
+            if needs_check and query not in tag_info.get('translation_cn', ''):
+                continue
+            results.append(tag_info.copy())
+            if len(results) >= limit:
+                break
+
+        return results
+
+    @staticmethod
+    def _intersect_postings(bitmaps: List[int], arrays: List[array]):
+        """
+        Yield ranks present in every posting list, in ascending order
 
-        # Sort by post_count (descending)
-        results.sort(key=lambda x: x.get('post_count', 0), reverse=True)
+        Args:
+            bitmaps: Int bitmaps (bit r set = rank r)
+            arrays: Sorted rank arrays, shortest first
+        """
+        bitmap = None
+        if bitmaps:
+            bitmap = bitmaps[0]
+            for other in bitmaps[1:]:
+                bitmap &= other
+            if not bitmap:
+                return
+
+        if not arrays:
+            # Pop lowest set bits (most popular first)
+            while bitmap:
+                lowest = bitmap & -bitmap
+                yield lowest.bit_length() - 1
+                bitmap ^= lowest
+            return
 
-        return results[:limit]
+        # Drive by the shortest array, probe the rest
+        driver, others = arrays[0], arrays[1:]
+        bits = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little') if bitmap is not None else None
+        for rank in driver:
+            if bits is not None:
+                byte = rank >> 3
+                if byte >= len(bits) or not (bits[byte] >> (rank & 7)) & 1:
+                    continue
+            for other in others:
+                i = bisect_left(other, rank)
+                if i == len(other) or other[i] != rank:
+                    break
+            else:
+                yield rank
 
     def _build_prefix_index(self) -> None:
-        """Build prefix index for English tags"""
-        self._prefix_index.clear()
+        """
+        Build prefix index for English tags
 
-        for idx, tag_info in enumerate(self._tags_list):
-            tag = tag_info.get('tag', '').lower()
-            if not tag:
+        One sorted name array (searched with bisect) replaces a list entry per
+        prefix of every tag, plus top-K rank lists for the short prefixes whose
+        ranges would be too large to scan per keystroke.
+        """
+        entries = []
+        prefix_topk: Dict[str, array] = {}
+
+        # _tags_list is in popularity order, so the first K tags seen per prefix are its top K
+        for rank, tag_info in enumerate(self._tags_list):
+            tag = tag_info.get('tag', '')
+            name = tag.lower()
+            if not name:
                 continue
+            if name == tag:
+                name = tag  # Share the string with the record
+            entries.append((name, rank))
+
+            for length in range(1, min(len(name), self.PREFIX_TOPK_MAX_LENGTH) + 1):
+                ranks = prefix_topk.get(name[:length])
+                if ranks is None:
+                    prefix_topk[name[:length]] = array('i', (rank,))
+                elif len(ranks) < self.PREFIX_TOPK_SIZE:
+                    ranks.append(rank)
 
-            # Build index for each prefix
-            for i in range(1, len(tag) + 1):
-                prefix = tag[:i]
-                if prefix not in self._prefix_index:
-                    self._prefix_index[prefix] = []
-                self._prefix_index[prefix].append(idx)
+        entries.sort()
+        self._sorted_names = [name for name, _ in entries]
+        self._sorted_ranks = array('i', (rank for _, rank in entries))
+        self._prefix_topk = prefix_topk
 
-        logger.info(f"前缀索引构建完成: {len(self._prefix_index)} 个前缀")
+        logger.info(f"前缀索引构建完成: {len(self._sorted_names)} 个标签, {len(prefix_topk)} 个短前缀")
 
     def _build_translation_index(self) -> None:
-        """Build translation index for Chinese characters"""
-        self._translation_index.clear()
+        """
+        Build translation index for Chinese characters
 
-        for idx, tag_info in enumerate(self._tags_list):
+        Postings are popularity ranks of the tags whose translation contains the
+        character, stored in whichever form is smaller: a sorted array('i') for
+        rare characters or an int bitmap (bit r = rank r) for common ones, so
+        intersecting common characters is a single C-level AND.
+        """
+        postings: Dict[str, List[int]] = {}
+        for rank, tag_info in enumerate(self._tags_list):
             translation = tag_info.get('translation_cn', '')
-            if not translation:
-                continue
-
-            # Build index for each character
-            for char in translation:
-                if char not in self._translation_index:
-                    self._translation_index[char] = []
-                self._translation_index[char].append(idx)
+            for char in set(translation):
+                ranks = postings.get(char)
+                if ranks is None:
+                    postings[char] = [rank]
+                else:
+                    ranks.append(rank)
+
+        index: Dict[str, object] = {}
+        bitmap_count = 0
+        for char, ranks in postings.items():
+            bitmap_bytes = ranks[-1] // 8 + 1
+            if len(ranks) * 4 > bitmap_bytes:
+                bits = bytearray(bitmap_bytes)
+                for rank in ranks:
+                    bits[rank >> 3] |= 1 << (rank & 7)
+                index[char] = int.from_bytes(bits, 'little')
+                bitmap_count += 1
+            else:
+                index[char] = array('i', ranks)
 
-        logger.info(f"翻译索引构建完成: {len(self._translation_index)} 个字符")
+        self._translation_index = index
+        logger.info(f"翻译索引构建完成: {len(index)} 个字符 ({bitmap_count} 个位图)")
 
     def _detect_language(self, query: str) -> str:
         """
@@ -410,6 +546,31 @@ class HotTagsCache:
                 return 'chinese'
         return 'english'
 
+    def get_memory_stats(self) -> Dict:
+        """
+        Measure retained memory of the in-memory tag data (sampled deep size)
+
+        The query result cache is reported with the other LRU caches.
+
+        Returns:
+            {'bytes': int, 'tags': int, 'prefix_index': int, 'translation_index': int}
+        """
+        with self._lock:
+            tags = deep_sizeof(self._tags_list)
+            # Names are the record strings (see _build_prefix_index), count only the list itself;
+            # sampling cannot dedupe them against the records
+            prefix_index = (sys.getsizeof(self._sorted_names)
+                            + deep_sizeof(self._sorted_ranks)
+                            + deep_sizeof(self._prefix_topk))
+            translation_index = deep_sizeof(self._translation_index)
+
+        return {
+            'bytes': tags + prefix_index + translation_index,
+            'tags': tags,
+            'prefix_index': prefix_index,
+            'translation_index': translation_index,
+        }
+
     def _calculate_memory_size(self) -> float:
         """
         Calculate memory usage in MB
@@ -419,40 +580,15 @@ class HotTagsCache:
         """
         if not self._loaded:
             return 0.0
-
-        # Rough estimation
-        # tags_list: ~1KB per tag
-        # indices: ~100 bytes per entry
-        tags_size = len(self._tags_list) * 1024  # bytes
-        index_size = (len(self._prefix_index) + len(self._translation_index)) * 100
-
-        total_bytes = tags_size + index_size
-        return total_bytes / (1024 * 1024)  # Convert to MB
+        return self.get_memory_stats()['bytes'] / (1024 * 1024)
 
     def _get_cached_query_result(self, cache_key: str) -> Optional[List[Dict]]:
         """Get cached query result if valid"""
-        if cache_key in self._query_result_cache:
-            cached_time, cached_results = self._query_result_cache[cache_key]
-            # Check TTL
-            if time.time() - cached_time < self._query_cache_ttl:
-                return cached_results
-            else:
-                # Expired, remove from cache
-                del self._query_result_cache[cache_key]
-        return None
+        return self._query_result_cache.get(cache_key)
 
     def _cache_query_result(self, cache_key: str, results: List[Dict]) -> None:
         """Cache query result with LRU eviction"""
-        self._query_result_cache[cache_key] = (time.time(), results)
-
-        # LRU eviction
-        if len(self._query_result_cache) > self._query_cache_size:
-            # Remove oldest entry
-            oldest_key = min(
-                self._query_result_cache.items(),
-                key=lambda x: x[1][0]
-            )[0]
-            del self._query_result_cache[oldest_key]
+        self._query_result_cache.put(cache_key, results)
 
 
 # ==================== Factory Function (Singleton Pattern) ====================
@@ -0,0 +1,101 @@
+"""
+Versioned response cache
+Bounded LRU of serialized (UTF-8 encoded) autocomplete responses, invalidated by the tag database generation
+"""
+
+import threading
+from typing import Dict, Hashable, Optional
+
+from .lru_cache import LRUCache
+
+# Logger导入
+from ...utils.logger import get_logger
+logger = get_logger(__name__)
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized response bodies
+
+    Every entry is stamped with the database generation it was computed from.
+    A lookup with a newer generation treats the entry as missing, so bumping
+    the generation after a sync commit invalidates the whole cache at once
+    without clearing it under a lock.
+    """
+
+    def __init__(self, max_entries: int = 2000):
+        """
+        Args:
+            max_entries: Maximum number of cached responses
+        """
+        self.max_entries = max_entries
+        # Entries are (generation, body), weighted by body size
+        self._cache = LRUCache("autocomplete_responses", max_entries=max_entries,
+                               sizeof=lambda entry: len(entry[1]))
+        self._stale = 0
+
+    def get(self, key: Hashable, generation: int) -> Optional[bytes]:
+        """
+        Get cached body
+
+        Args:
+            key: Cache key, e.g. (route, query, limit)
+            generation: Current database generation
+
+        Returns:
+            Cached body or None
+        """
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+
+        entry_generation, body = entry
+        if entry_generation != generation:
+            # Computed before the last sync, drop it
+            self._cache.pop(key)
+            self._stale += 1
+            return None
+
+        return body
+
+    def put(self, key: Hashable, generation: int, body: bytes):
+        """Store body computed at the given database generation"""
+        self._cache.put(key, (generation, body))
+
+    def clear(self):
+        """Remove all entries (statistics are kept)"""
+        self._cache.clear()
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        stats = self._cache.get_stats()
+        # Stale entries were found by the LRU but are misses for the caller
+        hits = stats['hits'] - self._stale
+        misses = stats['misses'] + self._stale
+        lookups = hits + misses
+        return {
+            'entries': stats['entries'],
+            'max_entries': self.max_entries,
+            'bytes': stats['bytes'],
+            'hits': hits,
+            'misses': misses,
+            'stale': self._stale,
+            'evictions': stats['evictions'],
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
+
+
+# ==================== Factory Function (Singleton Pattern) ====================
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get global autocomplete response cache singleton"""
+    global _response_cache
+
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
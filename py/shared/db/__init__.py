@@ -1,5 +1,9 @@
 """Database management module"""
 
 from .db_manager import TagDatabaseManager, get_db_manager
+from .tag_record import TagRecord, dump_autocomplete, dump_search_results
+from .cooccurrence import (CooccurrenceCollector, get_cooccurrence_collector,
+                           flush_cooccurrence, rank_related_tags)
 
-__all__ = ['TagDatabaseManager', 'get_db_manager']
+__all__ = ['TagDatabaseManager', 'get_db_manager', 'TagRecord', 'dump_autocomplete', 'dump_search_results',
+           'CooccurrenceCollector', 'get_cooccurrence_collector', 'flush_cooccurrence', 'rank_related_tags']
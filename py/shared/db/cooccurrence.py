@@ -0,0 +1,251 @@
+"""
+Tag co-occurrence collection and related-tag ranking
+Learns which tags appear together from posts the gallery already fetched,
+so related tags can be suggested without any network request
+"""
+
+import asyncio
+import heapq
+import json
+import threading
+from collections import OrderedDict, defaultdict, deque
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ...utils.memory_stats import deep_sizeof, register_memory_source
+
+# Logger导入
+from ...utils.logger import get_logger
+logger = get_logger(__name__)
+
+
+class CooccurrenceCollector:
+    """
+    Buffer of fetched post responses waiting to be counted
+
+    Recording only appends the raw response text, JSON parsing and pair
+    counting happen in flush (off the request path, in a worker thread).
+    Posts are deduplicated by id because the same post shows up on many pages.
+    """
+
+    # Tag groups counted per post; artist and meta tags are rarely useful suggestions
+    TAG_FIELDS = ('tag_string_general', 'tag_string_character', 'tag_string_copyright')
+    # Posts with more tags than this only count their first MAX_TAGS_PER_POST (pairs grow quadratically)
+    MAX_TAGS_PER_POST = 64
+
+    def __init__(self, max_pending: int = 200, max_seen_posts: int = 100000):
+        """
+        Args:
+            max_pending: Maximum buffered responses (oldest dropped first)
+            max_seen_posts: Number of recent post ids remembered for deduplication
+        """
+        self._pending: deque = deque(maxlen=max_pending)
+        self._seen_posts: "OrderedDict[int, None]" = OrderedDict()
+        self._max_seen_posts = max_seen_posts
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered responses"""
+        return len(self._pending)
+
+    def add_posts_json(self, posts_json: str):
+        """Buffer a raw /posts.json response (called from request handlers on any thread)"""
+        if posts_json and posts_json != "[]":
+            with self._lock:
+                self._pending.append(posts_json)
+
+    def get_memory_stats(self) -> Dict:
+        """Measured size of buffered responses and remembered post ids"""
+        with self._lock:
+            pending = deep_sizeof(list(self._pending))
+            seen_posts = deep_sizeof(self._seen_posts)
+        return {'bytes': pending + seen_posts, 'pending_responses': len(self._pending),
+                'pending_bytes': pending, 'seen_posts': len(self._seen_posts)}
+
+    def _drain(self) -> List[str]:
+        """Take all buffered responses"""
+        with self._lock:
+            items = list(self._pending)
+            self._pending.clear()
+            return items
+
+    def _is_new_post(self, post_id) -> bool:
+        """Check and remember post id (bounded LRU set)"""
+        if post_id is None:
+            return True
+        with self._lock:
+            if post_id in self._seen_posts:
+                return False
+            self._seen_posts[post_id] = None
+            if len(self._seen_posts) > self._max_seen_posts:
+                self._seen_posts.popitem(last=False)
+            return True
+
+    def _post_tags(self, post: Dict) -> List[str]:
+        """Extract countable tags from a post"""
+        if any(field in post for field in self.TAG_FIELDS):
+            tags = []
+            for field in self.TAG_FIELDS:
+                tags.extend((post.get(field) or '').split())
+        else:
+            tags = (post.get('tag_string') or '').split()
+        # Deduplicate and sort so every pair has one canonical order
+        return sorted(set(tags[:self.MAX_TAGS_PER_POST]))
+
+    def count_pending(self, max_neighbors: Optional[int] = None) -> Tuple[Dict[Tuple[str, str], int], int]:
+        """
+        Count tag pairs of all buffered posts (CPU bound, run in a worker thread)
+
+        Args:
+            max_neighbors: Keep only the most frequent neighbours per tag from this batch.
+                The database keeps a top-N list anyway, so this bounds the rows written
+                per flush at the cost of dropping rare pairs a little earlier.
+
+        Returns:
+            ({(tag, neighbor): count} in both directions plus (tag, tag) post counts, posts counted)
+        """
+        counts: Dict[Tuple[str, str], int] = {}
+        posts_counted = 0
+
+        for posts_json in self._drain():
+            try:
+                posts = json.loads(posts_json)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(posts, list):
+                continue
+
+            for post in posts:
+                if not isinstance(post, dict) or not self._is_new_post(post.get('id')):
+                    continue
+                tags = self._post_tags(post)
+                if not tags:
+                    continue
+                posts_counted += 1
+
+                # Diagonal: number of posts containing the tag
+                for tag in tags:
+                    key = (tag, tag)
+                    counts[key] = counts.get(key, 0) + 1
+                for a, b in combinations(tags, 2):
+                    counts[(a, b)] = counts.get((a, b), 0) + 1
+                    counts[(b, a)] = counts.get((b, a), 0) + 1
+
+        if max_neighbors is not None:
+            counts = self._truncate_neighbors(counts, max_neighbors)
+        return counts, posts_counted
+
+    @staticmethod
+    def _truncate_neighbors(counts: Dict[Tuple[str, str], int],
+                            max_neighbors: int) -> Dict[Tuple[str, str], int]:
+        """Keep diagonal rows and the max_neighbors largest pair counts of every tag"""
+        by_tag = defaultdict(list)
+        for (tag, neighbor), count in counts.items():
+            if tag != neighbor:
+                by_tag[tag].append((count, neighbor))
+
+        truncated = {key: count for key, count in counts.items() if key[0] == key[1]}
+        for tag, neighbors in by_tag.items():
+            if len(neighbors) > max_neighbors:
+                neighbors = heapq.nlargest(max_neighbors, neighbors)
+            for count, neighbor in neighbors:
+                truncated[(tag, neighbor)] = count
+        return truncated
+
+
+async def flush_cooccurrence(db_manager, collector: Optional[CooccurrenceCollector] = None) -> int:
+    """
+    Count buffered posts and merge the pair counts into the database
+
+    Args:
+        db_manager: TagDatabaseManager instance
+        collector: Collector to flush (default: global collector)
+
+    Returns:
+        Number of posts counted
+    """
+    collector = collector or get_cooccurrence_collector()
+    if not collector.pending:
+        return 0
+
+    counts, posts_counted = await asyncio.to_thread(
+        collector.count_pending, db_manager.COOCCURRENCE_TOP_N * 2)
+    if counts:
+        tags_touched = await db_manager.add_cooccurrence_counts(counts)
+        logger.debug(f"共现索引已更新: {posts_counted} 个帖子, {tags_touched} 个标签")
+    return posts_counted
+
+
+def rank_related_tags(rows: Iterable[Tuple[str, str, int]],
+                      input_tags: Sequence[str],
+                      limit: int = 20) -> List[Tuple[str, float]]:
+    """
+    Merge neighbour lists of several tags into one ranking
+
+    The score of a candidate is its mean conditional probability
+    P(candidate | input tag) over the input tags, so tags related to all
+    selected tags rank above tags related to just one of them.
+
+    Args:
+        rows: (tag, neighbor, count) rows for the input tags, including diagonal rows
+        input_tags: Selected tags (excluded from the result)
+        limit: Maximum number of results
+
+    Returns:
+        List of (tag, score) sorted by score
+    """
+    rows = list(rows)
+    post_counts = {tag: count for tag, neighbor, count in rows if tag == neighbor}
+    if not post_counts or limit <= 0:
+        return []
+
+    # Columnar arrays: candidate ids, counts and the post count of each row's input tag
+    excluded = set(input_tags)
+    candidate_ids: Dict[str, int] = {}
+    neighbor_index, counts, totals = [], [], []
+    for tag, neighbor, count in rows:
+        total = post_counts.get(tag)
+        if not total or neighbor in excluded:
+            continue
+        neighbor_index.append(candidate_ids.setdefault(neighbor, len(candidate_ids)))
+        counts.append(count)
+        totals.append(total)
+    if not candidate_ids:
+        return []
+
+    # Sum P(candidate | input tag) per candidate in one pass, mean over the input tags we have data for
+    scores = np.bincount(np.asarray(neighbor_index, dtype=np.int64),
+                         weights=np.asarray(counts, dtype=np.float64) / np.asarray(totals, dtype=np.float64),
+                         minlength=len(candidate_ids)) / len(post_counts)
+
+    # Top `limit` scores without sorting every candidate; ties at the cut are kept
+    # and resolved by name below, so the result does not depend on partition order
+    if len(scores) > limit:
+        threshold = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+        selected = np.flatnonzero(scores >= threshold)
+    else:
+        selected = np.arange(len(scores))
+
+    names = list(candidate_ids)
+    ranked = sorted(((names[i], float(scores[i])) for i in selected), key=lambda item: (-item[1], item[0]))
+    return ranked[:limit]
+
+
+# ==================== Factory Function (Singleton Pattern) ====================
+
+_collector: Optional[CooccurrenceCollector] = None
+_collector_lock = threading.Lock()
+
+
+def get_cooccurrence_collector() -> CooccurrenceCollector:
+    """Get global co-occurrence collector singleton"""
+    global _collector
+
+    with _collector_lock:
+        if _collector is None:
+            _collector = CooccurrenceCollector()
+            register_memory_source("cooccurrence_collector", _collector.get_memory_stats)
+        return _collector
@@ -4,20 +4,77 @@ Manages SQLite database for offline tag autocomplete
 """
 
 import aiosqlite
+import math
 import os
+import re
+import sqlite3
 import time
 import json
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple, Callable
 from pathlib import Path
 
+from .tag_record import TagRecord
+
 # Logger导入
 from ...utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+def _prefix_upper_bound(prefix: str) -> str:
+    """
+    Get exclusive upper bound for a prefix range scan
+
+    `key >= prefix AND key < upper` selects exactly the keys starting with prefix
+    and lets SQLite use an index range scan instead of LIKE.
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _log10(value) -> float:
+    """log10 fallback for SQLite builds compiled without math functions"""
+    return math.log10(value) if value and value > 0 else 0.0
+
+
+# Aliases of hot_tags row "h" from the normalized tag_aliases table, joined
+# with ALIAS_SEPARATOR so result rows never need JSON decoding
+_ALIASES_COLUMN = "(SELECT group_concat(alias, char(31)) FROM tag_aliases WHERE tag = h.tag)"
+
+
+# The trigram tokenizer (SQLite 3.34+) indexes every 3-character window, so
+# MATCH finds Chinese substrings that unicode61 cannot segment
+FTS_TOKENIZER = 'trigram' if sqlite3.sqlite_version_info >= (3, 34, 0) else 'unicode61'
+
+
 class TagDatabaseManager:
     """Manage hot tags database for offline autocomplete"""
 
+    # Prefixes up to this length are served from the materialized top-K table,
+    # longer prefixes match few enough tags for a direct index range scan
+    PREFIX_TOPK_MAX_LENGTH = 2
+    PREFIX_TOPK_SIZE = 50
+
+    # Read-only connections used by autocomplete/search queries.
+    # Each aiosqlite connection owns one worker thread, so queries spread over
+    # the pool run in parallel and never queue behind sync writes (WAL mode).
+    READER_POOL_SIZE = 3
+
+    # PRAGMAs applied to every connection
+    CACHE_SIZE_KB = 16384            # 16 MB page cache per connection
+    MMAP_SIZE = 256 * 1024 * 1024    # Memory-map up to 256 MB of the database
+    BUSY_TIMEOUT_MS = 5000
+
+    # Chinese queries shorter than a trigram are answered from the
+    # translation_grams table (every 1-2 character substring -> tag)
+    SHORT_GRAM_MAX_LENGTH = 2
+    # Weight of log10(post_count) against bm25 when ranking substring matches
+    FTS_POPULARITY_WEIGHT = 1.0
+
+    # Rows per fetchmany call when streaming whole-table reads
+    FETCH_CHUNK_SIZE = 5000
+
+    # Neighbours kept per tag in tag_cooccurrence (lowest counts are pruned)
+    COOCCURRENCE_TOP_N = 50
+
     def __init__(self, db_path: Optional[str] = None):
         if db_path is None:
             # Default to py/shared/data/tags_cache.db
@@ -29,38 +86,107 @@ class TagDatabaseManager:
             db_path = str(data_dir / "tags_cache.db")
 
         self.db_path = db_path
-        self._connection = None
+        self._connection = None  # Dedicated writer connection
+        self._readers: List[aiosqlite.Connection] = []
+        self._reader_index = 0
+        # Incremented after each committed sync, stamps cached query responses
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """Data generation, changes whenever synced tag data was committed"""
+        return self._generation
+
+    def bump_generation(self) -> int:
+        """Mark tag data as changed so cached responses computed earlier are discarded"""
+        self._generation += 1
+        logger.debug(f"Tag database generation -> {self._generation}")
+        return self._generation
+
+    async def _apply_pragmas(self, conn: aiosqlite.Connection, read_only: bool = False):
+        """Apply performance PRAGMAs to a connection"""
+        await conn.execute(f"PRAGMA cache_size = -{self.CACHE_SIZE_KB}")
+        await conn.execute(f"PRAGMA mmap_size = {self.MMAP_SIZE}")
+        await conn.execute(f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}")
+        await conn.execute("PRAGMA temp_store = MEMORY")
+        if read_only:
+            await conn.execute("PRAGMA query_only = ON")
+        else:
+            # Only takes effect on new databases (or after VACUUM), lets
+            # maintenance return free pages with incremental_vacuum
+            await conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            # WAL lets readers run concurrently with the writer;
+            # NORMAL sync is durable in WAL mode except on power loss
+            await conn.execute("PRAGMA journal_mode = WAL")
+            await conn.execute("PRAGMA synchronous = NORMAL")
+
+        try:
+            await conn.execute("SELECT log10(1)")
+        except sqlite3.OperationalError:
+            await conn.create_function("log10", 1, _log10, deterministic=True)
 
     async def get_connection(self) -> aiosqlite.Connection:
-        """Get or create database connection"""
+        """Get or create the writer connection (schema changes, inserts, sync)"""
         if self._connection is None:
             self._connection = await aiosqlite.connect(self.db_path)
             self._connection.row_factory = aiosqlite.Row
+            await self._apply_pragmas(self._connection)
         return self._connection
 
+    async def get_read_connection(self) -> aiosqlite.Connection:
+        """
+        Get a read-only connection from the reader pool (round-robin)
+
+        Falls back to the writer connection if the pool cannot be opened.
+        """
+        if not self._readers:
+            # Writer first: creates the database file and switches it to WAL
+            writer = await self.get_connection()
+            try:
+                readers = []
+                for _ in range(self.READER_POOL_SIZE):
+                    reader = await aiosqlite.connect(f"file:{self.db_path}?mode=ro", uri=True)
+                    reader.row_factory = aiosqlite.Row
+                    await self._apply_pragmas(reader, read_only=True)
+                    readers.append(reader)
+            except Exception as e:
+                logger.warning(f"Reader pool unavailable, using writer connection: {e}")
+                for reader in readers:
+                    await reader.close()
+                return writer
+
+            if self._readers:
+                # Another coroutine filled the pool meanwhile
+                for reader in readers:
+                    await reader.close()
+            else:
+                self._readers = readers
+
+        self._reader_index = (self._reader_index + 1) % len(self._readers)
+        return self._readers[self._reader_index]
+
     async def close(self):
-        """Close database connection"""
+        """Close writer and reader connections"""
+        readers, self._readers = self._readers, []
+        for reader in readers:
+            await reader.close()
         if self._connection:
             await self._connection.close()
             self._connection = None
 
-    async def initialize_database(self):
-        """Create database tables if they don't exist"""
-        conn = await self.get_connection()
+    def delete_database_files(self):
+        """Delete database file together with its WAL/shared-memory files (connections must be closed)"""
+        for suffix in ("", "-wal", "-shm"):
+            path = self.db_path + suffix
+            if os.path.exists(path):
+                os.remove(path)
 
-        # Create hot_tags table
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS hot_tags (
-                tag TEXT PRIMARY KEY,
-                category INTEGER NOT NULL,
-                post_count INTEGER NOT NULL,
-                translation_cn TEXT,
-                last_updated INTEGER NOT NULL,
-                aliases TEXT
-            )
-        """)
+    # Secondary indexes on hot_tags (dropped during bulk load, rebuilt afterwards)
+    _HOT_TAGS_INDEXES = ('idx_post_count', 'idx_category', 'idx_translation')
+    _FTS_TRIGGERS = ('hot_tags_ai', 'hot_tags_au', 'hot_tags_ad')
 
-        # Create indexes for performance
+    async def _create_indexes(self, conn: aiosqlite.Connection):
+        """Create secondary indexes on hot_tags"""
         await conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_post_count
             ON hot_tags(post_count DESC)
@@ -76,34 +202,28 @@ class TagDatabaseManager:
             ON hot_tags(translation_cn)
         """)
 
-        # Create FTS5 virtual table for full-text search (优化中文搜索性能)
-        await conn.execute("""
-            CREATE VIRTUAL TABLE IF NOT EXISTS hot_tags_fts USING fts5(
-                tag,
-                translation_cn,
-                content='hot_tags',
-                content_rowid='rowid',
-                tokenize='unicode61'
-            )
-        """)
+    async def _create_fts_triggers(self, conn: aiosqlite.Connection):
+        """Create triggers that keep hot_tags_fts in sync with hot_tags"""
+        # External-content FTS5 tables must be told the old values to remove,
+        # a plain DELETE/UPDATE on hot_tags_fts would leave stale tokens behind
 
-        # Create triggers to keep FTS index in sync
         # Trigger for INSERT
         await conn.execute("""
             CREATE TRIGGER IF NOT EXISTS hot_tags_ai
             AFTER INSERT ON hot_tags BEGIN
-                INSERT INTO hot_tags_fts(rowid, tag, translation_cn)
-                VALUES (NEW.rowid, NEW.tag, NEW.translation_cn);
+                INSERT INTO hot_tags_fts(rowid, translation_cn)
+                VALUES (NEW.rowid, NEW.translation_cn);
             END
         """)
 
         # Trigger for UPDATE
         await conn.execute("""
             CREATE TRIGGER IF NOT EXISTS hot_tags_au
-            AFTER UPDATE ON hot_tags BEGIN
-                UPDATE hot_tags_fts
-                SET tag = NEW.tag, translation_cn = NEW.translation_cn
-                WHERE rowid = NEW.rowid;
+            AFTER UPDATE OF translation_cn ON hot_tags BEGIN
+                INSERT INTO hot_tags_fts(hot_tags_fts, rowid, translation_cn)
+                VALUES ('delete', OLD.rowid, OLD.translation_cn);
+                INSERT INTO hot_tags_fts(rowid, translation_cn)
+                VALUES (NEW.rowid, NEW.translation_cn);
             END
         """)
 
@@ -111,10 +231,122 @@ class TagDatabaseManager:
         await conn.execute("""
             CREATE TRIGGER IF NOT EXISTS hot_tags_ad
             AFTER DELETE ON hot_tags BEGIN
-                DELETE FROM hot_tags_fts WHERE rowid = OLD.rowid;
+                INSERT INTO hot_tags_fts(hot_tags_fts, rowid, translation_cn)
+                VALUES ('delete', OLD.rowid, OLD.translation_cn);
             END
         """)
 
+    async def _populate_fts(self, conn: aiosqlite.Connection):
+        """Repopulate hot_tags_fts from hot_tags in one statement (caller commits)"""
+        # 'delete-all' is the correct way to empty an external-content FTS5 table
+        await conn.execute("INSERT INTO hot_tags_fts(hot_tags_fts) VALUES('delete-all')")
+        await conn.execute("""
+            INSERT INTO hot_tags_fts(rowid, translation_cn)
+            SELECT rowid, translation_cn FROM hot_tags
+        """)
+
+    async def _populate_short_grams(self, conn: aiosqlite.Connection,
+                                    tags: Optional[List[str]] = None):
+        """
+        Repopulate translation_grams from hot_tags (caller commits)
+
+        Args:
+            conn: Writer connection
+            tags: Only replace the grams of these tags (None = all tags)
+        """
+        if tags is None:
+            await conn.execute("DELETE FROM translation_grams")
+            tag_filter, params = "", ()
+        else:
+            tags_json = json.dumps(tags)
+            await conn.execute("""
+                DELETE FROM translation_grams
+                WHERE tag IN (SELECT value FROM json_each(?))
+            """, (tags_json,))
+            tag_filter, params = "AND h.tag IN (SELECT value FROM json_each(?))", (tags_json,)
+
+        await conn.execute(f"""
+            WITH RECURSIVE pos(i) AS (
+                SELECT 1
+                UNION ALL
+                SELECT i + 1 FROM pos
+                WHERE i < (SELECT MAX(length(translation_cn)) FROM hot_tags)
+            ),
+            gram_len(n) AS (
+                SELECT 1
+                UNION ALL
+                SELECT n + 1 FROM gram_len WHERE n < ?
+            )
+            INSERT OR IGNORE INTO translation_grams (gram, post_count, tag)
+            SELECT substr(h.translation_cn, pos.i, gram_len.n), h.post_count, h.tag
+            FROM hot_tags h
+            JOIN pos ON pos.i <= length(h.translation_cn)
+            JOIN gram_len ON pos.i + gram_len.n - 1 <= length(h.translation_cn)
+            WHERE h.translation_cn IS NOT NULL AND h.translation_cn != ''
+              {tag_filter}
+        """, (self.SHORT_GRAM_MAX_LENGTH, *params))
+
+    async def _migrate_fts_schema(self, conn: aiosqlite.Connection) -> bool:
+        """
+        Drop hot_tags_fts and its triggers if they were created with another tokenizer or layout
+
+        Returns:
+            True if the FTS table was dropped and must be rebuilt
+        """
+        cursor = await conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='hot_tags_fts'"
+        )
+        row = await cursor.fetchone()
+        if not row or not row[0]:
+            return False
+
+        schema = row[0]
+        # Current layout indexes translation_cn only (English tags use prefix range scans)
+        has_tag_column = re.search(r'fts5\(\s*tag\s*,', schema) is not None
+        if f"tokenize='{FTS_TOKENIZER}'" in schema and not has_tag_column:
+            return False
+
+        logger.info(f"🔧 Migrating FTS5 index to tokenize='{FTS_TOKENIZER}'...")
+        for trigger in self._FTS_TRIGGERS:
+            await conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        await conn.execute("DROP TABLE hot_tags_fts")
+        return True
+
+    async def initialize_database(self):
+        """Create database tables if they don't exist"""
+        conn = await self.get_connection()
+
+        # Create hot_tags table
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS hot_tags (
+                tag TEXT PRIMARY KEY,
+                category INTEGER NOT NULL,
+                post_count INTEGER NOT NULL,
+                translation_cn TEXT,
+                last_updated INTEGER NOT NULL,
+                aliases TEXT
+            )
+        """)
+
+        # Create indexes for performance
+        await self._create_indexes(conn)
+
+        # Old databases used tokenize='unicode61', which cannot find Chinese substrings
+        needs_fts_rebuild = await self._migrate_fts_schema(conn)
+
+        # Create FTS5 virtual table for Chinese substring search (优化中文搜索性能)
+        await conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS hot_tags_fts USING fts5(
+                translation_cn,
+                content='hot_tags',
+                content_rowid='rowid',
+                tokenize='{FTS_TOKENIZER}'
+            )
+        """)
+
+        # Create triggers to keep FTS index in sync
+        await self._create_fts_triggers(conn)
+
         # Create sync_metadata table
         await conn.execute("""
             CREATE TABLE IF NOT EXISTS sync_metadata (
@@ -124,9 +356,113 @@ class TagDatabaseManager:
             )
         """)
 
+        # Create materialized top-K table for short English prefixes
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS prefix_topk (
+                prefix TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (prefix, rank)
+            ) WITHOUT ROWID
+        """)
+
+        # Create pinyin index table (full pinyin and initials -> tag)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS pinyin_index (
+                key TEXT NOT NULL,
+                kind INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                translation_cn TEXT NOT NULL,
+                post_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (key, tag)
+            ) WITHOUT ROWID
+        """)
+
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_pinyin_index_tag
+            ON pinyin_index(tag)
+        """)
+
+        # Create normalized alias table (alias -> canonical tag), the primary key
+        # doubles as the alias prefix index and idx_tag_aliases_tag serves lookups by tag
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS tag_aliases (
+                alias TEXT NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (alias, tag)
+            ) WITHOUT ROWID
+        """)
+
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tag_aliases_tag
+            ON tag_aliases(tag)
+        """)
+
+        # Create tables for active Danbooru tag aliases and implications
+        # (imported by the sync, merged into tag_aliases by refresh_alias_index)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS remote_tag_aliases (
+                alias TEXT PRIMARY KEY,
+                tag TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS tag_implications (
+                antecedent TEXT NOT NULL,
+                consequent TEXT NOT NULL,
+                PRIMARY KEY (antecedent, consequent)
+            ) WITHOUT ROWID
+        """)
+
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tag_implications_consequent
+            ON tag_implications(consequent)
+        """)
+
+        # Create 1-2 character substring index for queries too short for trigrams
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS translation_grams (
+                gram TEXT NOT NULL,
+                post_count INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (gram, post_count DESC, tag)
+            ) WITHOUT ROWID
+        """)
+
+        # Lets delta syncs replace the grams of changed tags only
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_translation_grams_tag
+            ON translation_grams(tag)
+        """)
+
+        # Create sparse co-occurrence table learned from fetched posts:
+        # top-N neighbours per tag, the diagonal row (tag, tag) holds the tag's post count
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS tag_cooccurrence (
+                tag TEXT NOT NULL,
+                neighbor TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (tag, neighbor)
+            ) WITHOUT ROWID
+        """)
+
+        # Create full-sync journal: one row per page committed by the running
+        # generation (described by sync_metadata 'sync_progress'), used to resume
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_journal (
+                page INTEGER PRIMARY KEY,
+                tag_count INTEGER NOT NULL,
+                committed_at INTEGER NOT NULL
+            )
+        """)
+
         await conn.commit()
         logger.info(f"✓ Database initialized at {self.db_path}")
-        logger.info(f"✓ FTS5 full-text search enabled")
+        logger.info(f"✓ FTS5 full-text search enabled (tokenize='{FTS_TOKENIZER}')")
+
+        if needs_fts_rebuild:
+            await self.rebuild_fts_index()
 
     async def insert_tag(self, tag: str, category: int, post_count: int,
                         translation_cn: Optional[str] = None,
@@ -137,11 +473,20 @@ class TagDatabaseManager:
         aliases_json = json.dumps(aliases) if aliases else None
         current_time = int(time.time())
 
+        # Tags are stored lowercase so prefix queries can use a plain index range scan.
+        # UPSERT keeps the rowid and fires the UPDATE trigger, REPLACE would
+        # silently delete the old row without updating hot_tags_fts
         await conn.execute("""
-            INSERT OR REPLACE INTO hot_tags
+            INSERT INTO hot_tags
             (tag, category, post_count, translation_cn, last_updated, aliases)
             VALUES (?, ?, ?, ?, ?, ?)
-        """, (tag, category, post_count, translation_cn, current_time, aliases_json))
+            ON CONFLICT(tag) DO UPDATE SET
+                category = excluded.category,
+                post_count = excluded.post_count,
+                translation_cn = excluded.translation_cn,
+                last_updated = excluded.last_updated,
+                aliases = excluded.aliases
+        """, (tag.lower(), category, post_count, translation_cn, current_time, aliases_json))
 
     async def insert_tags_batch(self, tags: List[Dict]):
         """Insert multiple tags in batch"""
@@ -152,7 +497,7 @@ class TagDatabaseManager:
         for tag_info in tags:
             aliases_json = json.dumps(tag_info.get('aliases')) if tag_info.get('aliases') else None
             data.append((
-                tag_info['tag'],
+                tag_info['tag'].lower(),
                 tag_info['category'],
                 tag_info['post_count'],
                 tag_info.get('translation_cn'),
@@ -161,75 +506,477 @@ class TagDatabaseManager:
             ))
 
         await conn.executemany("""
-            INSERT OR REPLACE INTO hot_tags
+            INSERT INTO hot_tags
             (tag, category, post_count, translation_cn, last_updated, aliases)
             VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(tag) DO UPDATE SET
+                category = excluded.category,
+                post_count = excluded.post_count,
+                translation_cn = excluded.translation_cn,
+                last_updated = excluded.last_updated,
+                aliases = excluded.aliases
         """, data)
 
         await conn.commit()
 
-    async def search_tags_by_prefix(self, prefix: str, limit: int = 10) -> List[Dict]:
-        """Search tags by prefix"""
+    async def upsert_changed_tags(self, tags: List[Dict],
+                                  journal_page: Optional[int] = None,
+                                  changed_tags: Optional[Set[str]] = None) -> Dict[str, int]:
+        """
+        Write only the tags that are new or differ from the stored row
+
+        Unchanged rows are not written at all. Rows whose translation is
+        unchanged are updated without touching translation_cn, so the FTS
+        update trigger only fires for real translation changes. Stored
+        aliases are kept.
+
+        Args:
+            tags: Tag dictionaries (same format as insert_tags_batch)
+            journal_page: Record this page in sync_journal in the same transaction
+            changed_tags: Set collecting the names of inserted and updated tags
+                (for refreshing their derived search index rows)
+
+        Returns:
+            Dict with inserted, updated and unchanged counts
+        """
         conn = await self.get_connection()
+        current_time = int(time.time())
 
+        incoming = {tag_info['tag'].lower(): tag_info for tag_info in tags}
         cursor = await conn.execute("""
-            SELECT tag, category, post_count, translation_cn, aliases
+            SELECT tag, category, post_count, translation_cn
             FROM hot_tags
-            WHERE tag LIKE ? || '%'
-            ORDER BY post_count DESC
-            LIMIT ?
-        """, (prefix.lower(), limit))
+            WHERE tag IN (SELECT value FROM json_each(?))
+        """, (json.dumps(list(incoming)),))
+        existing = {row[0]: row[1:] for row in await cursor.fetchall()}
+
+        inserts, translation_updates, count_updates = [], [], []
+        for tag, tag_info in incoming.items():
+            category, post_count = tag_info['category'], tag_info['post_count']
+            translation = tag_info.get('translation_cn')
+
+            stored = existing.get(tag)
+            if stored is None:
+                aliases_json = json.dumps(tag_info.get('aliases')) if tag_info.get('aliases') else None
+                inserts.append((tag, category, post_count, translation, current_time, aliases_json))
+            elif stored[2] != translation:
+                translation_updates.append((category, post_count, translation, current_time, tag))
+            elif stored[0] != category or stored[1] != post_count:
+                count_updates.append((category, post_count, current_time, tag))
+
+        if inserts:
+            await conn.executemany("""
+                INSERT INTO hot_tags
+                (tag, category, post_count, translation_cn, last_updated, aliases)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, inserts)
+        if translation_updates:
+            await conn.executemany("""
+                UPDATE hot_tags
+                SET category = ?, post_count = ?, translation_cn = ?, last_updated = ?
+                WHERE tag = ?
+            """, translation_updates)
+        if count_updates:
+            await conn.executemany("""
+                UPDATE hot_tags
+                SET category = ?, post_count = ?, last_updated = ?
+                WHERE tag = ?
+            """, count_updates)
+        if journal_page is not None:
+            await conn.execute("""
+                INSERT OR REPLACE INTO sync_journal (page, tag_count, committed_at)
+                VALUES (?, ?, ?)
+            """, (journal_page, len(incoming), current_time))
+        await conn.commit()
 
-        rows = await cursor.fetchall()
+        if changed_tags is not None:
+            changed_tags.update(row[0] for row in inserts)
+            changed_tags.update(row[-1] for row in translation_updates)
+            changed_tags.update(row[-1] for row in count_updates)
+
+        updated = len(translation_updates) + len(count_updates)
+        return {
+            'inserted': len(inserts),
+            'updated': updated,
+            'unchanged': len(incoming) - len(inserts) - updated,
+        }
+
+    async def bulk_load_tags(self, tags: List[Dict],
+                             chunk_size: int = 5000,
+                             progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Bulk-load tags into an empty or replaced database (dump import)
 
-        results = []
-        for row in rows:
-            results.append({
-                'tag': row['tag'],
-                'category': row['category'],
-                'post_count': row['post_count'],
-                'translation_cn': row['translation_cn'],
-                'aliases': json.loads(row['aliases']) if row['aliases'] else []
-            })
+        Full syncs do not use this path any more: they upsert and journal page
+        by page (upsert_changed_tags) so an interrupted crawl can resume.
+        Everything runs in a single transaction: FTS triggers and secondary
+        indexes are dropped, rows are inserted, then the FTS5 index is filled
+        with one INSERT ... SELECT, optimized, and triggers/indexes are
+        recreated. On error (or cancellation raised by progress_callback) the
+        transaction is rolled back and the database is left untouched.
 
-        return results
+        Args:
+            tags: Tag dictionaries (same format as insert_tags_batch)
+            chunk_size: Rows per executemany call (progress granularity)
+            progress_callback: Callback(inserted_count, total_count)
 
-    async def search_tags_by_translation(self, query: str, limit: int = 10) -> List[Dict]:
-        """Search tags by Chinese translation (legacy method, use search_tags_optimized for better performance)"""
+        Returns:
+            Number of rows loaded
+        """
         conn = await self.get_connection()
+        current_time = int(time.time())
+        total = len(tags)
 
-        # Search with different matching strategies
-        cursor = await conn.execute("""
-            SELECT tag, category, post_count, translation_cn, aliases,
-                CASE
-                    WHEN translation_cn = ? THEN 10
-                    WHEN translation_cn LIKE ? || '%' THEN 8
-                    WHEN translation_cn LIKE '%' || ? || '%' THEN 4
-                    ELSE 2
-                END as match_score
-            FROM hot_tags
-            WHERE translation_cn LIKE '%' || ? || '%'
-            ORDER BY match_score DESC, post_count DESC
+        await conn.execute("BEGIN")
+        try:
+            # Suspend per-row FTS triggers and index maintenance
+            for trigger in self._FTS_TRIGGERS:
+                await conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            for index in self._HOT_TAGS_INDEXES:
+                await conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+            for i in range(0, total, chunk_size):
+                data = []
+                for tag_info in tags[i:i + chunk_size]:
+                    aliases_json = json.dumps(tag_info.get('aliases')) if tag_info.get('aliases') else None
+                    data.append((
+                        tag_info['tag'].lower(),
+                        tag_info['category'],
+                        tag_info['post_count'],
+                        tag_info.get('translation_cn'),
+                        current_time,
+                        aliases_json
+                    ))
+
+                await conn.executemany("""
+                    INSERT OR REPLACE INTO hot_tags
+                    (tag, category, post_count, translation_cn, last_updated, aliases)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, data)
+
+                if progress_callback:
+                    progress_callback(min(i + chunk_size, total), total)
+
+            # Build indexes once over the loaded data
+            await self._create_indexes(conn)
+
+            # Fill FTS5 in one pass and merge its segments
+            await self._populate_fts(conn)
+            await conn.execute("INSERT INTO hot_tags_fts(hot_tags_fts) VALUES('optimize')")
+
+            await self._create_fts_triggers(conn)
+            await conn.commit()
+
+        except BaseException:
+            await conn.rollback()
+            raise
+
+        logger.info(f"✓ Bulk-loaded {total} tags")
+        return total
+
+    async def _fetch_prefix_rows(self, conn: aiosqlite.Connection, prefix: str, limit: int) -> List:
+        """
+        Fetch hot_tags rows whose tag or one of its aliases starts with prefix, most popular first
+
+        Short prefixes are answered from the materialized prefix_topk table,
+        everything else uses `key >= prefix AND key < upper` range scans on the
+        tag and alias primary key indexes (LIKE is case-insensitive and cannot use them).
+        Rows carry matched_alias, NULL when the canonical tag itself matched.
+        """
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+        upper = _prefix_upper_bound(prefix)
+
+        if len(prefix) <= self.PREFIX_TOPK_MAX_LENGTH and limit <= self.PREFIX_TOPK_SIZE:
+            cursor = await conn.execute(f"""
+                SELECT h.tag, h.category, h.post_count, h.translation_cn,
+                       {_ALIASES_COLUMN} AS aliases,
+                       CASE WHEN h.tag >= ? AND h.tag < ? THEN NULL ELSE (
+                           SELECT MIN(a.alias) FROM tag_aliases a
+                           WHERE a.alias >= ? AND a.alias < ? AND a.tag = h.tag
+                       ) END AS matched_alias
+                FROM prefix_topk p
+                JOIN hot_tags h ON h.tag = p.tag
+                WHERE p.prefix = ?
+                ORDER BY p.rank
+                LIMIT ?
+            """, (prefix, upper, prefix, upper, prefix, limit))
+            rows = await cursor.fetchall()
+            if rows:
+                return rows
+            # Table not populated yet (or no tag with this prefix), use range scan
+
+        # Canonical and alias hits in one query, a tag matched both ways is returned once
+        cursor = await conn.execute(f"""
+            SELECT h.tag, h.category, h.post_count, h.translation_cn,
+                   {_ALIASES_COLUMN} AS aliases,
+                   CASE WHEN MAX(m.alias IS NULL) THEN NULL ELSE MIN(m.alias) END AS matched_alias
+            FROM (
+                SELECT tag, NULL AS alias FROM hot_tags
+                WHERE tag >= ? AND tag < ?
+                UNION ALL
+                SELECT tag, alias FROM tag_aliases
+                WHERE alias >= ? AND alias < ?
+            ) m
+            JOIN hot_tags h ON h.tag = m.tag
+            GROUP BY h.tag
+            ORDER BY h.post_count DESC
             LIMIT ?
-        """, (query, query, query, query, limit))
+        """, (prefix, upper, prefix, upper, limit))
 
-        rows = await cursor.fetchall()
+        return await cursor.fetchall()
+
+    async def search_tags_by_prefix(self, prefix: str, limit: int = 10) -> List[TagRecord]:
+        """Search tags by prefix"""
+        conn = await self.get_read_connection()
+
+        rows = await self._fetch_prefix_rows(conn, prefix, limit)
+
+        # Columns: tag, category, post_count, translation_cn, aliases, matched_alias
+        return [TagRecord(*row) for row in rows]
+
+    async def refresh_alias_index(self, tags: Optional[List[str]] = None) -> int:
+        """
+        Rebuild the normalized tag_aliases table from hot_tags.aliases and remote_tag_aliases
+        Call after tag sync, before refresh_prefix_topk (the top-K table includes alias prefixes)
+
+        Args:
+            tags: Only rebuild the aliases of these tags (None = all tags)
+
+        Returns:
+            Number of alias entries
+        """
+        conn = await self.get_connection()
+
+        if tags is None:
+            await conn.execute("DELETE FROM tag_aliases")
+            tag_filter, params = "", ()
+        else:
+            tags_json = json.dumps(tags)
+            await conn.execute("""
+                DELETE FROM tag_aliases
+                WHERE tag IN (SELECT value FROM json_each(?))
+            """, (tags_json,))
+            tag_filter, params = "AND h.tag IN (SELECT value FROM json_each(?))", (tags_json,)
+
+        await conn.execute(f"""
+            INSERT OR IGNORE INTO tag_aliases (alias, tag)
+            SELECT lower(j.value), h.tag
+            FROM hot_tags h, json_each(h.aliases) j
+            WHERE h.aliases IS NOT NULL AND json_valid(h.aliases)
+              AND j.type = 'text' AND lower(j.value) != h.tag
+              {tag_filter}
+        """, params)
+        # Imported aliases of tags in the database
+        await conn.execute(f"""
+            INSERT OR IGNORE INTO tag_aliases (alias, tag)
+            SELECT r.alias, r.tag
+            FROM remote_tag_aliases r
+            JOIN hot_tags h ON h.tag = r.tag
+            WHERE 1 {tag_filter}
+        """, params)
+        await conn.commit()
+
+        count = await self.get_alias_count()
+        if tags is None:
+            logger.info(f"✓ Alias index rebuilt with {count} entries")
+        else:
+            logger.info(f"✓ Alias index refreshed for {len(tags)} tags ({count} entries)")
+        return count
+
+    async def get_alias_count(self) -> int:
+        """Get number of alias entries"""
+        conn = await self.get_connection()
+        cursor = await conn.execute("SELECT COUNT(*) FROM tag_aliases")
+        row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def refresh_prefix_topk(self, tags: Optional[List[str]] = None) -> int:
+        """
+        Rebuild the materialized top-K-per-short-prefix table
+        Call after tag sync (and refresh_alias_index) so short-prefix autocomplete
+        never sorts the whole range
+
+        Args:
+            tags: Only re-rank the prefixes these tags rank under now or ranked
+                under before (None = all prefixes)
+
+        Returns:
+            Number of rows in prefix_topk
+        """
+        conn = await self.get_connection()
+        start_time = time.time()
+
+        if tags is None:
+            await conn.execute("DELETE FROM prefix_topk")
+            prefix_filter, prefixes_json = "", None
+        else:
+            # Prefixes of the tags' current names/aliases, plus prefixes they were
+            # ranked under (covers removed aliases); other prefixes cannot change
+            tags_json = json.dumps(tags)
+            cursor = await conn.execute("""
+                SELECT DISTINCT prefix FROM prefix_topk
+                WHERE tag IN (SELECT value FROM json_each(?))
+            """, (tags_json,))
+            prefixes = {row[0] for row in await cursor.fetchall()}
+            cursor = await conn.execute("""
+                SELECT value FROM json_each(?)
+                UNION
+                SELECT alias FROM tag_aliases
+                WHERE tag IN (SELECT value FROM json_each(?))
+            """, (tags_json, tags_json))
+            for (key,) in await cursor.fetchall():
+                prefixes.update(key[:length] for length in range(1, min(len(key), self.PREFIX_TOPK_MAX_LENGTH) + 1))
+
+            prefixes_json = json.dumps(sorted(prefixes))
+            await conn.execute("""
+                DELETE FROM prefix_topk
+                WHERE prefix IN (SELECT value FROM json_each(?))
+            """, (prefixes_json,))
+            prefix_filter = "AND substr(key, 1, ?) IN (SELECT value FROM json_each(?))"
+
+        for length in range(1, self.PREFIX_TOPK_MAX_LENGTH + 1):
+            params = (length, length) if prefixes_json is None else (length, length, length, prefixes_json)
+            # Rank over canonical tags and aliases, a tag counts once per prefix
+            await conn.execute(f"""
+                WITH prefix_keys(key, tag, post_count) AS (
+                    SELECT tag, tag, post_count FROM hot_tags
+                    UNION ALL
+                    SELECT a.alias, a.tag, h.post_count
+                    FROM tag_aliases a
+                    JOIN hot_tags h ON h.tag = a.tag
+                )
+                INSERT INTO prefix_topk (prefix, rank, tag)
+                SELECT prefix, rank, tag FROM (
+                    SELECT prefix,
+                           tag,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY prefix
+                               ORDER BY post_count DESC, tag
+                           ) AS rank
+                    FROM (
+                        SELECT DISTINCT substr(key, 1, ?) AS prefix, tag, post_count
+                        FROM prefix_keys
+                        WHERE length(key) >= ? {prefix_filter}
+                    )
+                )
+                WHERE rank <= ?
+            """, (*params, self.PREFIX_TOPK_SIZE))
+
+        await conn.commit()
+
+        cursor = await conn.execute("SELECT COUNT(*) FROM prefix_topk")
+        row = await cursor.fetchone()
+        count = row[0] if row else 0
+
+        scope = "" if tags is None else f" for {len(tags)} tags"
+        logger.info(f"✓ Prefix top-K table refreshed{scope} with {count} entries ({time.time() - start_time:.2f}s)")
+        return count
+
+    async def get_prefix_topk_count(self) -> int:
+        """Get number of rows in the prefix top-K table"""
+        conn = await self.get_connection()
+        cursor = await conn.execute("SELECT COUNT(*) FROM prefix_topk")
+        row = await cursor.fetchone()
+        return row[0] if row else 0
 
+    async def refresh_short_gram_index(self, tags: Optional[List[str]] = None) -> int:
+        """
+        Rebuild the 1-2 character translation substring index
+        Call after tag sync (the trigram FTS5 index is kept current by triggers)
+
+        Args:
+            tags: Only replace the grams of these tags (None = all tags)
+
+        Returns:
+            Number of rows in translation_grams
+        """
+        conn = await self.get_connection()
+        start_time = time.time()
+
+        await self._populate_short_grams(conn, tags)
+        await conn.commit()
+
+        count = await self.get_short_gram_count()
+        scope = "" if tags is None else f" for {len(tags)} tags"
+        logger.info(f"✓ Short substring index refreshed{scope} with {count} entries ({time.time() - start_time:.2f}s)")
+        return count
+
+    async def get_short_gram_count(self) -> int:
+        """Get number of rows in the short substring index"""
+        conn = await self.get_connection()
+        cursor = await conn.execute("SELECT COUNT(*) FROM translation_grams")
+        row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def search_tags_by_translation(self, query: str, limit: int = 10) -> List[TagRecord]:
+        """Search tags by Chinese translation (legacy method, same as search_tags_optimized with search_type="chinese")"""
+        return await self.search_tags_optimized(query, limit, search_type="chinese")
+
+    async def _fetch_translation_rows(self, conn: aiosqlite.Connection,
+                                      query: str, limit: int) -> List[Tuple]:
+        """
+        Fetch hot_tags rows whose translation contains query, best matches first
+
+        Every step is index-backed: exact and prefix matches use idx_translation,
+        substrings of 3+ characters use the trigram FTS5 index ranked by bm25
+        combined with popularity, shorter substrings use translation_grams.
+
+        Returns:
+            List of (row, match_score) tuples
+        """
         results = []
-        for row in rows:
-            results.append({
-                'tag': row['tag'],
-                'category': row['category'],
-                'post_count': row['post_count'],
-                'translation_cn': row['translation_cn'],
-                'aliases': json.loads(row['aliases']) if row['aliases'] else [],
-                'match_score': row['match_score']
-            })
+        seen_tags = set()
 
-        return results
+        def add_rows(rows, score):
+            for row in rows:
+                if row['tag'] not in seen_tags:
+                    seen_tags.add(row['tag'])
+                    results.append((row, score))
+
+        # Step 1: Exact and prefix matches (index range scan on translation_cn)
+        cursor = await conn.execute(f"""
+            SELECT h.tag, h.category, h.post_count, h.translation_cn, {_ALIASES_COLUMN} AS aliases
+            FROM hot_tags h
+            WHERE h.translation_cn >= ? AND h.translation_cn < ?
+            ORDER BY h.translation_cn = ? DESC, h.post_count DESC
+            LIMIT ?
+        """, (query, _prefix_upper_bound(query), query, limit))
+        prefix_rows = await cursor.fetchall()
+        add_rows([row for row in prefix_rows if row['translation_cn'] == query], 10)
+        add_rows(prefix_rows, 8)
+
+        if len(results) >= limit:
+            return results[:limit]
+
+        # Step 2: Substring matches (prefix rows come back again, hence the full limit)
+        if len(query) <= self.SHORT_GRAM_MAX_LENGTH:
+            cursor = await conn.execute(f"""
+                SELECT h.tag, h.category, h.post_count, h.translation_cn, {_ALIASES_COLUMN} AS aliases
+                FROM translation_grams g
+                JOIN hot_tags h ON h.tag = g.tag
+                WHERE g.gram = ?
+                ORDER BY g.post_count DESC
+                LIMIT ?
+            """, (query, limit))
+        else:
+            # Quoted as a phrase: FTS5 syntax characters in the query are literal
+            fts_query = '"' + query.replace('"', '""') + '"'
+            cursor = await conn.execute(f"""
+                SELECT h.tag, h.category, h.post_count, h.translation_cn, {_ALIASES_COLUMN} AS aliases
+                FROM hot_tags_fts f
+                JOIN hot_tags h ON f.rowid = h.rowid
+                WHERE hot_tags_fts MATCH ?
+                ORDER BY bm25(hot_tags_fts) - ? * log10(h.post_count + 1)
+                LIMIT ?
+            """, (fts_query, self.FTS_POPULARITY_WEIGHT, limit))
+
+        add_rows(await cursor.fetchall(), 5)
+        return results[:limit]
 
     async def search_tags_optimized(self, query: str, limit: int = 10,
-                                   search_type: str = "auto") -> List[Dict]:
+                                   search_type: str = "auto") -> List[TagRecord]:
         """
         Optimized tag search using FTS5 for fast queries
 
@@ -241,7 +988,7 @@ class TagDatabaseManager:
         Returns:
             List of matching tags with scores
         """
-        conn = await self.get_connection()
+        conn = await self.get_read_connection()
 
         # Auto-detect search type
         if search_type == "auto":
@@ -250,148 +997,393 @@ class TagDatabaseManager:
             search_type = "chinese" if has_chinese else "english"
 
         if search_type == "english":
-            # English prefix search (fast with index)
-            cursor = await conn.execute("""
-                SELECT tag, category, post_count, translation_cn, aliases
-                FROM hot_tags
-                WHERE tag LIKE ? || '%'
-                ORDER BY post_count DESC
-                LIMIT ?
-            """, (query.lower(), limit))
+            # English prefix search (top-K table or index range scan)
+            rows = await self._fetch_prefix_rows(conn, query, limit)
+            return [
+                TagRecord(*row, match_score=9 if row['matched_alias'] else 10)
+                for row in rows
+            ]
+
+        else:  # Chinese substring search (trigram FTS5 / short gram index)
+            rows = await self._fetch_translation_rows(conn, query, limit)
+            return [TagRecord(*row, match_score=match_score) for row, match_score in rows]
+
+    async def search_tags_by_pinyin(self, query: str, limit: int = 10) -> List[TagRecord]:
+        """
+        Search tags by pinyin or pinyin initials prefix (e.g. "baisi" / "bs" -> 白丝)
 
-            rows = await cursor.fetchall()
-            results = []
-            for row in rows:
-                results.append({
-                    'tag': row['tag'],
-                    'category': row['category'],
-                    'post_count': row['post_count'],
-                    'translation_cn': row['translation_cn'],
-                    'aliases': json.loads(row['aliases']) if row['aliases'] else [],
-                    'match_score': 10
-                })
-            return results
-
-        else:  # Chinese search using FTS5
-            # Step 1: Try exact match first (highest priority)
-            cursor = await conn.execute("""
-                SELECT tag, category, post_count, translation_cn, aliases
-                FROM hot_tags
-                WHERE translation_cn = ?
-                ORDER BY post_count DESC
-                LIMIT ?
-            """, (query, limit))
+        Args:
+            query: Normalized pinyin key prefix (lowercase letters and digits)
+            limit: Maximum number of results
 
-            exact_matches = await cursor.fetchall()
+        Returns:
+            List of matching tags: exact key matches first, full pinyin before
+            initials ("bs" is ambiguous, "baisi" is not), then by popularity
+        """
+        if not query:
+            return []
 
-            # Step 2: If not enough results, use FTS5 for fuzzy matching
-            fts_results = []
-            if len(exact_matches) < limit:
-                remaining = limit - len(exact_matches)
+        conn = await self.get_read_connection()
 
-                # Escape special FTS5 characters
-                fts_query = query.replace('"', '""')
+        # Range scan on the (key, tag) primary key, no table scan.
+        # match_rank: 3 exact full pinyin, 2 exact initials, 1 full pinyin prefix, 0 initials prefix
+        # (kind 0 = KIND_FULL, 1 = KIND_INITIALS in translation.pinyin_index)
+        cursor = await conn.execute(f"""
+            SELECT p.tag,
+                   COALESCE(h.category, 0) AS category,
+                   COALESCE(h.post_count, MAX(p.post_count)) AS post_count,
+                   COALESCE(h.translation_cn, p.translation_cn) AS translation_cn,
+                   {_ALIASES_COLUMN} AS aliases,
+                   MAX((p.key = ?) * 2 + (p.kind = 0)) AS match_rank
+            FROM pinyin_index p
+            LEFT JOIN hot_tags h ON h.tag = p.tag
+            WHERE p.key >= ? AND p.key < ?
+            GROUP BY p.tag
+            ORDER BY match_rank DESC, post_count DESC
+            LIMIT ?
+        """, (query, query, _prefix_upper_bound(query), limit))
 
-                cursor = await conn.execute("""
-                    SELECT h.tag, h.category, h.post_count, h.translation_cn, h.aliases,
-                           f.rank as fts_rank
-                    FROM hot_tags_fts f
-                    JOIN hot_tags h ON f.rowid = h.rowid
-                    WHERE hot_tags_fts MATCH ?
-                    ORDER BY f.rank, h.post_count DESC
-                    LIMIT ?
-                """, (fts_query, remaining))
-
-                fts_results = await cursor.fetchall()
-
-            # Merge results
-            results = []
-            seen_tags = set()
-
-            # Add exact matches with highest score
-            for row in exact_matches:
-                tag = row['tag']
-                if tag not in seen_tags:
-                    results.append({
-                        'tag': tag,
-                        'category': row['category'],
-                        'post_count': row['post_count'],
-                        'translation_cn': row['translation_cn'],
-                        'aliases': json.loads(row['aliases']) if row['aliases'] else [],
-                        'match_score': 10
-                    })
-                    seen_tags.add(tag)
-
-            # Add FTS matches
-            for row in fts_results:
-                tag = row['tag']
-                if tag not in seen_tags:
-                    results.append({
-                        'tag': tag,
-                        'category': row['category'],
-                        'post_count': row['post_count'],
-                        'translation_cn': row['translation_cn'],
-                        'aliases': json.loads(row['aliases']) if row['aliases'] else [],
-                        'match_score': 5  # Lower score for fuzzy matches
-                    })
-                    seen_tags.add(tag)
+        rows = await cursor.fetchall()
 
-            return results[:limit]
+        return [
+            TagRecord(row['tag'], row['category'], row['post_count'], row['translation_cn'],
+                      row['aliases'], match_score=6 + row['match_rank'])
+            for row in rows
+        ]
 
-    async def get_tag(self, tag: str) -> Optional[Dict]:
-        """Get a specific tag"""
+    async def rebuild_pinyin_index(self, rows: List[Tuple[str, int, str, str, int]]) -> int:
+        """
+        Replace pinyin index content
+
+        Args:
+            rows: (key, kind, tag, translation_cn, post_count) rows,
+                  see translation.pinyin_index.build_pinyin_rows
+
+        Returns:
+            Number of index entries
+        """
         conn = await self.get_connection()
 
-        cursor = await conn.execute("""
-            SELECT tag, category, post_count, translation_cn, aliases, last_updated
+        await conn.execute("DELETE FROM pinyin_index")
+        await conn.executemany("""
+            INSERT OR REPLACE INTO pinyin_index
+            (key, kind, tag, translation_cn, post_count)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+
+        await conn.commit()
+        logger.info(f"✓ Pinyin index rebuilt with {len(rows)} entries")
+        return len(rows)
+
+    async def update_pinyin_index(self, tags: List[str],
+                                  rows: List[Tuple[str, int, str, str, int]]) -> int:
+        """
+        Replace the pinyin index entries of some tags
+
+        Args:
+            tags: Tags whose entries are replaced
+            rows: New (key, kind, tag, translation_cn, post_count) rows of these tags
+
+        Returns:
+            Number of entries written
+        """
+        conn = await self.get_connection()
+
+        await conn.execute("""
+            DELETE FROM pinyin_index
+            WHERE tag IN (SELECT value FROM json_each(?))
+        """, (json.dumps(tags),))
+        await conn.executemany("""
+            INSERT OR REPLACE INTO pinyin_index
+            (key, kind, tag, translation_cn, post_count)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+
+        await conn.commit()
+        logger.info(f"✓ Pinyin index updated for {len(tags)} tags ({len(rows)} entries)")
+        return len(rows)
+
+    async def get_pinyin_index_count(self) -> int:
+        """Get number of pinyin index entries"""
+        conn = await self.get_connection()
+        cursor = await conn.execute("SELECT COUNT(*) FROM pinyin_index")
+        row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def get_translated_tags(self, tags: Optional[List[str]] = None) -> List[Tuple[str, str, int]]:
+        """
+        Get (tag, translation_cn, post_count) for all tags with a translation
+
+        Args:
+            tags: Only these tags (None = all tags)
+        """
+        conn = await self.get_read_connection()
+        tag_filter, params = "", ()
+        if tags is not None:
+            tag_filter, params = "AND tag IN (SELECT value FROM json_each(?))", (json.dumps(tags),)
+        cursor = await conn.execute(f"""
+            SELECT tag, translation_cn, post_count
             FROM hot_tags
-            WHERE tag = ?
+            WHERE translation_cn IS NOT NULL AND translation_cn != ''
+              {tag_filter}
+        """, params)
+        rows = await cursor.fetchall()
+        return [(row['tag'], row['translation_cn'], row['post_count']) for row in rows]
+
+    async def get_tag(self, tag: str) -> Optional[TagRecord]:
+        """Get a specific tag"""
+        conn = await self.get_read_connection()
+
+        cursor = await conn.execute(f"""
+            SELECT h.tag, h.category, h.post_count, h.translation_cn,
+                   {_ALIASES_COLUMN} AS aliases, h.last_updated
+            FROM hot_tags h
+            WHERE h.tag = ?
         """, (tag,))
 
         row = await cursor.fetchone()
         if row:
-            return {
-                'tag': row['tag'],
-                'category': row['category'],
-                'post_count': row['post_count'],
-                'translation_cn': row['translation_cn'],
-                'aliases': json.loads(row['aliases']) if row['aliases'] else [],
-                'last_updated': row['last_updated']
-            }
+            return TagRecord(row['tag'], row['category'], row['post_count'], row['translation_cn'],
+                             row['aliases'], last_updated=row['last_updated'])
         return None
 
+    async def get_tags_by_names(self, tags: List[str]) -> Dict[str, TagRecord]:
+        """Get several tags at once, keyed by tag name (unknown tags are omitted)"""
+        if not tags:
+            return {}
+        conn = await self.get_read_connection()
+
+        cursor = await conn.execute(f"""
+            SELECT h.tag, h.category, h.post_count, h.translation_cn,
+                   {_ALIASES_COLUMN} AS aliases
+            FROM hot_tags h
+            WHERE h.tag IN (SELECT value FROM json_each(?))
+        """, (json.dumps(tags),))
+        cursor.row_factory = None
+
+        rows = await cursor.fetchall()
+        return {row[0]: TagRecord(*row) for row in rows}
+
     async def get_tags_count(self) -> int:
         """Get total number of tags in database"""
-        conn = await self.get_connection()
+        conn = await self.get_read_connection()
         cursor = await conn.execute("SELECT COUNT(*) FROM hot_tags")
         row = await cursor.fetchone()
         return row[0] if row else 0
 
-    async def get_all_tags(self, order_by_hot: bool = True) -> List[Dict]:
+    async def get_all_tags(self, order_by_hot: bool = True) -> List[TagRecord]:
         """Get all tags from database"""
-        conn = await self.get_connection()
+        conn = await self.get_read_connection()
 
         order_clause = "ORDER BY post_count DESC" if order_by_hot else ""
         cursor = await conn.execute(f"""
-            SELECT tag, category, post_count, translation_cn, aliases
-            FROM hot_tags
+            SELECT h.tag, h.category, h.post_count, h.translation_cn,
+                   {_ALIASES_COLUMN} AS aliases
+            FROM hot_tags h
             {order_clause}
         """)
 
-        rows = await cursor.fetchall()
+        # Plain tuples fetched in chunks: no sqlite3.Row per tag and no
+        # full intermediate row list next to the records
+        cursor.row_factory = None
 
         results = []
-        for row in rows:
-            results.append({
-                'tag': row['tag'],
-                'category': row['category'],
-                'post_count': row['post_count'],
-                'translation_cn': row['translation_cn'],
-                'aliases': json.loads(row['aliases']) if row['aliases'] else []
-            })
+        while True:
+            rows = await cursor.fetchmany(self.FETCH_CHUNK_SIZE)
+            if not rows:
+                break
+            results.extend(TagRecord(*row) for row in rows)
 
         return results
 
+    async def add_cooccurrence_counts(self, counts: Dict[Tuple[str, str], int],
+                                      replace: bool = False) -> int:
+        """
+        Merge tag pair counts into the co-occurrence table
+
+        Counts are added to existing rows, then every touched tag is pruned
+        back to its COOCCURRENCE_TOP_N most frequent neighbours.
+
+        Args:
+            counts: {(tag, neighbor): count}, including (tag, tag) post counts
+            replace: Replace all rows of the touched tags instead of adding to
+                them (dump import, so importing the same dump twice is idempotent)
+
+        Returns:
+            Number of tags touched
+        """
+        if not counts:
+            return 0
+        conn = await self.get_connection()
+
+        touched = sorted({tag for tag, _ in counts})
+        if replace:
+            await conn.execute("""
+                DELETE FROM tag_cooccurrence
+                WHERE tag IN (SELECT value FROM json_each(?))
+            """, (json.dumps(touched),))
+
+        await conn.executemany("""
+            INSERT INTO tag_cooccurrence (tag, neighbor, count)
+            VALUES (?, ?, ?)
+            ON CONFLICT(tag, neighbor) DO UPDATE SET count = count + excluded.count
+        """, ((tag, neighbor, count) for (tag, neighbor), count in counts.items()))
+
+        await conn.execute("""
+            DELETE FROM tag_cooccurrence
+            WHERE (tag, neighbor) IN (
+                SELECT tag, neighbor FROM (
+                    SELECT tag, neighbor,
+                           ROW_NUMBER() OVER (PARTITION BY tag ORDER BY count DESC, neighbor) AS rank
+                    FROM tag_cooccurrence
+                    WHERE tag IN (SELECT value FROM json_each(?)) AND neighbor != tag
+                )
+                WHERE rank > ?
+            )
+        """, (json.dumps(touched), self.COOCCURRENCE_TOP_N))
+
+        await conn.commit()
+        return len(touched)
+
+    async def update_tag_relations(self, kind: str,
+                                   active: List[Tuple[str, str]],
+                                   removed: List[Tuple[str, str]],
+                                   metadata: Optional[Dict[str, str]] = None,
+                                   alias_targets: Optional[Set[str]] = None) -> int:
+        """
+        Apply one page of imported alias or implication records
+
+        Args:
+            kind: "aliases" (pairs are (alias, tag)) or "implications" ((antecedent, consequent))
+            active: Pairs to add
+            removed: Pairs no longer active
+            metadata: sync_metadata values written in the same transaction (resume cursor)
+            alias_targets: Set collecting the canonical tags whose aliases may have
+                changed (new, old and removed targets), for refresh_alias_index
+
+        Returns:
+            Number of rows added or removed
+        """
+        conn = await self.get_connection()
+        changes = conn.total_changes
+
+        if kind == "aliases":
+            if alias_targets is not None:
+                # Targets before the page, a re-pointed alias leaves its old tag
+                cursor = await conn.execute("""
+                    SELECT tag FROM remote_tag_aliases
+                    WHERE alias IN (SELECT value FROM json_each(?))
+                """, (json.dumps([alias for alias, _ in active + removed]),))
+                alias_targets.update(row[0] for row in await cursor.fetchall())
+                alias_targets.update(tag for _, tag in active + removed)
+            # An alias points to one tag, a re-pointed alias replaces the old row
+            await conn.executemany(
+                "DELETE FROM remote_tag_aliases WHERE alias = ? AND tag = ?", removed
+            )
+            await conn.executemany("""
+                INSERT INTO remote_tag_aliases (alias, tag) VALUES (?, ?)
+                ON CONFLICT(alias) DO UPDATE SET tag = excluded.tag
+                WHERE tag != excluded.tag
+            """, active)
+        elif kind == "implications":
+            await conn.executemany(
+                "DELETE FROM tag_implications WHERE antecedent = ? AND consequent = ?", removed
+            )
+            await conn.executemany(
+                "INSERT OR IGNORE INTO tag_implications (antecedent, consequent) VALUES (?, ?)", active
+            )
+        else:
+            raise ValueError(f"Unknown tag relation kind: {kind}")
+
+        changes = conn.total_changes - changes
+        if metadata:
+            current_time = int(time.time())
+            await conn.executemany("""
+                INSERT OR REPLACE INTO sync_metadata (key, value, updated_at)
+                VALUES (?, ?, ?)
+            """, [(key, value, current_time) for key, value in metadata.items()])
+        await conn.commit()
+        return changes
+
+    async def resolve_aliases(self, tags: List[str]) -> Dict[str, str]:
+        """Map tags that are aliases to their canonical tag (other tags are omitted)"""
+        if not tags:
+            return {}
+        conn = await self.get_read_connection()
+        cursor = await conn.execute("""
+            SELECT alias, tag FROM remote_tag_aliases
+            WHERE alias IN (SELECT value FROM json_each(?))
+        """, (json.dumps([tag.lower() for tag in tags]),))
+        return {row[0]: row[1] for row in await cursor.fetchall()}
+
+    async def get_implied_tags(self, tags: List[str]) -> Dict[str, List[str]]:
+        """
+        Get every tag implied by each given tag, following implication chains
+
+        Returns:
+            {tag: [implied tags]} for tags that imply anything
+        """
+        if not tags:
+            return {}
+        conn = await self.get_read_connection()
+        # UNION (not UNION ALL) stops at cycles
+        cursor = await conn.execute("""
+            WITH RECURSIVE implied(source, tag) AS (
+                SELECT i.antecedent, i.consequent
+                FROM tag_implications i
+                WHERE i.antecedent IN (SELECT value FROM json_each(?))
+                UNION
+                SELECT implied.source, i.consequent
+                FROM implied JOIN tag_implications i ON i.antecedent = implied.tag
+            )
+            SELECT source, tag FROM implied WHERE tag != source
+        """, (json.dumps([tag.lower() for tag in tags]),))
+
+        result: Dict[str, List[str]] = {}
+        for source, tag in await cursor.fetchall():
+            result.setdefault(source, []).append(tag)
+        return result
+
+    async def get_relation_counts(self) -> Dict[str, int]:
+        """Get numbers of imported aliases and implications"""
+        conn = await self.get_read_connection()
+        cursor = await conn.execute("""
+            SELECT (SELECT COUNT(*) FROM remote_tag_aliases),
+                   (SELECT COUNT(*) FROM tag_implications)
+        """)
+        row = await cursor.fetchone()
+        return {'aliases': row[0], 'implications': row[1]}
+
+    async def get_cooccurrence_rows(self, tags: List[str]) -> List[Tuple[str, str, int]]:
+        """Get (tag, neighbor, count) rows of the given tags, including diagonal rows"""
+        if not tags:
+            return []
+        conn = await self.get_read_connection()
+
+        cursor = await conn.execute("""
+            SELECT tag, neighbor, count
+            FROM tag_cooccurrence
+            WHERE tag IN (SELECT value FROM json_each(?))
+        """, (json.dumps(tags),))
+        cursor.row_factory = None
+        return await cursor.fetchall()
+
+    async def get_all_cooccurrence_rows(self) -> List[Tuple[str, str, int]]:
+        """Get the whole co-occurrence table ordered by tag (used by dump export)"""
+        conn = await self.get_read_connection()
+        cursor = await conn.execute("""
+            SELECT tag, neighbor, count FROM tag_cooccurrence ORDER BY tag
+        """)
+        cursor.row_factory = None
+        return await cursor.fetchall()
+
+    async def get_cooccurrence_tag_count(self) -> int:
+        """Get number of tags with co-occurrence data"""
+        conn = await self.get_read_connection()
+        cursor = await conn.execute("SELECT COUNT(*) FROM tag_cooccurrence WHERE tag = neighbor")
+        row = await cursor.fetchone()
+        return row[0] if row else 0
+
     async def delete_old_tags(self, older_than_days: int = 90):
         """Delete tags that haven't been updated in X days"""
         conn = await self.get_connection()
@@ -428,6 +1420,12 @@ class TagDatabaseManager:
         row = await cursor.fetchone()
         return row['value'] if row else None
 
+    async def delete_metadata(self, key: str):
+        """Delete a metadata value"""
+        conn = await self.get_connection()
+        await conn.execute("DELETE FROM sync_metadata WHERE key = ?", (key,))
+        await conn.commit()
+
     async def get_last_sync_time(self) -> int:
         """Get last sync timestamp"""
         value = await self.get_metadata('last_sync_time')
@@ -439,6 +1437,15 @@ class TagDatabaseManager:
             timestamp = int(time.time())
         await self.set_metadata('last_sync_time', str(timestamp))
 
+    async def get_delta_cursor(self) -> float:
+        """Get the updated_at cursor of the last successful delta sync (0 if never)"""
+        value = await self.get_metadata('delta_sync_cursor')
+        return float(value) if value else 0.0
+
+    async def set_delta_cursor(self, timestamp: float):
+        """Set the updated_at cursor for the next delta sync"""
+        await self.set_metadata('delta_sync_cursor', str(timestamp))
+
     async def get_sync_progress(self) -> Dict:
         """Get current sync progress"""
         value = await self.get_metadata('sync_progress')
@@ -454,23 +1461,70 @@ class TagDatabaseManager:
         await conn.execute("DELETE FROM sync_metadata WHERE key = 'sync_progress'")
         await conn.commit()
 
+    async def begin_sync_generation(self, progress: Dict):
+        """Start a new journaled sync: empty sync_journal and store its sync_progress"""
+        conn = await self.get_connection()
+        await conn.execute("DELETE FROM sync_journal")
+        await conn.execute("""
+            INSERT OR REPLACE INTO sync_metadata (key, value, updated_at)
+            VALUES ('sync_progress', ?, ?)
+        """, (json.dumps(progress), int(time.time())))
+        await conn.commit()
+
+    async def get_sync_journal(self) -> Dict[int, int]:
+        """Get pages committed by the running sync generation as {page: tag_count}"""
+        conn = await self.get_connection()
+        cursor = await conn.execute("SELECT page, tag_count FROM sync_journal")
+        return {row[0]: row[1] for row in await cursor.fetchall()}
+
+    async def complete_sync_generation(self, delta_cursor: float):
+        """
+        Mark the running sync generation complete in one transaction
+
+        Clears the journal and sync_progress, and records the sync time and
+        the delta cursor, so a crash leaves either the resumable generation
+        or the finished one.
+        """
+        conn = await self.get_connection()
+        current_time = int(time.time())
+        await conn.execute("DELETE FROM sync_journal")
+        await conn.execute("DELETE FROM sync_metadata WHERE key = 'sync_progress'")
+        await conn.executemany("""
+            INSERT OR REPLACE INTO sync_metadata (key, value, updated_at)
+            VALUES (?, ?, ?)
+        """, [
+            ('last_sync_time', str(current_time), current_time),
+            ('delta_sync_cursor', str(delta_cursor), current_time),
+            ('initial_sync_version', '1.0', current_time),
+        ])
+        await conn.commit()
+
+    async def fts_index_needs_rebuild(self) -> bool:
+        """
+        Check whether hot_tags_fts is missing rows of hot_tags (migrated or damaged index)
+
+        COUNT(*) on an external-content FTS5 table reads the content table, so
+        the indexed rows are counted in the docsize shadow table instead.
+        """
+        conn = await self.get_read_connection()
+        cursor = await conn.execute("""
+            SELECT (SELECT COUNT(*) FROM hot_tags), (SELECT COUNT(*) FROM hot_tags_fts_docsize)
+        """)
+        tag_count, indexed_count = await cursor.fetchone()
+        return tag_count != indexed_count
+
     async def rebuild_fts_index(self):
         """
-        Rebuild FTS5 index from existing data
-        Useful for migrating existing databases to FTS5
+        Rebuild FTS5 index and short substring index from existing data
+        Useful for migrating existing databases to FTS5 / the trigram tokenizer
         """
         conn = await self.get_connection()
 
         logger.info("Rebuilding FTS5 index...")
 
-        # Clear existing FTS data
-        await conn.execute("DELETE FROM hot_tags_fts")
-
-        # Rebuild from hot_tags table
-        await conn.execute("""
-            INSERT INTO hot_tags_fts(rowid, tag, translation_cn)
-            SELECT rowid, tag, translation_cn FROM hot_tags
-        """)
+        # Clear and rebuild from hot_tags table
+        await self._populate_fts(conn)
+        await self._populate_short_grams(conn)
 
         await conn.commit()
 
@@ -482,6 +1536,70 @@ class TagDatabaseManager:
         logger.info(f"✓ FTS5 index rebuilt with {count} entries")
         return count
 
+    # ==================== Maintenance ====================
+
+    async def _pragma_value(self, conn: aiosqlite.Connection, pragma: str) -> int:
+        """Read a single-value PRAGMA"""
+        cursor = await conn.execute(f"PRAGMA {pragma}")
+        row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def get_database_size(self) -> Dict:
+        """Get database file sizes and page statistics"""
+        conn = await self.get_connection()
+        wal_path = self.db_path + "-wal"
+        return {
+            'file_bytes': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+            'wal_bytes': os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+            'page_size': await self._pragma_value(conn, "page_size"),
+            'page_count': await self._pragma_value(conn, "page_count"),
+            'freelist_count': await self._pragma_value(conn, "freelist_count"),
+        }
+
+    async def analyze(self):
+        """Refresh query planner statistics (sqlite_stat1)"""
+        conn = await self.get_connection()
+        await conn.execute("ANALYZE")
+        await conn.commit()
+
+    async def optimize_fts_index(self):
+        """Merge FTS5 index segments into one b-tree"""
+        conn = await self.get_connection()
+        await conn.execute("INSERT INTO hot_tags_fts(hot_tags_fts) VALUES('optimize')")
+        await conn.commit()
+
+    async def reclaim_free_pages(self) -> int:
+        """
+        Return free pages to the file system
+
+        Databases created before auto_vacuum was enabled are converted with
+        one full VACUUM, afterwards incremental_vacuum only moves free pages.
+
+        Returns:
+            Number of pages freed
+        """
+        conn = await self.get_connection()
+        freelist = await self._pragma_value(conn, "freelist_count")
+        if freelist == 0:
+            return 0
+
+        # auto_vacuum: 0 = NONE, 1 = FULL, 2 = INCREMENTAL
+        if await self._pragma_value(conn, "auto_vacuum") != 2:
+            logger.info("Converting database to auto_vacuum=INCREMENTAL (full VACUUM)...")
+            await conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            await conn.execute("VACUUM")
+        else:
+            # The pragma frees one page per step and execute() only steps once,
+            # executescript runs it to completion
+            await conn.executescript("PRAGMA incremental_vacuum;")
+
+        return freelist - await self._pragma_value(conn, "freelist_count")
+
+    async def checkpoint_wal(self):
+        """Copy the WAL back into the database and truncate it"""
+        conn = await self.get_connection()
+        await conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     async def check_database_health(self) -> Tuple[bool, Optional[str]]:
         """
         Check database integrity and health
@@ -551,7 +1669,7 @@ class TagDatabaseManager:
             max_attempts = 3
             for attempt in range(max_attempts):
                 try:
-                    os.remove(self.db_path)
+                    self.delete_database_files()
                     logger.info("✓ Corrupted database file removed successfully")
                     return True
                 except PermissionError:
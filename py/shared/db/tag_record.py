@@ -0,0 +1,142 @@
+"""
+Lightweight tag query result rows
+Slotted records with lazy alias decoding and direct JSON serialization to the wire formats
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional
+
+# Separator used by the aliases column (group_concat over tag_aliases)
+ALIAS_SEPARATOR = '\x1f'
+
+_dumps = json.dumps
+
+
+def _split_aliases(value: Optional[str]) -> List[str]:
+    """Split an aliases column value into a list"""
+    return value.split(ALIAS_SEPARATOR) if value else []
+
+
+class TagRecord:
+    """
+    One tag returned by TagDatabaseManager queries
+
+    Uses __slots__ (about a third of the memory of the dict rows it replaces)
+    and keeps aliases as the raw column value until first accessed. Supports
+    read-only dict-style access (`record['tag']`, `record.get('aliases', [])`)
+    so callers written against the old dict rows keep working.
+    """
+
+    __slots__ = ('tag', 'category', 'post_count', 'translation_cn', '_aliases',
+                 'matched_alias', 'match_score', 'last_updated')
+
+    FIELDS = ('tag', 'category', 'post_count', 'translation_cn', 'aliases',
+              'matched_alias', 'match_score', 'last_updated')
+
+    def __init__(self, tag: str, category: int, post_count: int,
+                 translation_cn: Optional[str] = None,
+                 aliases=None,
+                 matched_alias: Optional[str] = None,
+                 match_score: Optional[int] = None,
+                 last_updated: Optional[int] = None):
+        """
+        Args:
+            aliases: Raw aliases column (separator-joined string) or a list
+        """
+        self.tag = tag
+        self.category = category
+        self.post_count = post_count
+        self.translation_cn = translation_cn
+        self._aliases = aliases
+        self.matched_alias = matched_alias
+        self.match_score = match_score
+        self.last_updated = last_updated
+
+    @property
+    def aliases(self) -> List[str]:
+        """Alias list, decoded on first access"""
+        aliases = self._aliases
+        if aliases is None or isinstance(aliases, str):
+            aliases = _split_aliases(aliases)
+            self._aliases = aliases
+        return aliases
+
+    # ==================== Dict compatibility ====================
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS and getattr(self, key) is not None
+
+    def get(self, key: str, default=None):
+        """dict.get equivalent, unset optional fields return default"""
+        if key not in self.FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def copy(self) -> 'TagRecord':
+        """Shallow copy"""
+        return TagRecord(self.tag, self.category, self.post_count, self.translation_cn,
+                         self._aliases, self.matched_alias, self.match_score, self.last_updated)
+
+    def to_dict(self) -> Dict:
+        """Convert to a plain dict (only fields that are set)"""
+        result = {
+            'tag': self.tag,
+            'category': self.category,
+            'post_count': self.post_count,
+            'translation_cn': self.translation_cn,
+            'aliases': self.aliases,
+        }
+        for key in ('matched_alias', 'match_score', 'last_updated'):
+            value = getattr(self, key)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def __repr__(self) -> str:
+        return f"TagRecord({self.tag!r}, category={self.category}, post_count={self.post_count})"
+
+    # ==================== Wire serialization ====================
+
+    def _aliases_json(self) -> str:
+        """Aliases as a JSON array without building an intermediate list when possible"""
+        aliases = self._aliases
+        if not aliases:
+            return '[]'
+        return _dumps(aliases.split(ALIAS_SEPARATOR) if isinstance(aliases, str) else aliases,
+                      ensure_ascii=False)
+
+    def autocomplete_json(self) -> str:
+        """Serialize to the /autocomplete response item format"""
+        return (
+            '{"name":' + _dumps(self.tag, ensure_ascii=False) +
+            ',"category":' + str(self.category) +
+            ',"post_count":' + str(self.post_count) +
+            ',"translation":' + _dumps(self.translation_cn, ensure_ascii=False) +
+            ',"aliases":' + self._aliases_json() + '}'
+        )
+
+    def search_json(self, default_score: int = 5) -> str:
+        """Serialize to the /search_chinese result item format"""
+        return (
+            '{"tag":' + _dumps(self.tag, ensure_ascii=False) +
+            ',"translation_cn":' + _dumps(self.translation_cn, ensure_ascii=False) +
+            ',"category":' + str(self.category) +
+            ',"post_count":' + str(self.post_count) +
+            ',"match_score":' + str(self.match_score if self.match_score is not None else default_score) + '}'
+        )
+
+
+def dump_autocomplete(records: Iterable[TagRecord]) -> str:
+    """Serialize records to an /autocomplete JSON array"""
+    return '[' + ','.join(record.autocomplete_json() for record in records) + ']'
+
+
+def dump_search_results(records: Iterable[TagRecord]) -> str:
+    """Serialize records to a /search_chinese "results" JSON array"""
+    return '[' + ','.join(record.search_json() for record in records) + ']'
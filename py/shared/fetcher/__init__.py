@@ -1,5 +1,5 @@
 """Tag fetcher module"""
 
-from .tag_fetcher import DanbooruTagFetcher
+from .tag_fetcher import DanbooruTagFetcher, TagFetchError
 
-__all__ = ['DanbooruTagFetcher']
+__all__ = ['DanbooruTagFetcher', 'TagFetchError']
@@ -5,8 +5,10 @@ Fetches hot tags from Danbooru API with rate limiting and retry mechanism
 
 import aiohttp
 import asyncio
+import json
 import time
-from typing import List, Dict, Optional, Callable
+from datetime import datetime, timezone
+from typing import Awaitable, List, Dict, Optional, Callable, Tuple
 from pathlib import Path
 
 # Logger导入
@@ -14,6 +16,10 @@ from ...utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+class TagFetchError(Exception):
+    """A page could not be fetched after all retries"""
+
+
 class DanbooruTagFetcher:
     """Fetch tags from Danbooru API"""
 
@@ -29,16 +35,31 @@ class DanbooruTagFetcher:
         5: "meta"
     }
 
-    def __init__(self, rate_limit: float = 2.0):
+    # Tags per page (Danbooru maximum)
+    TAGS_PER_PAGE = 1000
+    # Safety limit for paginated fetches
+    MAX_PAGES = 200
+    # A delta needing more pages than this is cheaper as a top-N refresh
+    DELTA_MAX_PAGES = 20
+
+    def __init__(self, rate_limit: float = 2.0, concurrency: int = 4):
         """
         Initialize fetcher
 
         Args:
             rate_limit: Requests per second (default 2 to respect Danbooru limits)
+            concurrency: Maximum requests in flight for paginated fetches
         """
         self.rate_limit = rate_limit
+        self.concurrency = max(1, concurrency)
         self.last_request_time = 0
+        # Earliest start time of the next request, shared by all concurrent requests
+        self._next_request_time = 0.0
         self.session = None
+        # SyncMetrics of the running sync (set by the sync manager), None = not recorded
+        self.metrics = None
+        # PriorityGate to yield to foreground work before each request, None = never yield
+        self.priority_gate = None
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create HTTP session"""
@@ -54,14 +75,24 @@ class DanbooruTagFetcher:
             self.session = None
 
     async def _rate_limit_wait(self):
-        """Wait to respect rate limit"""
+        """
+        Wait to respect rate limit
+
+        Each caller reserves the next free slot before sleeping (no await in
+        between), so concurrent requests are spaced 1/rate_limit apart.
+        """
+        now = time.time()
         if self.rate_limit > 0:
-            min_interval = 1.0 / self.rate_limit
-            elapsed = time.time() - self.last_request_time
-            if elapsed < min_interval:
-                await asyncio.sleep(min_interval - elapsed)
+            slot = max(now, self._next_request_time)
+            self._next_request_time = slot + 1.0 / self.rate_limit
+            if slot > now:
+                await asyncio.sleep(slot - now)
         self.last_request_time = time.time()
 
+    def _rate_limit_backoff(self, wait_time: float):
+        """Push back every pending request after a 429 response"""
+        self._next_request_time = max(self._next_request_time, time.time() + wait_time)
+
     async def _fetch_with_retry(self, url: str, params: Dict,
                                 max_retries: int = 3,
                                 backoff_factor: float = 2.0) -> Optional[List[Dict]]:
@@ -80,16 +111,27 @@ class DanbooruTagFetcher:
         session = await self._get_session()
 
         for attempt in range(max_retries):
+            if attempt and self.metrics:
+                self.metrics.record_retry()
             try:
+                if self.priority_gate:
+                    waited = await self.priority_gate.wait_for_idle()
+                    if waited and self.metrics:
+                        self.metrics.record_yield(waited)
                 await self._rate_limit_wait()
 
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
-                        return await response.json()
+                        body = await response.read()
+                        if self.metrics:
+                            self.metrics.record_response(len(body))
+                        return json.loads(body)
                     elif response.status == 429:  # Rate limited
+                        if self.metrics:
+                            self.metrics.record_rate_limited()
                         wait_time = backoff_factor ** (attempt + 1)
                         logger.warning(f"⚠️ Rate limited, waiting {wait_time}s...")
-                        await asyncio.sleep(wait_time)
+                        self._rate_limit_backoff(wait_time)
                     elif response.status == 404:
                         # No more results
                         return []
@@ -140,19 +182,251 @@ class DanbooruTagFetcher:
         if tags is None:
             return None
 
-        # Extract relevant information
+        return [self._parse_tag(tag) for tag in tags]
+
+    @staticmethod
+    def _parse_tag(tag: Dict) -> Dict:
+        """Extract relevant information from an API tag object"""
+        return {
+            "tag": tag.get("name", "").lower(),
+            "category": tag.get("category", 0),
+            "post_count": tag.get("post_count", 0),
+            # Danbooru API doesn't provide translation directly
+            # Will be added later from translation system
+            "translation_cn": None
+        }
+
+    @staticmethod
+    def _parse_timestamp(value: Optional[str]) -> float:
+        """Parse an API timestamp (ISO 8601 with offset) to a Unix timestamp, 0 if missing"""
+        if not value:
+            return 0.0
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return 0.0
+
+    async def fetch_updated_tags(self, since: float,
+                                 min_post_count: Optional[int] = None,
+                                 max_pages: Optional[int] = None) -> Optional[Tuple[List[Dict], float]]:
+        """
+        Fetch tags created or changed since a timestamp
+
+        Filters on updated_at and pages by id (`page=b<id>`), so every
+        request is an index lookup no matter how many tags changed.
+
+        Args:
+            since: Unix timestamp of the last successful sync
+            min_post_count: Minimum post count threshold
+            max_pages: Give up after this many pages (default DELTA_MAX_PAGES)
+
+        Returns:
+            (tags, newest updated_at timestamp seen), or None on failure or when
+            the delta is larger than max_pages
+        """
+        max_pages = max_pages or self.DELTA_MAX_PAGES
+        url = f"{self.API_BASE}/tags.json"
+        since_iso = datetime.fromtimestamp(since, timezone.utc).isoformat()
+        params = {
+            "search[updated_at]": f">={since_iso}",
+            "limit": self.TAGS_PER_PAGE,
+        }
+        if min_post_count is not None:
+            params["search[post_count]"] = f">={min_post_count}"
+
         results = []
-        for tag in tags:
-            results.append({
-                "tag": tag.get("name", "").lower(),
-                "category": tag.get("category", 0),
-                "post_count": tag.get("post_count", 0),
-                # Danbooru API doesn't provide translation directly
-                # Will be added later from translation system
-                "translation_cn": None
-            })
-
-        return results
+        newest = since
+        for page_number in range(max_pages):
+            tags = await self._fetch_with_retry(url, params)
+            if tags is None:
+                logger.error(f"❌ Failed to fetch updated tags (page {page_number + 1})")
+                return None
+
+            for tag in tags:
+                results.append(self._parse_tag(tag))
+                newest = max(newest, self._parse_timestamp(tag.get("updated_at")))
+
+            if len(tags) < self.TAGS_PER_PAGE:
+                logger.info(f"✓ {len(results)} tags changed since {since_iso}")
+                return results, newest
+
+            # Next page: tags with a lower id than anything seen so far
+            params["page"] = f"b{min(tag['id'] for tag in tags)}"
+
+        logger.warning(f"⚠️ More than {max_pages} pages of tags changed since {since_iso}")
+        return None
+
+    async def stream_relation_pages(self, resource: str,
+                                    page_handler: Callable[[List[Dict], str], Awaitable[None]],
+                                    since: Optional[float] = None,
+                                    start_cursor: Optional[str] = None,
+                                    max_pages: Optional[int] = None) -> int:
+        """
+        Fetch tag alias or implication records page by page
+
+        Pages are requested sequentially by id (`page=b<id>`) under the rate
+        limiter. Without `since` only active records are fetched; with it
+        every record updated since then is fetched, including ones that were
+        deleted, so the caller can remove them.
+
+        Args:
+            resource: "tag_aliases" or "tag_implications"
+            page_handler: Async callback(records, next_cursor); next_cursor resumes after this page
+            since: Unix timestamp for a delta fetch (None = all active records)
+            start_cursor: Cursor passed to an earlier page_handler call, to resume
+            max_pages: Safety limit (default MAX_PAGES)
+
+        Returns:
+            Number of records handed to page_handler
+
+        Raises:
+            TagFetchError: A page failed after all retries
+        """
+        url = f"{self.API_BASE}/{resource}.json"
+        params = {"limit": self.TAGS_PER_PAGE}
+        if since is not None:
+            params["search[updated_at]"] = f">={datetime.fromtimestamp(since, timezone.utc).isoformat()}"
+        else:
+            params["search[status]"] = "active"
+        if start_cursor:
+            params["page"] = start_cursor
+
+        handled = 0
+        for _ in range(max_pages or self.MAX_PAGES):
+            items = await self._fetch_with_retry(url, params)
+            if items is None:
+                raise TagFetchError(f"Failed to fetch {resource} (page {params.get('page', 1)}) after retries")
+            if not items:
+                break
+
+            records = [{
+                "antecedent": item.get("antecedent_name", "").lower(),
+                "consequent": item.get("consequent_name", "").lower(),
+                "active": item.get("status") == "active",
+                "updated_at": self._parse_timestamp(item.get("updated_at")),
+            } for item in items]
+
+            params["page"] = f"b{min(item['id'] for item in items)}"
+            await page_handler(records, params["page"])
+            handled += len(records)
+
+            if len(items) < self.TAGS_PER_PAGE:
+                break
+
+        return handled
+
+    async def stream_tag_pages(self,
+                               page_handler: Callable[[int, List[Dict]], Awaitable[None]],
+                               max_tags: int = 100000,
+                               min_post_count: Optional[int] = None,
+                               start_page: int = 1,
+                               done_pages: Optional[Dict[int, int]] = None) -> int:
+        """
+        Fetch tag pages concurrently and hand each page over as it arrives
+
+        Up to `concurrency` requests are in flight under the shared rate
+        limiter. Pages go through a bounded queue to page_handler, which runs
+        one page at a time, so only a few pages are held in memory. Pages may
+        arrive out of order. Fetching stops at the first short or failed page.
+        If page_handler raises, pending requests are cancelled and the
+        exception propagates.
+
+        Args:
+            page_handler: Async callback(page, tags) for each non-empty page
+            max_tags: Maximum number of tags to fetch
+            min_post_count: Minimum post count threshold
+            start_page: Starting page (for resume)
+            done_pages: {page: tag_count} already handled by an earlier run, skipped
+
+        Returns:
+            Number of tags handed to page_handler
+
+        Raises:
+            TagFetchError: A page failed after all retries (pages before it were handled)
+        """
+        per_page = self.TAGS_PER_PAGE
+        last_page = min(start_page + (max_tags + per_page - 1) // per_page - 1, self.MAX_PAGES)
+        done_pages = done_pages or {}
+
+        # A short page handled earlier was the last one
+        short_pages = [page for page, count in done_pages.items() if count < per_page]
+        if short_pages:
+            last_page = min(last_page, min(short_pages))
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        state = {'next_page': start_page, 'stop_page': last_page + 1,
+                 'active': self.concurrency, 'failed_page': None}
+        finished = asyncio.Event()
+
+        async def worker():
+            try:
+                while state['next_page'] < state['stop_page']:
+                    page = state['next_page']
+                    state['next_page'] += 1
+                    if page in done_pages:
+                        continue
+
+                    tags = await self.fetch_tags_page(page, per_page, min_post_count)
+                    if tags is None:
+                        logger.error(f"❌ Failed to fetch page {page}, stopping...")
+                        state['failed_page'] = min(page, state['failed_page'] or page)
+                    elif min_post_count is not None:
+                        tags = [t for t in tags if t['post_count'] >= min_post_count]
+
+                    if tags is None or len(tags) < per_page:
+                        # Last page (or failure): pages after it are not needed
+                        state['stop_page'] = min(state['stop_page'], page + 1)
+
+                    await queue.put((page, tags))
+            finally:
+                state['active'] -= 1
+                if state['active'] == 0:
+                    finished.set()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        finished_wait = asyncio.ensure_future(finished.wait())
+
+        handled = 0
+        try:
+            while True:
+                get_task = asyncio.ensure_future(queue.get())
+                await asyncio.wait({get_task, finished_wait}, return_when=asyncio.FIRST_COMPLETED)
+                if not get_task.done():
+                    # All workers finished, drain what is left
+                    get_task.cancel()
+                    if queue.empty():
+                        break
+                    page, tags = queue.get_nowait()
+                else:
+                    page, tags = get_task.result()
+
+                if not tags or page >= state['stop_page']:
+                    # Empty, failed, or fetched concurrently past the last page
+                    continue
+
+                # Trim the page holding the max_tags boundary
+                remaining = max_tags - (page - start_page) * per_page
+                if remaining <= 0:
+                    continue
+                tags = tags[:remaining]
+
+                await page_handler(page, tags)
+                handled += len(tags)
+
+        finally:
+            finished_wait.cancel()
+            for task in workers:
+                task.cancel()
+            results = await asyncio.gather(*workers, return_exceptions=True)
+
+        # Surface worker errors
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        if state['failed_page'] is not None:
+            raise TagFetchError(f"Failed to fetch page {state['failed_page']} after retries")
+
+        return handled
 
     async def fetch_hot_tags(self,
                             max_tags: int = 100000,
@@ -162,6 +436,9 @@ class DanbooruTagFetcher:
         """
         Fetch hot tags from Danbooru
 
+        Collects all pages of stream_tag_pages into one list, prefer
+        stream_tag_pages for large fetches.
+
         Args:
             max_tags: Maximum number of tags to fetch
             min_post_count: Minimum post count threshold
@@ -169,56 +446,28 @@ class DanbooruTagFetcher:
             start_page: Starting page (for resume)
 
         Returns:
-            List of tag dictionaries
+            List of tag dictionaries, ordered by post count
         """
-        all_tags = []
-        tags_per_page = 1000
-        estimated_pages = (max_tags + tags_per_page - 1) // tags_per_page
+        pages = {}
+        estimated_pages = (max_tags + self.TAGS_PER_PAGE - 1) // self.TAGS_PER_PAGE
 
         logger.info(f"📥 Starting to fetch {max_tags} hot tags (min_count={min_post_count})...")
 
-        page = start_page
-        consecutive_empty = 0
-
-        while len(all_tags) < max_tags:
-            # Fetch one page
-            tags = await self.fetch_tags_page(page, tags_per_page, min_post_count)
-
-            if tags is None:
-                logger.error(f"❌ Failed to fetch page {page}, stopping...")
-                break
-
-            if not tags or len(tags) == 0:
-                consecutive_empty += 1
-                if consecutive_empty >= 2:
-                    logger.info(f"✓ No more tags available (page {page})")
-                    break
-            else:
-                consecutive_empty = 0
-
-            # Filter out tags below threshold
-            valid_tags = [t for t in tags if t['post_count'] >= min_post_count]
-            all_tags.extend(valid_tags)
-
-            # Progress callback
+        async def collect(page: int, tags: List[Dict]):
+            pages[page] = tags
+            fetched = sum(len(page_tags) for page_tags in pages.values())
             if progress_callback:
-                progress_callback(page, estimated_pages, len(all_tags))
+                progress_callback(page, estimated_pages, fetched)
             else:
-                logger.info(f"📥 Page {page}/{estimated_pages} | "
-                      f"Fetched: {len(all_tags)}/{max_tags} tags")
+                logger.info(f"📥 Page {page}/{estimated_pages} | Fetched: {fetched}/{max_tags} tags")
 
-            # Check if we have enough
-            if len(all_tags) >= max_tags:
-                all_tags = all_tags[:max_tags]
-                break
-
-            page += 1
-
-            # Safety limit: don't go beyond 200 pages
-            if page > 200:
-                logger.warning(f"⚠️ Reached page limit (200), stopping...")
-                break
+        try:
+            await self.stream_tag_pages(collect, max_tags, min_post_count, start_page)
+        except TagFetchError as e:
+            # Keep the pages fetched before the failure
+            logger.error(f"❌ {e}")
 
+        all_tags = [tag for page in sorted(pages) for tag in pages[page]]
         logger.info(f"✅ Fetched {len(all_tags)} tags successfully!")
         return all_tags
 
@@ -241,13 +490,7 @@ class DanbooruTagFetcher:
         tags = await self._fetch_with_retry(url, params)
 
         if tags and len(tags) > 0:
-            tag = tags[0]
-            return {
-                "tag": tag.get("name", "").lower(),
-                "category": tag.get("category", 0),
-                "post_count": tag.get("post_count", 0),
-                "translation_cn": None
-            }
+            return self._parse_tag(tags[0])
 
         return None
 
@@ -304,9 +547,16 @@ class DanbooruTagFetcher:
         return updated_tags
 
 
-async def test_fetcher():
-    """Test the fetcher"""
+async def test_fetcher(api_base: Optional[str] = None):
+    """
+    Test the fetcher
+
+    Args:
+        api_base: API base URL, e.g. a tools/danbooru_stub_server.py instance (default: live site)
+    """
     fetcher = DanbooruTagFetcher()
+    if api_base:
+        fetcher.API_BASE = api_base.rstrip("/")
 
     try:
         # Test fetching one page
@@ -328,4 +578,5 @@ async def test_fetcher():
 
 
 if __name__ == "__main__":
-    asyncio.run(test_fetcher())
+    import sys
+    asyncio.run(test_fetcher(sys.argv[1] if len(sys.argv) > 1 else None))
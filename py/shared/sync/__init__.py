@@ -6,6 +6,8 @@ from .async_tag_sync import (
     get_background_sync_manager,
     SyncStatus
 )
+from .db_maintenance import DatabaseMaintenance, get_db_maintenance
+from .sync_metrics import SyncMetrics
 
 # Note: tag_sync_api is NOT imported here because it requires PromptServer
 # which may not be available during module import time.
@@ -18,4 +20,7 @@ __all__ = [
     'BackgroundSyncManager',
     'get_background_sync_manager',
     'SyncStatus',
+    'DatabaseMaintenance',
+    'get_db_maintenance',
+    'SyncMetrics',
 ]
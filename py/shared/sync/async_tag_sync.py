@@ -31,6 +31,11 @@ class BackgroundSyncManager:
     Runs in separate thread with its own event loop
     """
 
+    # Minimum seconds between progress pushes with unchanged status
+    PROGRESS_PUSH_INTERVAL = 0.5
+    # Seconds between checks whether scheduled database maintenance is due
+    MAINTENANCE_CHECK_INTERVAL = 3600
+
     def __init__(self):
         self.status = SyncStatus.IDLE
         self.progress = 0.0  # 0.0 - 1.0
@@ -50,6 +55,15 @@ class BackgroundSyncManager:
 
         # Callback for progress updates
         self._progress_callback: Optional[Callable[[Dict], None]] = None
+        self._last_push_time = 0.0
+        self._last_push_status: Optional[SyncStatus] = None
+
+        # SyncMetrics of the running sync
+        self._metrics = None
+
+        # Periodic maintenance check (see start_maintenance_scheduler)
+        self._scheduler_thread: Optional[threading.Thread] = None
+        self._scheduler_stop = threading.Event()
 
         # Lock for thread-safe access
         self._lock = threading.Lock()
@@ -70,6 +84,9 @@ class BackgroundSyncManager:
         """
         Update progress and notify callback
 
+        State is always updated; the callback is throttled to one call per
+        PROGRESS_PUSH_INTERVAL unless the status changed.
+
         Args:
             status: New status
             progress: Progress value (0.0 - 1.0)
@@ -89,6 +106,13 @@ class BackgroundSyncManager:
                 if hasattr(self, key):
                     setattr(self, key, value)
 
+            now = time.time()
+            if (self.status == self._last_push_status and
+                    now - self._last_push_time < self.PROGRESS_PUSH_INTERVAL):
+                return
+            self._last_push_time = now
+            self._last_push_status = self.status
+
             # Build progress dict
             progress_dict = {
                 'status': self.status.value,
@@ -99,6 +123,7 @@ class BackgroundSyncManager:
                 'current_page': self.current_page,
                 'estimated_pages': self.estimated_pages,
                 'error_message': self.error_message,
+                'metrics': self._metrics.snapshot() if self._metrics else None,
             }
 
         # Call callback outside of lock
@@ -121,6 +146,7 @@ class BackgroundSyncManager:
                 'estimated_pages': self.estimated_pages,
                 'error_message': self.error_message,
                 'running': self._running,
+                'metrics': self._metrics.snapshot() if self._metrics else None,
             }
 
     async def _run_sync_task(self, sync_mode: str = "auto"):
@@ -149,7 +175,8 @@ class BackgroundSyncManager:
 
             # Determine sync mode
             if sync_mode == "auto":
-                if needs_full_sync:
+                if needs_full_sync or await manager.has_pending_full_sync():
+                    # New database, or a full sync interrupted by restart/cancel (resumed from its journal)
                     sync_mode = "full"
                 else:
                     # Check if update needed
@@ -168,18 +195,22 @@ class BackgroundSyncManager:
                         )
                         return True
 
-            # Define progress callback
-            def fetch_progress(current_page, estimated_pages, fetched_count):
+            self._metrics = manager.begin_metrics(sync_mode)
+
+            # Progress follows rows committed by the fetch → translate → save pipeline
+            def pipeline_progress(current_page, saved_count, total_count):
                 if self._cancel_requested:
                     raise asyncio.CancelledError("User cancelled")
 
+                estimated_pages = (total_count + manager.fetcher.TAGS_PER_PAGE - 1) // manager.fetcher.TAGS_PER_PAGE
                 self._update_progress(
                     status=SyncStatus.FETCHING,
-                    progress=0.1 + (current_page / max(estimated_pages, 1)) * 0.7,
-                    current_task=f"抓取标签数据 (第 {current_page}/{estimated_pages} 页)",
+                    progress=0.1 + min(saved_count / max(total_count, 1), 1.0) * 0.8,
+                    current_task=f"抓取并保存标签 (已保存 {saved_count}/{total_count})",
                     current_page=current_page,
                     estimated_pages=estimated_pages,
-                    fetched_tags=fetched_count
+                    fetched_tags=saved_count,
+                    total_tags=total_count
                 )
 
             # Run sync based on mode
@@ -189,10 +220,11 @@ class BackgroundSyncManager:
                 # Initialize database (includes FTS5 virtual table)
                 await get_db_manager().initialize_database()
 
-                # Check if database has data but FTS index is empty (migration case)
+                # Rebuild the FTS index only if existing data is not indexed (migration case);
+                # rows saved by an interrupted run were indexed by the triggers already
                 db = get_db_manager()
-                tag_count = await db.get_tags_count()
-                if tag_count > 0:
+                if await db.fts_index_needs_rebuild():
+                    tag_count = await db.get_tags_count()
                     # Rebuild FTS5 index for existing data
                     self._update_progress(
                         status=SyncStatus.SAVING,
@@ -202,60 +234,27 @@ class BackgroundSyncManager:
                     await db.rebuild_fts_index()
                     logger.info(f"[AsyncSync] Rebuilt FTS5 index for {tag_count} existing tags")
 
-                # Fetch tags
+                # Fetch, translate and save page by page
                 self._update_progress(
                     status=SyncStatus.FETCHING,
                     progress=0.1,
                     current_task="开始抓取热门标签..."
                 )
 
-                max_tags = manager.config['tag_sync']['max_tags']
-                min_post_count = manager.config['tag_sync']['min_post_count']
-
-                fetched_tags = await manager.fetcher.fetch_hot_tags(
-                    max_tags=max_tags,
-                    min_post_count=min_post_count,
-                    progress_callback=fetch_progress
-                )
+                # Committed pages are journaled, an interrupted run resumes from them
+                generation, saved_count = await manager.stream_full_sync(pipeline_progress)
 
-                if not fetched_tags:
+                if not saved_count:
                     raise Exception("无法抓取标签数据")
 
-                self._update_progress(
-                    status=SyncStatus.TRANSLATING,
-                    progress=0.8,
-                    current_task="加载翻译数据...",
-                    total_tags=len(fetched_tags)
-                )
-
-                # Add translations
-                manager.translation_loader.load_all()
-                manager.translation_loader.add_translations_to_tags(fetched_tags)
-
-                # Save to database
+                # Build derived search indexes
                 self._update_progress(
                     status=SyncStatus.SAVING,
-                    progress=0.85,
-                    current_task="保存到数据库..."
+                    progress=0.9,
+                    current_task="构建搜索索引...",
+                    total_tags=saved_count
                 )
-
-                batch_size = 1000
-                for i in range(0, len(fetched_tags), batch_size):
-                    if self._cancel_requested:
-                        raise asyncio.CancelledError("User cancelled")
-
-                    batch = fetched_tags[i:i + batch_size]
-                    await get_db_manager().insert_tags_batch(batch)
-
-                    progress = 0.85 + (i / len(fetched_tags)) * 0.1
-                    self._update_progress(
-                        progress=progress,
-                        current_task=f"保存标签 ({i + len(batch)}/{len(fetched_tags)})"
-                    )
-
-                # Update metadata
-                await get_db_manager().set_last_sync_time()
-                await get_db_manager().set_metadata('initial_sync_version', '1.0')
+                await manager.finish_full_sync(generation)
 
             elif sync_mode == "incremental":
                 logger.info("[AsyncSync] Starting incremental update...")
@@ -266,7 +265,7 @@ class BackgroundSyncManager:
                     current_task="增量更新标签数据..."
                 )
 
-                await manager._incremental_update()
+                await manager._incremental_update(pipeline_progress)
 
             # Load to memory cache
             self._update_progress(
@@ -277,7 +276,15 @@ class BackgroundSyncManager:
 
             await manager._load_to_memory()
 
+            # Database is idle now: refresh statistics and compact (failures are non-fatal)
+            self._update_progress(
+                progress=0.98,
+                current_task="优化数据库..."
+            )
+            await self._run_maintenance()
+
             # Complete
+            await manager.save_metrics("completed")
             self._update_progress(
                 status=SyncStatus.COMPLETED,
                 progress=1.0,
@@ -289,6 +296,7 @@ class BackgroundSyncManager:
 
         except asyncio.CancelledError:
             logger.info("[AsyncSync] Synchronization cancelled by user")
+            await manager.save_metrics("cancelled")
             self._update_progress(
                 status=SyncStatus.CANCELLED,
                 current_task="同步已取消",
@@ -306,6 +314,7 @@ class BackgroundSyncManager:
             if "ConnectionError" in str(type(e)) or "TimeoutError" in str(type(e)):
                 error_msg = "网络连接失败，请检查网络连接。如果使用代理，请确保开启了 TUN 模式。"
 
+            await manager.save_metrics("failed")
             self._update_progress(
                 status=SyncStatus.FAILED,
                 current_task="同步失败",
@@ -316,6 +325,206 @@ class BackgroundSyncManager:
         finally:
             await manager.fetcher.close()
 
+    async def _run_import_task(self, dump_path: Optional[str] = None) -> Optional[Dict]:
+        """
+        Import a tag dump file (CPU-heavy: translations, pinyin index)
+
+        Args:
+            dump_path: Dump path (default: py/shared/data/tags_dump.jsonl.gz)
+        """
+        from .tag_sync_manager import get_sync_manager
+
+        manager = get_sync_manager()
+
+        def import_progress(saved_count, total_count):
+            if self._cancel_requested:
+                raise asyncio.CancelledError("User cancelled")
+
+            self._update_progress(
+                status=SyncStatus.SAVING,
+                progress=min(saved_count / max(total_count, 1), 1.0) * 0.8,
+                current_task=f"导入标签数据包 (已保存 {saved_count}/{total_count})",
+                fetched_tags=saved_count,
+                total_tags=total_count
+            )
+
+        try:
+            self._update_progress(
+                status=SyncStatus.INITIALIZING,
+                progress=0.0,
+                current_task="读取标签数据包..."
+            )
+
+            result = await manager.import_dump(dump_path, progress_callback=import_progress)
+
+            self._update_progress(
+                status=SyncStatus.COMPLETED,
+                progress=1.0,
+                current_task=f"已导入 {result['tag_count']} 个标签",
+                total_tags=result['tag_count']
+            )
+            return result
+
+        except asyncio.CancelledError:
+            logger.info("[AsyncSync] Dump import cancelled by user")
+            self._update_progress(
+                status=SyncStatus.CANCELLED,
+                current_task="导入已取消",
+                error_message="用户取消了导入操作"
+            )
+            return None
+
+        except Exception as e:
+            logger.error(f"[AsyncSync] Dump import failed: {e}")
+            self._update_progress(
+                status=SyncStatus.FAILED,
+                current_task="导入失败",
+                error_message=f"导入标签数据包失败: {e}"
+            )
+            return None
+
+    def _import_worker(self, dump_path: Optional[str]):
+        """Worker function for a dump import"""
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self._run_import_task(dump_path))
+        except Exception as e:
+            logger.error(f"[AsyncSync] Import worker error: {e}")
+        finally:
+            loop.close()
+            with self._lock:
+                self._running = False
+
+    def start_dump_import(self, dump_path: Optional[str] = None) -> bool:
+        """
+        Start importing a tag dump in the background
+
+        Shares the running flag with sync and maintenance so none of them
+        write the tag tables concurrently, and keeps the CPU-heavy import off
+        the server event loop.
+
+        Args:
+            dump_path: Dump path (default: py/shared/data/tags_dump.jsonl.gz)
+
+        Returns:
+            True if started, False if a sync, import or maintenance is already running
+        """
+        with self._lock:
+            if self._running:
+                logger.warning("[AsyncSync] Sync already running")
+                return False
+
+            self._running = True
+            self._cancel_requested = False
+            self._metrics = None
+            self._last_push_status = None
+
+        self._thread = threading.Thread(
+            target=self._import_worker,
+            args=(dump_path,),
+            daemon=True,
+            name="DanbooruTagImport"
+        )
+        self._thread.start()
+
+        logger.info(f"[AsyncSync] Background dump import started ({dump_path or 'default dump'})")
+        return True
+
+    async def _run_maintenance(self, only_if_due: bool = False) -> Optional[Dict]:
+        """
+        Run database maintenance, errors are logged and swallowed
+
+        Args:
+            only_if_due: Skip the run unless MAINTENANCE_INTERVAL has passed since the last one
+        """
+        from .db_maintenance import get_db_maintenance
+        from .tag_sync_manager import get_sync_manager
+
+        try:
+            if only_if_due and not await get_db_maintenance().is_due():
+                return None
+            # VACUUM/ANALYZE hold the writer, start only when foreground work is idle
+            # (same switch as the sync: tag_sync.yield_to_foreground)
+            await get_sync_manager()._yield_to_foreground()
+            return await get_db_maintenance().run()
+        except Exception as e:
+            logger.warning(f"[AsyncSync] Database maintenance failed: {e}")
+            return None
+
+    def _maintenance_worker(self, only_if_due: bool):
+        """Worker function for a standalone maintenance run"""
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self._run_maintenance(only_if_due))
+        finally:
+            loop.close()
+            with self._lock:
+                self._running = False
+
+    def start_maintenance(self, only_if_due: bool = False) -> bool:
+        """
+        Start database maintenance in the background (scheduled runs)
+
+        Shares the running flag with sync so both never write concurrently.
+
+        Args:
+            only_if_due: Check DatabaseMaintenance.is_due in the worker and skip the run if not due
+
+        Returns:
+            True if started, False if a sync or maintenance is already running
+        """
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+
+        self._thread = threading.Thread(
+            target=self._maintenance_worker,
+            args=(only_if_due,),
+            daemon=True,
+            name="DanbooruTagMaintenance"
+        )
+        self._thread.start()
+
+        logger.debug("[AsyncSync] Background database maintenance started")
+        return True
+
+    def _maintenance_scheduler(self):
+        """Scheduler thread: start due maintenance whenever no sync, import or maintenance runs"""
+        while not self._scheduler_stop.wait(self.MAINTENANCE_CHECK_INTERVAL):
+            # Busy now: the sync runs maintenance itself when it finishes
+            self.start_maintenance(only_if_due=True)
+
+    def start_maintenance_scheduler(self) -> bool:
+        """
+        Check every MAINTENANCE_CHECK_INTERVAL seconds whether database maintenance is due
+
+        Keeps maintenance running on its interval in a long-lived ComfyUI
+        server, not only at startup and after syncs.
+
+        Returns:
+            True if started, False if the scheduler is already running
+        """
+        with self._lock:
+            if self._scheduler_thread is not None and self._scheduler_thread.is_alive():
+                return False
+            self._scheduler_stop.clear()
+            self._scheduler_thread = threading.Thread(
+                target=self._maintenance_scheduler,
+                daemon=True,
+                name="DanbooruTagMaintenanceScheduler"
+            )
+        self._scheduler_thread.start()
+
+        logger.info(f"[AsyncSync] Maintenance scheduler started (check every {self.MAINTENANCE_CHECK_INTERVAL}s)")
+        return True
+
+    def stop_maintenance_scheduler(self):
+        """Stop the maintenance scheduler thread"""
+        self._scheduler_stop.set()
+
     def _thread_worker(self, sync_mode: str):
         """Worker function that runs in background thread"""
         try:
@@ -352,6 +561,8 @@ class BackgroundSyncManager:
 
             self._running = True
             self._cancel_requested = False
+            self._metrics = None
+            self._last_push_status = None
 
         # Start background thread
         self._thread = threading.Thread(
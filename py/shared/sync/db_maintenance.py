@@ -0,0 +1,99 @@
+"""
+Tag database maintenance
+Refreshes planner statistics, merges FTS segments and returns free pages
+after syncs, so incremental updates do not slowly degrade search latency
+"""
+
+import json
+import time
+from typing import Dict, Optional
+
+from ..db.db_manager import get_db_manager
+
+# Logger导入
+from ...utils.logger import get_logger
+logger = get_logger(__name__)
+
+
+class DatabaseMaintenance:
+    """Runs ANALYZE, FTS5 optimize, incremental vacuum and a WAL checkpoint"""
+
+    # sync_metadata key holding the last run (JSON)
+    METADATA_KEY = 'last_maintenance'
+    # Scheduled runs (startup and BackgroundSyncManager's hourly check) happen at most this often;
+    # every sync also runs maintenance when it finishes
+    MAINTENANCE_INTERVAL = 24 * 3600
+
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or get_db_manager()
+
+    async def get_last_result(self) -> Optional[Dict]:
+        """Get the result of the last maintenance run"""
+        value = await self.db_manager.get_metadata(self.METADATA_KEY)
+        if not value:
+            return None
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return None
+
+    async def is_due(self) -> bool:
+        """Check whether the scheduled interval has passed since the last run"""
+        last = await self.get_last_result()
+        if not last:
+            return True
+        return time.time() - last.get('finished_at', 0) >= self.MAINTENANCE_INTERVAL
+
+    async def run(self) -> Dict:
+        """
+        Run all maintenance steps
+
+        A failing step is logged and recorded, the remaining steps still run.
+
+        Returns:
+            Dict with per-step durations and database size before/after
+        """
+        db = self.db_manager
+        start_time = time.time()
+        size_before = await db.get_database_size()
+
+        steps = {}
+        for name, step in (('analyze', db.analyze),
+                           ('fts_optimize', db.optimize_fts_index),
+                           ('incremental_vacuum', db.reclaim_free_pages),
+                           ('wal_checkpoint', db.checkpoint_wal)):
+            step_start = time.time()
+            try:
+                value = await step()
+                steps[name] = {'duration': round(time.time() - step_start, 3)}
+                if name == 'incremental_vacuum':
+                    steps[name]['freed_pages'] = value
+            except Exception as e:
+                logger.warning(f"[Maintenance] {name} 失败: {e}")
+                steps[name] = {'duration': round(time.time() - step_start, 3), 'error': str(e)}
+
+        size_after = await db.get_database_size()
+        result = {
+            'finished_at': int(time.time()),
+            'duration': round(time.time() - start_time, 3),
+            'steps': steps,
+            'size_before': size_before,
+            'size_after': size_after,
+        }
+        await db.set_metadata(self.METADATA_KEY, json.dumps(result))
+
+        freed = size_before['file_bytes'] + size_before['wal_bytes'] - size_after['file_bytes'] - size_after['wal_bytes']
+        logger.info(f"[Maintenance] 数据库维护完成 ({result['duration']:.2f}s, 释放 {freed / 1024 / 1024:.1f} MB)")
+        return result
+
+
+# Global maintenance instance
+_db_maintenance = None
+
+
+def get_db_maintenance() -> DatabaseMaintenance:
+    """Get global database maintenance instance"""
+    global _db_maintenance
+    if _db_maintenance is None:
+        _db_maintenance = DatabaseMaintenance()
+    return _db_maintenance
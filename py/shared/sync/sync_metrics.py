@@ -0,0 +1,95 @@
+"""
+Tag sync throughput metrics
+Counts requests, bytes, rate limiting and database write time of one sync run,
+so rate_limit, fetch_concurrency and batch sizes can be tuned with data
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SyncMetrics:
+    """Thread-safe counters for one sync run"""
+
+    # sync_metadata key holding the summary of the last run (JSON)
+    METADATA_KEY = 'last_sync_metrics'
+
+    def __init__(self, mode: str = ""):
+        self.mode = mode
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.outcome: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._bytes = 0
+        self._rate_limited = 0
+        self._retries = 0
+        self._pages = 0
+        self._rows = 0
+        self._db_writes = 0
+        self._db_write_time = 0.0
+        self._yields = 0
+        self._yield_time = 0.0
+
+    def record_response(self, size: int):
+        """A successful HTTP response of size bytes"""
+        with self._lock:
+            self._requests += 1
+            self._bytes += size
+
+    def record_rate_limited(self):
+        """An HTTP 429 response"""
+        with self._lock:
+            self._requests += 1
+            self._rate_limited += 1
+
+    def record_retry(self):
+        """A request attempt after a failed one"""
+        with self._lock:
+            self._retries += 1
+
+    def record_page(self, rows: int, write_time: float):
+        """A page committed to the database"""
+        with self._lock:
+            self._pages += 1
+            self._rows += rows
+            self._db_writes += 1
+            self._db_write_time += write_time
+
+    def record_yield(self, wait_time: float):
+        """A pause waiting for foreground work to go idle"""
+        with self._lock:
+            self._yields += 1
+            self._yield_time += wait_time
+
+    def finish(self, outcome: str):
+        """Stop the clock (outcome: completed, failed or cancelled)"""
+        self.finished_at = time.time()
+        self.outcome = outcome
+
+    def snapshot(self) -> Dict:
+        """Current counters and rates"""
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        with self._lock:
+            per_second = 1.0 / elapsed if elapsed > 0 else 0.0
+            return {
+                'mode': self.mode,
+                'outcome': self.outcome,
+                'started_at': int(self.started_at),
+                'elapsed': round(elapsed, 2),
+                'requests': self._requests,
+                'bytes_downloaded': self._bytes,
+                'rate_limited': self._rate_limited,
+                'retries': self._retries,
+                'pages': self._pages,
+                'rows': self._rows,
+                'pages_per_sec': round(self._pages * per_second, 3),
+                'rows_per_sec': round(self._rows * per_second, 1),
+                'kb_per_sec': round(self._bytes / 1024 * per_second, 1),
+                'db_write_time': round(self._db_write_time, 3),
+                'db_write_ms_per_page': round(self._db_write_time * 1000 / self._db_writes, 1) if self._db_writes else 0.0,
+                'yields': self._yields,
+                'yield_time': round(self._yield_time, 2),
+            }
@@ -0,0 +1,129 @@
+"""
+Tag database dump files
+Gzip-compressed JSON Lines snapshot of hot_tags (with translations and aliases)
+and the learned tag co-occurrence lists, used to provision offline /
+air-gapped machines without crawling Danbooru
+"""
+
+import gzip
+import json
+import time
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Logger导入
+from ...utils.logger import get_logger
+logger = get_logger(__name__)
+
+DUMP_FORMAT = "danbooru-gallery-tags"
+# Version 2 added co-occurrence lines (version 1 dumps are still readable)
+DUMP_VERSION = 2
+
+# Gzip level 6: roughly the size of level 9 at a fraction of the CPU time
+COMPRESS_LEVEL = 6
+
+
+def get_default_dump_path() -> Path:
+    """Default dump location next to the tags database (py/shared/data/tags_dump.jsonl.gz)"""
+    return Path(__file__).parent.parent / "data" / "tags_dump.jsonl.gz"
+
+
+def write_tag_dump(path, tags: Iterable, tag_count: int,
+                   cooccurrence: Optional[Iterable[Tuple[str, str, int]]] = None) -> int:
+    """
+    Write a tag dump file
+
+    The first line is a header object, every following tag line is a compact
+    [tag, category, post_count, translation_cn, aliases] array. Co-occurrence
+    lists follow as {"t": tag, "n": [[neighbor, count], ...]} objects.
+
+    Args:
+        path: Output file path
+        tags: TagRecord objects (or dicts with the same keys)
+        tag_count: Number of tags, stored in the header
+        cooccurrence: (tag, neighbor, count) rows ordered by tag
+
+    Returns:
+        File size in bytes
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    header = {
+        "format": DUMP_FORMAT,
+        "version": DUMP_VERSION,
+        "created": int(time.time()),
+        "tag_count": tag_count,
+        "fields": ["tag", "category", "post_count", "translation_cn", "aliases"],
+    }
+
+    # Write to a temporary file first so an interrupted export never leaves a truncated dump
+    tmp_path = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=COMPRESS_LEVEL) as f:
+        f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        for tag in tags:
+            row = [tag['tag'], tag['category'], tag['post_count'], tag.get('translation_cn')]
+            aliases = tag.get('aliases')
+            if aliases:
+                row.append(aliases)
+            f.write(json.dumps(row, ensure_ascii=False, separators=(',', ':')) + "\n")
+        for tag, rows in groupby(cooccurrence or (), key=lambda row: row[0]):
+            line = {"t": tag, "n": [[neighbor, count] for _, neighbor, count in rows]}
+            f.write(json.dumps(line, ensure_ascii=False, separators=(',', ':')) + "\n")
+    tmp_path.replace(path)
+
+    return path.stat().st_size
+
+
+def read_tag_dump(path) -> Tuple[Dict, List[Dict], Dict[Tuple[str, str], int]]:
+    """
+    Read a tag dump file
+
+    Args:
+        path: Dump file path
+
+    Returns:
+        (header, tags, cooccurrence) where tags are dicts accepted by
+        TagDatabaseManager.bulk_load_tags and cooccurrence maps
+        (tag, neighbor) to counts for TagDatabaseManager.add_cooccurrence_counts
+
+    Raises:
+        ValueError: If the file is not a supported dump
+    """
+    tags = []
+    cooccurrence = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header_line = f.readline()
+        try:
+            header = json.loads(header_line)
+        except json.JSONDecodeError:
+            raise ValueError(f"Not a tag dump file: {path}")
+
+        if not isinstance(header, dict) or header.get("format") != DUMP_FORMAT:
+            raise ValueError(f"Not a tag dump file: {path}")
+        if header.get("version", 0) > DUMP_VERSION:
+            raise ValueError(f"Unsupported dump version {header.get('version')} (max {DUMP_VERSION})")
+
+        loads = json.loads
+        for line_number, line in enumerate(f, start=2):
+            if not line.strip():
+                continue
+            try:
+                row = loads(line)
+                if isinstance(row, dict):
+                    tag = row["t"]
+                    for neighbor, count in row["n"]:
+                        cooccurrence[(tag, neighbor)] = count
+                    continue
+                tags.append({
+                    'tag': row[0],
+                    'category': row[1],
+                    'post_count': row[2],
+                    'translation_cn': row[3],
+                    'aliases': row[4] if len(row) > 4 else None,
+                })
+            except (json.JSONDecodeError, IndexError, KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Corrupt dump line {line_number}: {e}")
+
+    return header, tags, cooccurrence
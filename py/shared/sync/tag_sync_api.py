@@ -8,6 +8,7 @@ from pathlib import Path
 from aiohttp import web
 from server import PromptServer
 from ...utils.logger import get_logger
+from ...utils.priority_gate import get_priority_gate
 
 logger = get_logger(__name__)
 
@@ -28,7 +29,8 @@ DEBUG_MODE = load_config()
 
 # Import background sync manager
 try:
-    from .. import get_background_sync_manager, SyncStatus
+    from .. import get_background_sync_manager, get_sync_manager, SyncStatus
+    from .db_maintenance import get_db_maintenance
     SYNC_AVAILABLE = True
     if DEBUG_MODE:
         logger.info("[标签同步] 后台同步系统已加载 (调试模式: 开启)")
@@ -120,6 +122,7 @@ def progress_callback(progress_dict):
         estimated_pages = progress_dict.get('estimated_pages', 0)
         fetched_tags = progress_dict.get('fetched_tags', 0)
         error_message = progress_dict.get('error_message', '')
+        metrics = progress_dict.get('metrics') or {}
 
         # Log progress update (for debugging)
         if DEBUG_MODE:
@@ -127,6 +130,8 @@ def progress_callback(progress_dict):
 
         # Build progress message (current_task already contains page info if available)
         progress_msg = f"📦 标签同步: {current_task} ({int(progress*100)}%)"
+        if status == 'fetching' and metrics.get('rows_per_sec'):
+            progress_msg += f" · {metrics['rows_per_sec']:.0f} 标签/秒"
 
         if status in ['initializing', 'fetching', 'translating', 'saving']:
             # 首次显示或更新进度
@@ -253,6 +258,9 @@ async def get_sync_status(request):
 
         bg_manager = get_background_sync_manager()
         status = bg_manager.get_status()
+        status["maintenance"] = await get_db_maintenance().get_last_result()
+        status["last_metrics"] = await get_sync_manager().get_last_metrics()
+        status["priority_gate"] = get_priority_gate().get_stats()
 
         return web.json_response({
             "success": True,
@@ -264,6 +272,77 @@ async def get_sync_status(request):
         return web.json_response({"success": False, "error": str(e)})
 
 
+def _resolve_dump_path(filename):
+    """Resolve a dump file name inside the data directory (no arbitrary paths over HTTP)"""
+    from .tag_dump import get_default_dump_path
+
+    default_path = get_default_dump_path()
+    if not filename:
+        return default_path
+
+    name = Path(filename).name
+    if not name or name != filename:
+        raise ValueError("Invalid dump file name")
+    return default_path.parent / name
+
+
+@PromptServer.instance.routes.post("/danbooru_gallery/tag_dump_export")
+async def export_tag_dump(request):
+    """Export tag database to a compressed dump file in the data directory"""
+    try:
+        if not SYNC_AVAILABLE:
+            return web.json_response({
+                "success": False,
+                "error": "Sync system not available"
+            })
+
+        data = await request.json() if request.body_exists else {}
+        path = _resolve_dump_path(data.get('filename'))
+
+        result = await get_sync_manager().export_dump(str(path))
+
+        return web.json_response({"success": True, **result})
+
+    except Exception as e:
+        logger.error(f"[标签同步] 导出标签数据失败: {e}")
+        return web.json_response({"success": False, "error": str(e)})
+
+
+@PromptServer.instance.routes.post("/danbooru_gallery/tag_dump_import")
+async def import_tag_dump(request):
+    """Bootstrap tag database from a dump file in the data directory"""
+    try:
+        if not SYNC_AVAILABLE:
+            return web.json_response({
+                "success": False,
+                "error": "Sync system not available"
+            })
+
+        data = await request.json() if request.body_exists else {}
+        path = _resolve_dump_path(data.get('filename'))
+        if not path.exists():
+            return web.json_response({
+                "success": False,
+                "error": f"Dump file not found: {path.name}"
+            })
+
+        # Runs on the background sync thread: progress and result arrive through the status bar
+        bg_manager = get_background_sync_manager()
+        if not bg_manager.start_dump_import(str(path)):
+            return web.json_response({
+                "success": False,
+                "error": "Synchronization already running"
+            }, status=409)
+
+        send_toast("开始导入标签数据...", "info", 2000)
+        return web.json_response({"success": True, "started": True, "path": str(path)}, status=202)
+
+    except Exception as e:
+        logger.error(f"[标签同步] 导入标签数据失败: {e}")
+        send_toast(f"❌ 导入标签数据失败: {e}", "error", 5000)
+        return web.json_response({"success": False, "error": str(e)})
+
+
 # ========================================
 # Initialize
 # ========================================
@@ -277,6 +356,9 @@ def auto_start_sync():
         from .. import get_db_manager
         from pathlib import Path
 
+        # Scheduled maintenance keeps running while the server stays up
+        get_background_sync_manager().start_maintenance_scheduler()
+
         # Check if database exists
         db_manager = get_db_manager()
         db_path = Path(db_manager.db_path)
@@ -288,14 +370,20 @@ def auto_start_sync():
             bg_manager.start_sync("full")
             return
 
-        if not db_path.exists():
+        from .tag_dump import get_default_dump_path
+        dump_path = get_default_dump_path()
+
+        if not db_path.exists() and dump_path.exists():
+            # First time startup with a bundled dump: bootstrap offline instead of crawling
+            logger.info(f"[标签同步] 首次启动检测到标签数据包,从本地导入: {dump_path}")
+            get_background_sync_manager().start_dump_import(str(dump_path))
+        elif not db_path.exists():
             # First time startup, start sync automatically
             logger.info("[标签同步] 首次启动检测到,开始后台同步...")
             bg_manager = get_background_sync_manager()
             bg_manager.start_sync("full")
         else:
             # Database exists, check if update needed
-            import asyncio
             import time
 
             # Create event loop for async check
@@ -306,13 +394,22 @@ def auto_start_sync():
                 last_sync = await db_manager.get_last_sync_time()
                 days_since_sync = (time.time() - last_sync) / 86400
 
+                if await get_sync_manager().has_pending_full_sync():
+                    # A full sync was interrupted (restart/cancel): resume it from its page journal
+                    logger.info("[标签同步] 检测到未完成的完整同步,从已保存的页继续...")
+                    bg_manager = get_background_sync_manager()
+                    bg_manager.start_sync("full")
                 # Default sync interval: 7 days
-                if last_sync == 0 or days_since_sync >= 7:
+                elif last_sync == 0 or days_since_sync >= 7:
                     logger.info(f"[标签同步] 数据库需要更新 (已 {days_since_sync:.1f} 天未同步),开始增量同步...")
                     bg_manager = get_background_sync_manager()
                     bg_manager.start_sync("incremental")
                 else:
                     logger.info(f"[标签同步] 数据库是最新的 (上次同步: {days_since_sync:.1f} 天前)")
+                    # No sync needed: use the idle startup period for scheduled maintenance
+                    if await get_db_maintenance().is_due():
+                        logger.info("[标签同步] 开始定期数据库维护...")
+                        get_background_sync_manager().start_maintenance()
 
             loop.run_until_complete(check_update())
             loop.close()
@@ -369,3 +466,5 @@ logger.info("[标签同步] API 端点已注册:")
 logger.info("[标签同步]    POST /danbooru_gallery/sync_start")
 logger.info("[标签同步]    POST /danbooru_gallery/sync_cancel")
 logger.info("[标签同步]    GET  /danbooru_gallery/sync_status")
+logger.info("[标签同步]    POST /danbooru_gallery/tag_dump_export")
+logger.info("[标签同步]    POST /danbooru_gallery/tag_dump_import")
@@ -5,15 +5,18 @@ Manages automatic tag synchronization on startup
 
 import asyncio
 import time
-import os
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Callable, Dict, List, Optional, Set
 import json
 
 from ..db.db_manager import get_db_manager
-from ..fetcher.tag_fetcher import DanbooruTagFetcher
+from ..fetcher.tag_fetcher import DanbooruTagFetcher, TagFetchError
 from ..translation.translation_loader import get_translation_loader
+from ..translation.pinyin_index import build_pinyin_rows, HAS_PYPINYIN
 from ..cache.memory_cache import get_hot_tags_cache
+from .sync_metrics import SyncMetrics
+from .tag_dump import get_default_dump_path, read_tag_dump, write_tag_dump
+from ...utils.priority_gate import get_priority_gate
 
 # Logger导入
 from ...utils.logger import get_logger
@@ -23,6 +26,14 @@ logger = get_logger(__name__)
 class TagSyncManager:
     """Manage tag synchronization and caching"""
 
+    # Delta syncs re-read this many seconds before the cursor (clock skew,
+    # rows committed while the previous sync ran); re-read rows are unchanged
+    # and therefore not written again
+    DELTA_CURSOR_OVERLAP = 300
+
+    # Imported tag relations: (Danbooru resource, update_tag_relations kind)
+    RELATION_RESOURCES = (('tag_aliases', 'aliases'), ('tag_implications', 'implications'))
+
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize sync manager
@@ -40,14 +51,22 @@ class TagSyncManager:
 
         self.db_manager = get_db_manager()
         self.fetcher = DanbooruTagFetcher(
-            rate_limit=self.config['tag_sync']['api_rate_limit']
+            rate_limit=self.config['tag_sync']['api_rate_limit'],
+            concurrency=self.config['tag_sync']['fetch_concurrency']
         )
         self.translation_loader = get_translation_loader()
 
+        # Sync pauses its requests and writes while autocomplete/gallery requests or a prompt run
+        self.priority_gate = get_priority_gate() if self.config['tag_sync'].get('yield_to_foreground', True) else None
+        self.fetcher.priority_gate = self.priority_gate
+
         # Initialize cache with database query mode by default
         use_database_query = self.config['cache'].get('use_database_query', True)
         self.cache = get_hot_tags_cache(use_database_query=use_database_query)
 
+        # Metrics of the running (or last) sync
+        self.metrics: Optional[SyncMetrics] = None
+
         self._initialized = False
 
     def _load_config(self) -> Dict:
@@ -58,7 +77,10 @@ class TagSyncManager:
                 "max_tags": 100000,
                 "sync_interval_days": 7,
                 "incremental_update_count": 10000,
-                "api_rate_limit": 2
+                "api_rate_limit": 2,
+                "fetch_concurrency": 4,                  # 并发请求数（仍受 api_rate_limit 限制）
+                "sync_relations": True,                  # 同步标签别名和蕴含关系
+                "yield_to_foreground": True              # 补全/画廊请求或工作流执行期间暂停同步
             },
             "offline_mode": {
                 "enabled": True,
@@ -106,76 +128,389 @@ class TagSyncManager:
         # Initialize database
         await self.db_manager.initialize_database()
 
-        # Fetch hot tags from Danbooru
-        max_tags = self.config['tag_sync']['max_tags']
-        min_post_count = self.config['tag_sync']['min_post_count']
+        # Fetch hot tags from Danbooru (resumes an interrupted first sync)
+        generation, saved_count = await self.stream_full_sync()
 
-        logger.info(f"📥 Fetching top {max_tags} hot tags (min_count={min_post_count})...")
-
-        fetched_tags = await self.fetcher.fetch_hot_tags(
-            max_tags=max_tags,
-            min_post_count=min_post_count
-        )
-
-        if not fetched_tags:
+        if not saved_count:
             logger.error("❌ Failed to fetch tags!")
             return False
 
-        # Load translations
-        logger.info("📚 Loading translation data...")
-        self.translation_loader.load_all()
-
-        # Add translations to tags
-        logger.info("🔧 Adding translations...")
-        self.translation_loader.add_translations_to_tags(fetched_tags)
-
-        # Save to database in batches
-        logger.info("💾 Saving to database...")
-        batch_size = 1000
-        for i in range(0, len(fetched_tags), batch_size):
-            batch = fetched_tags[i:i + batch_size]
-            await self.db_manager.insert_tags_batch(batch)
-            logger.info(f"💾 Saved {min(i + batch_size, len(fetched_tags))}/{len(fetched_tags)} tags")
-
-        # Update sync metadata
-        await self.db_manager.set_last_sync_time()
-        await self.db_manager.set_metadata('initial_sync_version', '1.0')
+        await self.finish_full_sync(generation)
 
         logger.info("\n" + "=" * 60)
-        logger.info(f"✅ Initial sync complete! {len(fetched_tags)} tags added.")
+        logger.info(f"✅ Initial sync complete! {saved_count} tags added.")
         logger.info("=" * 60 + "\n")
 
         return True
 
-    async def _incremental_update(self):
-        """Incremental update - refresh top N tags"""
+    async def _incremental_update(self, progress_callback: Optional[Callable[[int, int, int], None]] = None):
+        """
+        Incremental update - delta sync, falling back to a top N refresh
+
+        The delta sync fetches only tags whose updated_at is past the cursor
+        of the last successful sync. Without a cursor, or when the delta is
+        too large, the top N tags are re-fetched instead. Either way only new
+        or changed rows are written, and only the derived search index rows
+        of those tags (and of tags whose aliases changed) are refreshed.
+
+        Args:
+            progress_callback: Callback(page, saved_count, total_count), see stream_sync
+        """
         logger.info("🔄 Performing incremental update...")
+        sync_started = time.time()
+
+        changed_tags: Set[str] = set()
+        counts = await self._delta_sync(progress_callback, changed_tags)
+        if counts is None:
+            update_count = self.config['tag_sync']['incremental_update_count']
+            logger.info(f"🔄 Delta sync unavailable, refreshing top {update_count} tags...")
 
-        update_count = self.config['tag_sync']['incremental_update_count']
+            # Refresh the top N tags (no post count threshold), upserted page by page
+            counts = {'inserted': 0, 'updated': 0}
+            try:
+                fetched_count = await self.stream_sync(update_count, None, progress_callback, counts,
+                                                       changed_tags=changed_tags)
+            except TagFetchError as e:
+                logger.warning(f"⚠️ {e}")
+                fetched_count = 0
+            if not fetched_count:
+                logger.warning("⚠️ Incremental update failed, skipping...")
+                return
+            await self.db_manager.set_delta_cursor(sync_started)
+
+        relation_changes = await self._sync_tag_relations_safe(changed_tags)
+
+        if changed_tags and (counts['inserted'] or counts['updated'] or relation_changes):
+            await self._refresh_search_indexes(changed_tags)
+        await self.db_manager.set_last_sync_time()
 
-        # Get existing tags
-        existing_tags = await self.db_manager.get_all_tags()
-        existing_tag_names = [t['tag'] for t in existing_tags]
+        logger.info(f"✅ Incremental update complete! "
+                    f"({counts['inserted']} new, {counts['updated']} updated)")
+
+    async def _delta_sync(self, progress_callback: Optional[Callable[[int, int, int], None]] = None,
+                          changed_tags: Optional[Set[str]] = None) -> Optional[Dict]:
+        """
+        Fetch and write the tags changed since the delta cursor
+
+        The cursor only advances after the changes are committed.
+
+        Args:
+            progress_callback: Callback(page, saved_count, total_count), see stream_sync
+            changed_tags: Set collecting the names of inserted and updated tags
+
+        Returns:
+            Dict with inserted/updated/unchanged counts, or None when no cursor
+            exists or the delta could not be fetched
+        """
+        cursor = await self.db_manager.get_delta_cursor() or await self.db_manager.get_last_sync_time()
+        if not cursor:
+            return None
 
-        # Fetch updates
-        updated_tags = await self.fetcher.incremental_update(
-            existing_tag_names,
-            update_count=update_count
+        result = await self.fetcher.fetch_updated_tags(
+            cursor - self.DELTA_CURSOR_OVERLAP,
+            min_post_count=self.config['tag_sync']['min_post_count']
         )
+        if result is None:
+            return None
+
+        tags, newest = result
+        self.translation_loader.load_all()
+        self.translation_loader.add_translations_to_tags(tags)
+
+        await self._yield_to_foreground()
+        write_start = time.time()
+        counts = await self.db_manager.upsert_changed_tags(tags, changed_tags=changed_tags)
+        if self.metrics:
+            self.metrics.record_page(len(tags), time.time() - write_start)
+
+        await self.db_manager.set_delta_cursor(max(cursor, newest))
+        if progress_callback:
+            progress_callback(1, len(tags), len(tags))
+        return counts
+
+    async def has_pending_full_sync(self) -> bool:
+        """Check whether a journaled full sync was interrupted before completing"""
+        progress = await self.db_manager.get_sync_progress()
+        return progress.get('mode') == 'full'
+
+    async def stream_full_sync(self, progress_callback: Optional[Callable[[int, int, int], None]] = None):
+        """
+        Fetch all hot tags into the database with a per-page journal
+
+        Every page is written with upsert_changed_tags and committed together
+        with its journal row, so an interrupted run (restart, cancel, network
+        failure) resumes from the committed pages instead of crawling them
+        again. The single-transaction bulk_load_tags path is not used here,
+        it only serves dump imports. Call finish_full_sync
+        afterwards to mark the generation complete.
+
+        Args:
+            progress_callback: Callback(page, saved_count, total_count), see stream_sync
+
+        Returns:
+            (generation, saved_count) - generation is the sync_progress dict
+
+        Raises:
+            TagFetchError: A page failed, committed pages stay journaled
+        """
+        max_tags = self.config['tag_sync']['max_tags']
+        min_post_count = self.config['tag_sync']['min_post_count']
+
+        generation = await self.db_manager.get_sync_progress()
+        done_pages = {}
+        if (generation.get('mode') == 'full' and generation.get('max_tags') == max_tags
+                and generation.get('min_post_count') == min_post_count):
+            done_pages = await self.db_manager.get_sync_journal()
+            logger.info(f"🔄 Resuming interrupted full sync "
+                        f"({len(done_pages)} pages, {sum(done_pages.values())} tags already saved)")
+        else:
+            generation = {
+                'mode': 'full',
+                'started_at': time.time(),
+                'max_tags': max_tags,
+                'min_post_count': min_post_count,
+            }
+            await self.db_manager.begin_sync_generation(generation)
+            logger.info(f"📥 Fetching top {max_tags} hot tags (min_count={min_post_count})...")
+
+        saved_count = await self.stream_sync(max_tags, min_post_count, progress_callback,
+                                             done_pages=done_pages, journal=True)
+        return generation, saved_count
+
+    async def finish_full_sync(self, generation: Dict):
+        """Build search indexes and mark a streamed full sync generation complete"""
+        # Aliases feed the alias index, import them before it is rebuilt
+        await self._sync_tag_relations_safe()
+
+        # Merge the FTS segments written page by page, then build derived search indexes
+        await self._yield_to_foreground()
+        await self.db_manager.optimize_fts_index()
+        await self._refresh_search_indexes()
+
+        # Changes made on the server while crawling are picked up by the next delta sync
+        await self.db_manager.complete_sync_generation(generation['started_at'])
+
+    async def stream_sync(self, max_tags: int, min_post_count: Optional[int],
+                          progress_callback: Optional[Callable[[int, int, int], None]] = None,
+                          counts: Optional[Dict[str, int]] = None,
+                          done_pages: Optional[Dict[int, int]] = None,
+                          journal: bool = False,
+                          changed_tags: Optional[Set[str]] = None) -> int:
+        """
+        Fetch → translate → upsert pipeline
+
+        Pages are fetched concurrently under the fetcher's rate limiter; each
+        page is translated and committed as soon as it arrives (new and
+        changed rows only), so memory stays at a few pages and a failed sync
+        keeps the pages already saved. Derived search indexes are not
+        refreshed here.
+
+        Args:
+            max_tags: Maximum number of tags to fetch
+            min_post_count: Minimum post count threshold (None = no threshold)
+            progress_callback: Callback(page, saved_count, total_count), may raise to cancel
+            counts: Optional dict accumulating upsert_changed_tags counts
+            done_pages: {page: tag_count} committed by an earlier run, skipped
+            journal: Record each page in sync_journal with its rows
+            changed_tags: Set collecting the names of inserted and updated tags
+
+        Returns:
+            Number of tags committed, including done_pages
+        """
+        self.translation_loader.load_all()
+        saved_count = sum(done_pages.values()) if done_pages else 0
+
+        async def save_page(page: int, tags: List[Dict]):
+            nonlocal saved_count
+            self.translation_loader.add_translations_to_tags(tags)
+
+            await self._yield_to_foreground()
+            write_start = time.time()
+            page_counts = await self.db_manager.upsert_changed_tags(
+                tags, journal_page=page if journal else None, changed_tags=changed_tags
+            )
+            if self.metrics:
+                self.metrics.record_page(len(tags), time.time() - write_start)
+
+            if counts is not None:
+                for key, value in page_counts.items():
+                    counts[key] = counts.get(key, 0) + value
+            saved_count += len(tags)
+
+            if progress_callback:
+                progress_callback(page, saved_count, max_tags)
+            else:
+                logger.info(f"💾 Page {page} | Saved: {saved_count}/{max_tags} tags")
+
+        await self.fetcher.stream_tag_pages(save_page, max_tags, min_post_count, done_pages=done_pages)
+        return saved_count
+
+    async def sync_tag_relations(self, changed_tags: Optional[Set[str]] = None) -> int:
+        """
+        Import Danbooru tag aliases and implications
+
+        The first run fetches all active records, later runs only the records
+        updated since the previous run (cursor in sync_metadata), including
+        deleted ones which are removed. Each page is committed together with
+        its resume cursor, so an interrupted import continues where it stopped.
+        Call refresh_alias_index afterwards to make aliases searchable.
+
+        Args:
+            changed_tags: Set collecting the canonical tags whose aliases changed
 
-        if not updated_tags:
-            logger.warning("⚠️ Incremental update failed, skipping...")
+        Returns:
+            Number of relation rows added or removed
+
+        Raises:
+            TagFetchError: A page failed, committed pages are kept
+        """
+        if not self.config['tag_sync'].get('sync_relations', True):
+            return 0
+
+        total_changes = 0
+        for resource, kind in self.RELATION_RESOURCES:
+            cursor_key = f'{kind}_sync_cursor'
+            progress_key = f'{kind}_sync_progress'
+
+            since = float(await self.db_manager.get_metadata(cursor_key) or 0) or None
+            progress = json.loads(await self.db_manager.get_metadata(progress_key) or '{}')
+            if progress and progress.get('since') == since:
+                start_cursor, newest = progress['page_cursor'], progress['newest']
+                logger.info(f"🔄 Resuming {resource} import at {start_cursor}")
+            else:
+                start_cursor, newest = None, since or 0.0
+            started_at = time.time()
+
+            async def save_page(records: List[Dict], next_cursor: str):
+                nonlocal newest, total_changes
+                active = [(r['antecedent'], r['consequent']) for r in records if r['active']]
+                removed = [(r['antecedent'], r['consequent']) for r in records if not r['active']]
+                newest = max(newest, max(r['updated_at'] for r in records))
+
+                await self._yield_to_foreground()
+                write_start = time.time()
+                total_changes += await self.db_manager.update_tag_relations(
+                    kind, active, removed,
+                    metadata={progress_key: json.dumps({
+                        'since': since, 'page_cursor': next_cursor, 'newest': newest
+                    })},
+                    alias_targets=changed_tags
+                )
+                if self.metrics:
+                    self.metrics.record_page(len(records), time.time() - write_start)
+
+            fetch_since = since - self.DELTA_CURSOR_OVERLAP if since else None
+            fetched = await self.fetcher.stream_relation_pages(resource, save_page, fetch_since, start_cursor)
+
+            await self.db_manager.set_metadata(cursor_key, str(newest or started_at))
+            await self.db_manager.delete_metadata(progress_key)
+            logger.info(f"✓ Imported {fetched} {resource} records")
+
+        return total_changes
+
+    async def _sync_tag_relations_safe(self, changed_tags: Optional[Set[str]] = None) -> int:
+        """sync_tag_relations, a failed fetch is logged and resumed by the next sync"""
+        try:
+            return await self.sync_tag_relations(changed_tags)
+        except TagFetchError as e:
+            logger.warning(f"⚠️ Tag relation import incomplete: {e}")
+            return 0
+
+    async def _yield_to_foreground(self):
+        """Wait while autocomplete/gallery requests or a prompt execution are running"""
+        if self.priority_gate:
+            waited = await self.priority_gate.wait_for_idle()
+            if waited and self.metrics:
+                self.metrics.record_yield(waited)
+
+    def begin_metrics(self, mode: str) -> SyncMetrics:
+        """Start recording metrics for a new sync run (shared with the fetcher)"""
+        self.metrics = SyncMetrics(mode)
+        self.fetcher.metrics = self.metrics
+        return self.metrics
+
+    async def save_metrics(self, outcome: str) -> Optional[Dict]:
+        """
+        Finish the running metrics and persist the summary in sync_metadata
+
+        Args:
+            outcome: completed, failed or cancelled
+
+        Returns:
+            Metrics summary, or None if no metrics were recorded
+        """
+        if not self.metrics:
+            return None
+
+        self.metrics.finish(outcome)
+        summary = self.metrics.snapshot()
+        self.metrics = self.fetcher.metrics = None
+        try:
+            await self.db_manager.set_metadata(SyncMetrics.METADATA_KEY, json.dumps(summary))
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save sync metrics: {e}")
+
+        logger.info(f"📊 Sync {outcome}: {summary['pages']} pages, {summary['rows']} tags in {summary['elapsed']:.1f}s "
+                    f"({summary['rows_per_sec']:.0f} tags/s, {summary['bytes_downloaded'] / 1024 / 1024:.1f} MB, "
+                    f"{summary['rate_limited']}x 429, {summary['retries']} retries, "
+                    f"DB {summary['db_write_ms_per_page']:.0f} ms/page)")
+        return summary
+
+    async def get_last_metrics(self) -> Optional[Dict]:
+        """Get the persisted metrics summary of the last sync run"""
+        value = await self.db_manager.get_metadata(SyncMetrics.METADATA_KEY)
+        return json.loads(value) if value else None
+
+    async def _refresh_search_indexes(self, changed_tags: Optional[Set[str]] = None):
+        """
+        Refresh indexes derived from hot_tags after data changed
+
+        Args:
+            changed_tags: Only refresh the alias, prefix top-K, short gram and pinyin
+                rows of these tags (delta syncs); None rebuilds everything
+                (full sync, dump import)
+        """
+        tags = sorted(changed_tags) if changed_tags is not None else None
+        # One rebuild at a time, each waits for foreground work to go idle
+        for refresh in (self.db_manager.refresh_alias_index, self.db_manager.refresh_prefix_topk,
+                        self.db_manager.refresh_short_gram_index, self._rebuild_pinyin_index):
+            await self._yield_to_foreground()
+            await refresh(tags)
+
+        # Everything is committed, invalidate cached autocomplete responses
+        self.db_manager.bump_generation()
+
+    async def _rebuild_pinyin_index(self, tags: Optional[List[str]] = None):
+        """
+        Rebuild pinyin/initials index over hot_tags and cn_to_en translations
+
+        Args:
+            tags: Only replace the entries of these tags (None = whole index)
+        """
+        if not HAS_PYPINYIN:
+            logger.info("ℹ️ pypinyin not installed, skipping pinyin index")
             return
 
-        # Add translations
+        logger.info("🔧 Building pinyin index..." if tags is None else f"🔧 Updating pinyin index for {len(tags)} tags...")
+        start_time = time.time()
+
         self.translation_loader.load_all()
-        self.translation_loader.add_translations_to_tags(updated_tags)
 
-        # Update database
-        await self.db_manager.insert_tags_batch(updated_tags)
-        await self.db_manager.set_last_sync_time()
+        # Tags in database first so their post_count wins, then translation-only entries
+        entries = await self.db_manager.get_translated_tags(tags)
+        wanted = set(tags) if tags is not None else None
+        entries.extend(
+            (en_tag, cn_text, 0) for cn_text, en_tag in self.translation_loader.cn_to_en.items()
+            if wanted is None or en_tag in wanted
+        )
+
+        rows = build_pinyin_rows(entries)
+        if tags is None:
+            await self.db_manager.rebuild_pinyin_index(rows)
+        else:
+            await self.db_manager.update_pinyin_index(tags, rows)
 
-        logger.info(f"✅ Incremental update complete!")
+        logger.info(f"✅ Pinyin index built in {time.time() - start_time:.2f}s")
 
     async def _load_to_memory(self):
         """Load tags from database to memory cache"""
@@ -252,23 +587,39 @@ class TagSyncManager:
                     # Check if FTS5 index needs rebuilding (for database migration)
                     tag_count = await self.db_manager.get_tags_count()
                     if tag_count > 0:
-                        # Check if FTS5 index exists and has data
-                        conn = await self.db_manager.get_connection()
-                        cursor = await conn.execute("SELECT COUNT(*) FROM hot_tags_fts")
-                        row = await cursor.fetchone()
-                        fts_count = row[0] if row else 0
-
-                        if fts_count == 0:
-                            # FTS5 index is empty, rebuild it
-                            logger.info(f"🔧 Detected empty FTS5 index, rebuilding for {tag_count} tags...")
+                        # Check if FTS5 index covers every tag
+                        if await self.db_manager.fts_index_needs_rebuild():
+                            # FTS5 index is empty or incomplete, rebuild it
+                            logger.info(f"🔧 Detected incomplete FTS5 index, rebuilding for {tag_count} tags...")
                             await self.db_manager.rebuild_fts_index()
 
+                        # Derived indexes are new in this version, build them for existing databases
+                        alias_count = await self.db_manager.get_alias_count()
+                        if alias_count == 0 and await self.db_manager.refresh_alias_index() > 0:
+                            # Alias prefixes are part of the top-K table
+                            await self.db_manager.refresh_prefix_topk()
+                        elif await self.db_manager.get_prefix_topk_count() == 0:
+                            logger.info("🔧 Detected empty prefix top-K table, building...")
+                            await self.db_manager.refresh_prefix_topk()
+
+                        if await self.db_manager.get_short_gram_count() == 0:
+                            logger.info("🔧 Detected empty short substring index, building...")
+                            await self.db_manager.refresh_short_gram_index()
+
+                        if HAS_PYPINYIN and await self.db_manager.get_pinyin_index_count() == 0:
+                            logger.info("🔧 Detected empty pinyin index, building...")
+                            await self._rebuild_pinyin_index()
+
                     last_sync = await self.db_manager.get_last_sync_time()
                     days_since_sync = (time.time() - last_sync) / 86400
 
                     sync_interval = self.config['tag_sync']['sync_interval_days']
 
-                    if last_sync == 0:
+                    if await self.has_pending_full_sync():
+                        # Restarted during a full sync, continue from the journal
+                        generation, _ = await self.stream_full_sync()
+                        await self.finish_full_sync(generation)
+                    elif last_sync == 0:
                         # Database exists but no sync record, probably from old version
                         logger.warning("⚠️ No sync metadata found, marking as synced")
                         await self.db_manager.set_last_sync_time()
@@ -305,7 +656,8 @@ class TagSyncManager:
         await self.db_manager.close()
         db_path = Path(self.db_manager.db_path)
         if db_path.exists():
-            os.remove(db_path)
+            self.db_manager.delete_database_files()
+            self.db_manager.bump_generation()
             logger.info("🗑️ Removed old database")
 
         # Perform first time init
@@ -318,6 +670,88 @@ class TagSyncManager:
         await self.fetcher.close()
         return success
 
+    async def export_dump(self, path: Optional[str] = None) -> Dict:
+        """
+        Export the tag database to a compressed dump file
+
+        Args:
+            path: Output path (default: py/shared/data/tags_dump.jsonl.gz)
+
+        Returns:
+            Dict with path, tag_count, size_bytes and elapsed seconds
+        """
+        path = Path(path) if path else get_default_dump_path()
+        start_time = time.time()
+
+        tags = await self.db_manager.get_all_tags(order_by_hot=True)
+        cooccurrence = await self.db_manager.get_all_cooccurrence_rows()
+        size = await asyncio.to_thread(write_tag_dump, path, tags, len(tags), cooccurrence)
+
+        elapsed = time.time() - start_time
+        logger.info(f"📦 Exported {len(tags)} tags to {path} ({size / 1024 / 1024:.1f} MB, {elapsed:.1f}s)")
+        return {
+            'path': str(path),
+            'tag_count': len(tags),
+            'size_bytes': size,
+            'elapsed': elapsed
+        }
+
+    async def import_dump(self, path: Optional[str] = None,
+                          progress_callback=None) -> Dict:
+        """
+        Bootstrap the tag database from a dump file (no network needed)
+
+        Tags are loaded with the bulk-load fast path, derived search indexes
+        are rebuilt and the database is marked as synced.
+
+        Args:
+            path: Dump path (default: py/shared/data/tags_dump.jsonl.gz)
+            progress_callback: Callback(saved_count, total_count), may raise to cancel
+
+        Returns:
+            Dict with path, tag_count and elapsed seconds
+        """
+        path = Path(path) if path else get_default_dump_path()
+        start_time = time.time()
+
+        logger.info(f"📦 Importing tag dump {path}...")
+        header, tags, cooccurrence = await asyncio.to_thread(read_tag_dump, path)
+
+        # Fill translations missing from the dump with the local translation files
+        missing = [tag for tag in tags if not tag.get('translation_cn')]
+        if missing:
+            self.translation_loader.load_all()
+            self.translation_loader.add_translations_to_tags(missing)
+
+        await self.db_manager.initialize_database()
+        await self.db_manager.bulk_load_tags(tags, progress_callback=progress_callback)
+        # Replaces the rows of tags in the dump, counts learned locally for other tags stay
+        await self.db_manager.add_cooccurrence_counts(cooccurrence, replace=True)
+        await self._refresh_search_indexes()
+
+        # A full sync interrupted before the import is superseded by it
+        await self.db_manager.clear_sync_progress()
+        await self.db_manager.set_last_sync_time(header.get('created') or None)
+        # The next delta sync picks up everything changed after the dump was made
+        await self.db_manager.set_delta_cursor(header.get('created') or start_time)
+        await self.db_manager.set_metadata('initial_sync_version', '1.0')
+        await self.db_manager.set_metadata('imported_dump', json.dumps({
+            'path': str(path),
+            'created': header.get('created'),
+            'tag_count': len(tags),
+            'imported_at': int(time.time())
+        }))
+
+        await self._load_to_memory()
+
+        elapsed = time.time() - start_time
+        logger.info(f"✅ Imported {len(tags)} tags from dump in {elapsed:.1f}s")
+        return {
+            'path': str(path),
+            'tag_count': len(tags),
+            'elapsed': elapsed
+        }
+
     def get_status(self) -> Dict:
         """Get current sync status"""
         return {
@@ -369,7 +803,7 @@ async def test_sync_manager():
         cache = manager.cache
         if cache.is_loaded():
             logger.info("\nTesting cache search:")
-            results = cache.search_by_prefix("1girl", limit=5)
+            results = await cache.search_by_prefix_async("1girl", limit=5)
             for r in results:
                 logger.info(f"  {r['tag']} - {r['translation_cn']} (count: {r['post_count']})")
 
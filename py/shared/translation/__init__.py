@@ -1,5 +1,6 @@
 """Translation management module"""
 
 from .translation_loader import TranslationLoader, get_translation_loader
+from .phrase_automaton import PhraseAutomaton
 
-__all__ = ['TranslationLoader', 'get_translation_loader']
+__all__ = ['TranslationLoader', 'get_translation_loader', 'PhraseAutomaton']
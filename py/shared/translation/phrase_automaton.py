@@ -0,0 +1,245 @@
+"""
+Multi-pattern phrase automaton
+Aho-Corasick automaton for converting free-form Chinese prompts to Danbooru tags in one pass
+"""
+
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Logger导入
+from ...utils.logger import get_logger
+logger = get_logger(__name__)
+
+
+def is_cjk_char(char: str) -> bool:
+    """Check if a character is a CJK unified ideograph"""
+    return '\u4e00' <= char <= '\u9fff' or '\u3400' <= char <= '\u4dbf'
+
+
+# Characters that already separate a tag from its neighbours (prompt
+# separators and the brackets/colon of weight syntax like "(tag:1.2)")
+TAG_BOUNDARY_CHARS = frozenset(",，、;；|()（）[]{}<>:：")
+
+
+def is_tag_boundary(char: str) -> bool:
+    """Check if a character separates tags, so no separator needs to be inserted next to it"""
+    return char.isspace() or char in TAG_BOUNDARY_CHARS
+
+
+def contains_cjk(text: str) -> bool:
+    """Check if text contains at least one CJK character"""
+    return any(is_cjk_char(char) for char in text)
+
+
+class PhraseAutomaton:
+    """
+    Aho-Corasick automaton with leftmost-longest match semantics
+
+    Built once over all phrases of a mapping (e.g. cn_to_en), then scans any
+    text in O(len(text) + matches) regardless of how many phrases exist.
+    """
+
+    def __init__(self, mapping: Dict[str, str], require_cjk: bool = True):
+        """
+        Build automaton
+
+        Args:
+            mapping: Phrase -> replacement mapping
+            require_cjk: Only index phrases that contain CJK characters, so
+                English words in a mixed prompt are never rewritten
+        """
+        # State tables (index = state id, 0 = root)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Lengths of every phrase ending at this state (longest first)
+        self._outputs: List[Tuple[int, ...]] = [()]
+        self._values: Dict[str, str] = {}
+
+        for phrase, value in mapping.items():
+            if not phrase or not value:
+                continue
+            if require_cjk and not contains_cjk(phrase):
+                continue
+            self._add_phrase(phrase)
+            self._values[phrase] = value
+
+        self._build_failure_links()
+        logger.debug(f"Phrase automaton built: {self.phrase_count} phrases, {self.state_count} states")
+
+    @property
+    def phrase_count(self) -> int:
+        """Number of indexed phrases"""
+        return len(self._values)
+
+    @property
+    def state_count(self) -> int:
+        """Number of automaton states"""
+        return len(self._goto)
+
+    def _add_phrase(self, phrase: str):
+        """Insert phrase into the trie"""
+        state = 0
+        for char in phrase:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        self._outputs[state] = (len(phrase),)
+
+    def _build_failure_links(self):
+        """Compute failure links and merged outputs in BFS order"""
+        queue = deque()
+        for child in self._goto[0].values():
+            queue.append(child)
+
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+
+                inherited = self._outputs[self._fail[child]]
+                if inherited:
+                    self._outputs[child] = self._outputs[child] + inherited
+
+    def find_matches(self, text: str) -> List[Tuple[int, int, str, str]]:
+        """
+        Find non-overlapping leftmost-longest matches
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            List of (start, end, phrase, replacement) tuples, end exclusive
+        """
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+
+        # Pass 1: automaton scan, remember (end_pos, phrase_lengths) hits
+        hits = []
+        state = 0
+        pos = -1
+        for char in text:
+            pos += 1
+            next_state = goto[state].get(char)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto[state].get(char)
+            state = next_state or 0
+            if outputs[state]:
+                hits.append((pos, outputs[state]))
+
+        if not hits:
+            return []
+
+        # Pass 2: longest phrase per start position
+        longest_at: Dict[int, int] = {}
+        for end_pos, lengths in hits:
+            for length in lengths:
+                start = end_pos - length + 1
+                if longest_at.get(start, 0) < length:
+                    longest_at[start] = length
+
+        # Pass 3: leftmost-longest, non-overlapping selection
+        matches = []
+        cursor = 0
+        text_len = len(text)
+        values = self._values
+        for start in sorted(longest_at):
+            if start < cursor:
+                continue
+            end = start + longest_at[start]
+            if end - start == 1 and (
+                (start > 0 and is_cjk_char(text[start - 1])) or
+                (end < text_len and is_cjk_char(text[end]))
+            ):
+                # Single characters only count as a tag when they stand alone,
+                # otherwise "头发" would turn into "head" + "发"
+                continue
+            phrase = text[start:end]
+            matches.append((start, end, phrase, values[phrase]))
+            cursor = end
+
+        return matches
+
+    def replace(self, text: str, separator: str = ", ",
+                transform: Optional[Callable[[str], str]] = None) -> Tuple[str, List[Tuple[int, int, str, str]]]:
+        """
+        Replace every recognised phrase in text
+
+        Args:
+            text: Mixed Chinese/English text
+            separator: Inserted between a replacement and directly adjacent text or
+                replacements that are not already separated (e.g. "abc白丝def")
+            transform: Optional function applied to each replacement
+
+        Returns:
+            (converted_text, matches)
+        """
+        matches = self.find_matches(text)
+        if not matches:
+            return text, matches
+
+        parts = []
+        last_end = 0
+        for start, end, _, value in matches:
+            if start > last_end:
+                self._append_gap(parts, text[last_end:start], separator)
+                if not is_tag_boundary(text[start - 1]):
+                    parts.append(separator)
+            elif parts:
+                # Adjacent phrases (e.g. "白丝长发") become separate tags
+                parts.append(separator)
+            parts.append(transform(value) if transform else value)
+            last_end = end
+
+        if last_end < len(text):
+            self._append_gap(parts, text[last_end:], separator)
+
+        return "".join(parts), matches
+
+    @staticmethod
+    def _append_gap(parts: List[str], gap: str, separator: str):
+        """Append unmatched text, separating it from a preceding tag unless it starts with a separator"""
+        if parts and not is_tag_boundary(gap[0]):
+            parts.append(separator)
+        parts.append(gap)
+
+
+def find_unmatched_cjk(text: str, matches: List[Tuple[int, int, str, str]]) -> List[str]:
+    """
+    Collect CJK runs that were not covered by any match
+
+    Args:
+        text: Original text
+        matches: Result of PhraseAutomaton.find_matches
+
+    Returns:
+        List of unmatched Chinese fragments
+    """
+    covered = [False] * len(text)
+    for start, end, _, _ in matches:
+        for i in range(start, end):
+            covered[i] = True
+
+    fragments = []
+    current = []
+    for i, char in enumerate(text):
+        if not covered[i] and is_cjk_char(char):
+            current.append(char)
+        elif current:
+            fragments.append("".join(current))
+            current = []
+    if current:
+        fragments.append("".join(current))
+
+    return fragments
@@ -0,0 +1,96 @@
+"""
+Pinyin index builder
+Precomputes full pinyin and pinyin initials for Chinese translations,
+so users can type "baisi" or "bs" to find 白丝 without switching IME
+"""
+
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .phrase_automaton import contains_cjk
+
+# Logger导入
+from ...utils.logger import get_logger
+logger = get_logger(__name__)
+
+try:
+    from pypinyin import lazy_pinyin, Style
+    HAS_PYPINYIN = True
+except ImportError:
+    HAS_PYPINYIN = False
+    logger.warning("pypinyin not available, pinyin autocomplete will be disabled")
+
+
+# Pinyin keys only keep lowercase letters and digits
+_KEY_STRIP_PATTERN = re.compile(r'[^a-z0-9]+')
+# A pinyin query: ASCII letters (digits allowed after the first letter), spaces and apostrophes
+_PINYIN_QUERY_PATTERN = re.compile(r"^[a-zA-Z][a-zA-Z0-9' ]*$")
+
+# Index entry kinds
+KIND_FULL = 0       # "baisi"
+KIND_INITIALS = 1   # "bs"
+
+
+def normalize_pinyin_key(text: str) -> str:
+    """Normalize pinyin text to an index key (lowercase, letters and digits only)"""
+    return _KEY_STRIP_PATTERN.sub('', text.lower())
+
+
+def is_pinyin_query(query: str) -> bool:
+    """Check if a query can be answered by the pinyin index"""
+    return bool(query) and _PINYIN_QUERY_PATTERN.match(query.strip()) is not None
+
+
+def get_pinyin_keys(text: str) -> Tuple[str, str]:
+    """
+    Get full pinyin and initials keys for Chinese text
+
+    Args:
+        text: Chinese text (e.g. "白丝", "1个女孩")
+
+    Returns:
+        (full_key, initials_key), e.g. ("baisi", "bs"); empty strings if unavailable
+    """
+    if not HAS_PYPINYIN or not text:
+        return '', ''
+
+    full = normalize_pinyin_key(''.join(lazy_pinyin(text)))
+    initials = normalize_pinyin_key(''.join(lazy_pinyin(text, style=Style.FIRST_LETTER)))
+    return full, initials
+
+
+def build_pinyin_rows(entries: Iterable[Tuple[str, str, int]]) -> List[Tuple[str, int, str, str, int]]:
+    """
+    Build pinyin index rows
+
+    Args:
+        entries: Iterable of (tag, translation_cn, post_count)
+
+    Returns:
+        List of (key, kind, tag, translation_cn, post_count) rows
+    """
+    if not HAS_PYPINYIN:
+        return []
+
+    rows = []
+    seen: Set[Tuple[str, str]] = set()
+    # Translations repeat a lot across tags, cache their keys
+    key_cache: Dict[str, Tuple[str, str]] = {}
+
+    for tag, translation_cn, post_count in entries:
+        if not tag or not translation_cn or not contains_cjk(translation_cn):
+            continue
+
+        keys = key_cache.get(translation_cn)
+        if keys is None:
+            keys = get_pinyin_keys(translation_cn)
+            key_cache[translation_cn] = keys
+
+        full, initials = keys
+        for key, kind in ((full, KIND_FULL), (initials, KIND_INITIALS)):
+            if not key or (key, tag) in seen:
+                continue
+            seen.add((key, tag))
+            rows.append((key, kind, tag, translation_cn, post_count or 0))
+
+    return rows
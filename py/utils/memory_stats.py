@@ -0,0 +1,234 @@
+"""
+内存统计 - 测量插件各子系统实际占用的内存
+Memory accounting for caches and indexes
+
+- deep_sizeof: 递归 sys.getsizeof（大容器按样本外推），张量/数组按 nbytes 计
+- 子系统通过 register_memory_source 注册统计函数，collect_memory_stats 汇总
+- tracemalloc 快照按需开启（有运行开销，默认关闭）
+"""
+
+import os
+import sys
+import threading
+import tracemalloc
+from array import array
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+# 插件根目录（tracemalloc 快照只统计本插件的分配）
+PLUGIN_ROOT = str(Path(__file__).resolve().parent.parent.parent)
+
+# 容器元素超过此数量时只测量等间隔样本并按比例外推
+DEFAULT_SAMPLE_SIZE = 1000
+
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None), array, range)
+
+
+def _buffer_nbytes(obj) -> Optional[int]:
+    """张量/数组数据缓冲区大小（torch.Tensor、numpy.ndarray），其他对象返回 None"""
+    if hasattr(obj, 'element_size') and hasattr(obj, 'nelement'):
+        try:
+            return obj.element_size() * obj.nelement()
+        except Exception:
+            return None
+    if hasattr(obj, 'dtype'):
+        nbytes = getattr(obj, 'nbytes', None)
+        if isinstance(nbytes, int):
+            return nbytes
+    return None
+
+
+def _sample(items, length: int, sample_size: int):
+    """等间隔取样（items 可迭代，长度为 length）"""
+    step = max(1, length // sample_size)
+    return list(islice(items, 0, None, step))
+
+
+def _deep_sizeof(obj, seen: set, sample_size: int) -> int:
+    obj_id = id(obj)
+    if obj_id in seen:
+        return 0
+    seen.add(obj_id)
+
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, _ATOMIC_TYPES):
+        return size
+
+    nbytes = _buffer_nbytes(obj)
+    if nbytes is not None:
+        return size + nbytes
+
+    if isinstance(obj, dict):
+        length = len(obj)
+        children = obj.items()
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        length = len(obj)
+        children = obj
+    else:
+        # 普通对象：__dict__ 和 __slots__ 属性
+        child_size = 0
+        obj_dict = getattr(obj, '__dict__', None)
+        if obj_dict is not None:
+            child_size += _deep_sizeof(obj_dict, seen, sample_size)
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                value = getattr(obj, slot, None)
+                if value is not None:
+                    child_size += _deep_sizeof(value, seen, sample_size)
+        return size + child_size
+
+    if length == 0:
+        return size
+
+    if length > sample_size:
+        sample = _sample(children, length, sample_size)
+        measured = sum(_deep_sizeof_item(item, seen, sample_size) for item in sample)
+        return size + int(measured * length / len(sample))
+
+    return size + sum(_deep_sizeof_item(item, seen, sample_size) for item in children)
+
+
+def _deep_sizeof_item(item, seen: set, sample_size: int) -> int:
+    """dict.items() 的键值对不是独立对象，分别测量键和值"""
+    if type(item) is tuple and len(item) == 2 and id(item) not in seen:
+        # 普通二元组也按元素测量，差别只是元组本身的 56 字节
+        return _deep_sizeof(item[0], seen, sample_size) + _deep_sizeof(item[1], seen, sample_size)
+    return _deep_sizeof(item, seen, sample_size)
+
+
+def deep_sizeof(obj, sample_size: int = DEFAULT_SAMPLE_SIZE, seen: Optional[set] = None) -> int:
+    """
+    估算对象实际保留的内存（字节）
+
+    递归统计容器内容，同一对象只计一次；元素多于 sample_size 的容器
+    只测量等间隔样本并外推，因此对大索引也只需毫秒级时间。
+
+    Args:
+        obj: 要测量的对象
+        sample_size: 每个容器最多测量的元素数
+        seen: 已统计对象的 id 集合，多次调用共用时共享对象只计一次
+
+    Returns:
+        字节数
+    """
+    return _deep_sizeof(obj, set() if seen is None else seen, sample_size)
+
+
+def get_process_memory() -> Dict:
+    """当前进程的常驻内存（RSS）"""
+    if HAS_PSUTIL:
+        info = psutil.Process(os.getpid()).memory_info()
+        return {'rss_bytes': info.rss, 'vms_bytes': info.vms}
+
+    # 无 psutil 时读取 /proc（仅 Linux）
+    try:
+        with open('/proc/self/statm') as f:
+            pages = f.read().split()
+        page_size = os.sysconf('SC_PAGE_SIZE')
+        return {'rss_bytes': int(pages[1]) * page_size, 'vms_bytes': int(pages[0]) * page_size}
+    except (OSError, ValueError, AttributeError, IndexError):
+        return {'rss_bytes': None, 'vms_bytes': None}
+
+
+# ==================== 子系统注册 ====================
+
+_sources: Dict[str, Callable[[], Dict]] = {}
+_sources_lock = threading.Lock()
+
+
+def register_memory_source(name: str, provider: Callable[[], Dict]):
+    """
+    注册子系统内存统计函数
+
+    Args:
+        name: 子系统名称
+        provider: 返回统计字典的函数，字典中 'bytes' 为该子系统的总字节数
+    """
+    with _sources_lock:
+        _sources[name] = provider
+
+
+def collect_memory_stats() -> Dict:
+    """
+    汇总所有已注册子系统的内存统计
+
+    Returns:
+        {'process': {...}, 'subsystems': {name: {...}}, 'total_bytes': int}
+    """
+    with _sources_lock:
+        sources = list(_sources.items())
+
+    subsystems = {}
+    total = 0
+    for name, provider in sources:
+        try:
+            stats = provider()
+            total += stats.get('bytes', 0)
+        except Exception as e:
+            logger.warning(f"[MemoryStats] 统计 {name} 失败: {e}")
+            stats = {'error': str(e)}
+        subsystems[name] = stats
+
+    return {
+        'process': get_process_memory(),
+        'subsystems': subsystems,
+        'total_bytes': total,
+    }
+
+
+# ==================== tracemalloc ====================
+
+def tracemalloc_control(action: str, top: int = 20) -> Dict:
+    """
+    按需控制 tracemalloc
+
+    Args:
+        action: "start"、"stop" 或 "snapshot"（需先 start）
+        top: 快照返回的分配位置数
+
+    Returns:
+        状态或快照统计（仅本插件文件中的分配，按行号汇总）
+    """
+    if action == 'start':
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            logger.info("[MemoryStats] tracemalloc 已开启")
+        return {'tracing': True}
+
+    if action == 'stop':
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("[MemoryStats] tracemalloc 已关闭")
+        return {'tracing': False}
+
+    if action == 'snapshot':
+        if not tracemalloc.is_tracing():
+            return {'tracing': False, 'error': "tracemalloc 未开启，请先使用 action=start"}
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(True, os.path.join(PLUGIN_ROOT, '*')),)
+        )
+        statistics = snapshot.statistics('lineno')
+        return {
+            'tracing': True,
+            'plugin_traced_bytes': sum(stat.size for stat in statistics),
+            'top': [{
+                'location': f"{os.path.relpath(stat.traceback[0].filename, PLUGIN_ROOT)}:{stat.traceback[0].lineno}",
+                'bytes': stat.size,
+                'count': stat.count,
+            } for stat in statistics[:top]],
+        }
+
+    raise ValueError(f"Unknown tracemalloc action: {action}")
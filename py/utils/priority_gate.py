@@ -0,0 +1,138 @@
+"""
+前台优先门 - 后台标签同步让路给交互请求和工作流执行
+Cooperative priority gate between foreground work and background sync
+
+- 前台：补全/帖子等 HTTP 请求（foreground_request 装饰器）和 ComfyUI 节点执行（foreground 上下文）
+- 后台：同步在每次 HTTP 请求、每页写入、每步索引构建前调用 wait_for_idle
+- 前台活动期间及结束后 IDLE_DELAY 秒内后台暂停；持续繁忙时每 MAX_WAIT 秒放行一步（降速而不是饿死）
+- 同步运行在独立线程和事件循环中，因此用线程锁 + 轮询实现，不依赖某个事件循环
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PriorityGate:
+    """Tracks foreground activity; background work waits until it is idle"""
+
+    # Seconds without foreground activity before background work resumes
+    IDLE_DELAY = 0.75
+    # Longest single wait, so a long render slows the sync instead of stopping it
+    MAX_WAIT = 30.0
+    # Poll interval while waiting (foreground and sync run on different threads/loops)
+    POLL_INTERVAL = 0.05
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: Dict[str, int] = {}
+        self._last_activity = 0.0
+        self.enabled = True
+
+        # Statistics
+        self._yields = 0
+        self._yield_time = 0.0
+
+    @contextmanager
+    def foreground(self, source: str = "request"):
+        """
+        Mark a block of foreground work (usable around awaits and across threads)
+
+        Args:
+            source: Label shown in get_stats, e.g. "autocomplete" or "prompt"
+        """
+        with self._lock:
+            self._active[source] = self._active.get(source, 0) + 1
+            self._last_activity = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                remaining = self._active.get(source, 1) - 1
+                if remaining > 0:
+                    self._active[source] = remaining
+                else:
+                    self._active.pop(source, None)
+                self._last_activity = time.monotonic()
+
+    def mark_activity(self):
+        """Record a one-shot foreground event"""
+        with self._lock:
+            self._last_activity = time.monotonic()
+
+    def is_busy(self) -> bool:
+        """True while foreground work runs or finished less than IDLE_DELAY ago"""
+        if not self.enabled:
+            return False
+        with self._lock:
+            return bool(self._active) or time.monotonic() - self._last_activity < self.IDLE_DELAY
+
+    async def wait_for_idle(self, max_wait: Optional[float] = None) -> float:
+        """
+        Wait until no foreground work is running (called by background work)
+
+        Args:
+            max_wait: Give up waiting after this many seconds (default MAX_WAIT)
+
+        Returns:
+            Seconds waited, 0.0 if the gate was already idle
+        """
+        if not self.is_busy():
+            return 0.0
+
+        max_wait = self.MAX_WAIT if max_wait is None else max_wait
+        start = time.monotonic()
+        while self.is_busy() and time.monotonic() - start < max_wait:
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self._yields += 1
+            self._yield_time += waited
+        return waited
+
+    def get_stats(self) -> Dict:
+        """Current foreground activity and background wait totals"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'active': dict(self._active),
+                'idle_for': round(time.monotonic() - self._last_activity, 2) if self._last_activity else None,
+                'yields': self._yields,
+                'yield_time': round(self._yield_time, 2),
+            }
+
+
+# Global priority gate instance
+_priority_gate = None
+
+
+def get_priority_gate() -> PriorityGate:
+    """Get global priority gate instance"""
+    global _priority_gate
+    if _priority_gate is None:
+        _priority_gate = PriorityGate()
+    return _priority_gate
+
+
+def foreground_request(source: str):
+    """
+    aiohttp 路由装饰器：请求处理期间标记为前台活动
+
+    Args:
+        source: Label for get_stats (usually the route name)
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request):
+            with get_priority_gate().foreground(source):
+                return await handler(request)
+        return wrapper
+    return decorator
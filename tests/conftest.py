@@ -0,0 +1,11 @@
+"""
+pytest 配置 - 让测试可以直接导入插件的 py 包
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
@@ -0,0 +1,60 @@
+"""
+同步测试辅助 - 在临时数据库和本地 Danbooru 替身服务器上运行 TagSyncManager
+"""
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "tools"))
+
+from danbooru_stub_server import DanbooruFixtures, DanbooruStubServer
+from py.shared.db.db_manager import TagDatabaseManager
+from py.shared.fetcher.tag_fetcher import DanbooruTagFetcher
+from py.shared.sync.tag_sync_manager import TagSyncManager
+
+# Small pages keep the fixtures small while still crawling several pages
+TAGS_PER_PAGE = 100
+
+
+@asynccontextmanager
+async def stub_sync_manager(tmp_path: Path, max_tags: int = 500, **fixture_options):
+    """
+    Yield (manager, server) for a TagSyncManager on a scratch database
+
+    Args:
+        tmp_path: Directory for the database and config file
+        max_tags: tag_sync.max_tags of the manager
+        **fixture_options: DanbooruFixtures arguments (tag_count, relation_count, ...)
+    """
+    fixture_options.setdefault("tag_count", max_tags + 50)
+    fixture_options.setdefault("post_count", 0)
+    fixture_options.setdefault("relation_count", 20)
+    server = DanbooruStubServer(DanbooruFixtures(**fixture_options))
+    base_url = await server.start()
+
+    manager = TagSyncManager(config_path=str(tmp_path / "config.json"))
+    manager.config['tag_sync'].update({
+        'max_tags': max_tags,
+        'min_post_count': 1,
+        'api_rate_limit': 0,
+        'fetch_concurrency': 1,
+    })
+    manager.priority_gate = None
+    manager.db_manager = TagDatabaseManager(str(tmp_path / "tags.db"))
+    manager.fetcher = DanbooruTagFetcher(rate_limit=0, concurrency=1)
+    manager.fetcher.API_BASE = base_url
+    manager.fetcher.TAGS_PER_PAGE = TAGS_PER_PAGE
+    await manager.db_manager.initialize_database()
+    try:
+        yield manager, server
+    finally:
+        await manager.fetcher.close()
+        await manager.db_manager.close()
+        await server.stop()
+
+
+async def count_rows(db: TagDatabaseManager, table: str) -> int:
+    """Number of rows in a table"""
+    conn = await db.get_read_connection()
+    cursor = await conn.execute(f"SELECT COUNT(*) FROM {table}")
+    return (await cursor.fetchone())[0]
@@ -0,0 +1,71 @@
+"""
+标签共现测试 - 相关标签排序、数据包导入
+"""
+import asyncio
+
+import pytest
+
+from py.shared.db.cooccurrence import rank_related_tags
+from sync_helpers import stub_sync_manager
+
+ROWS = [
+    # Diagonal rows hold each input tag's post count
+    ("cat_ears", "cat_ears", 100),
+    ("cat_ears", "tail", 50),
+    ("cat_ears", "smile", 20),
+    ("cat_ears", "maid", 10),
+    ("maid", "maid", 40),
+    ("maid", "tail", 4),
+    ("maid", "apron", 30),
+    ("maid", "cat_ears", 10),
+]
+
+
+def test_score_is_mean_conditional_probability():
+    ranked = dict(rank_related_tags(ROWS, ["cat_ears", "maid"]))
+    assert ranked["tail"] == pytest.approx((50 / 100 + 4 / 40) / 2)
+    assert ranked["apron"] == pytest.approx(30 / 40 / 2)
+    assert ranked["smile"] == pytest.approx(20 / 100 / 2)
+
+
+def test_input_tags_are_excluded_and_results_sorted():
+    ranked = rank_related_tags(ROWS, ["cat_ears", "maid"])
+    assert [tag for tag, _ in ranked] == ["apron", "tail", "smile"]
+
+
+def test_limit_keeps_the_best_and_breaks_ties_by_name():
+    rows = [("a", "a", 10)] + [("a", f"n{i}", 5) for i in (3, 1, 2)] + [("a", "top", 9)]
+    assert [tag for tag, _ in rank_related_tags(rows, ["a"], limit=3)] == ["top", "n1", "n2"]
+    assert rank_related_tags(rows, ["a"], limit=0) == []
+
+
+def test_tags_without_post_count_are_ignored():
+    assert rank_related_tags([("a", "b", 5)], ["a"]) == []
+    ranked = rank_related_tags([("a", "a", 10), ("a", "b", 5), ("x", "c", 5)], ["a", "x"])
+    assert ranked == [("b", pytest.approx(0.5))]
+
+
+def test_importing_a_dump_twice_does_not_double_counts(tmp_path, monkeypatch):
+    async def run():
+        async with stub_sync_manager(tmp_path) as (manager, _):
+            monkeypatch.setattr(manager.translation_loader, "_loaded", True)
+            monkeypatch.setattr(manager.translation_loader, "cn_to_en", {})
+            db = manager.db_manager
+            await db.upsert_changed_tags([{'tag': tag, 'category': 0, 'post_count': 100}
+                                          for tag in ("cat_ears", "tail", "maid")])
+            await db.add_cooccurrence_counts({("cat_ears", "cat_ears"): 100, ("cat_ears", "tail"): 50})
+            dump_path = tmp_path / "tags_dump.jsonl.gz"
+            await manager.export_dump(str(dump_path))
+
+            # Counts learned locally after the export, for a tag not in the dump
+            await db.add_cooccurrence_counts({("maid", "maid"): 7})
+
+            for _ in range(2):
+                await manager.import_dump(str(dump_path))
+
+            rows = await db.get_cooccurrence_rows(["cat_ears", "maid"])
+            assert sorted(tuple(row) for row in rows) == [
+                ("cat_ears", "cat_ears", 100), ("cat_ears", "tail", 50), ("maid", "maid", 7),
+            ]
+
+    asyncio.run(run())
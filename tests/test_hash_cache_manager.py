@@ -0,0 +1,197 @@
+"""
+哈希缓存日志测试 - 追加写、删除记录、启动压缩、旧版 JSON 迁移
+"""
+import importlib.util
+import json
+import os
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+PACKAGE_DIR = Path(__file__).parent.parent / "py" / "save_image_plus"
+
+
+def _load_hash_cache_module():
+    """
+    Import hash_cache_manager without running py/save_image_plus/__init__.py
+
+    The package __init__ registers the ComfyUI node, which needs PIL and
+    ComfyUI's folder_paths; the cache manager itself only needs py.shared.
+    """
+    import py  # noqa: F401
+
+    package_name = "py.save_image_plus"
+    if package_name not in sys.modules:
+        package = types.ModuleType(package_name)
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules[package_name] = package
+
+    module_name = f"{package_name}.hash_cache_manager"
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, PACKAGE_DIR / "hash_cache_manager.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
+
+
+HashCacheManager = _load_hash_cache_module().HashCacheManager
+
+
+@pytest.fixture
+def open_cache(tmp_path, monkeypatch):
+    """Open a fresh (non-singleton) cache manager on tmp_path/hash_cache.jsonl"""
+    # Writes are flushed explicitly, the debounce timer never fires during a test
+    monkeypatch.setattr(HashCacheManager, "FLUSH_DELAY", 60.0)
+    managers = []
+
+    def open_manager(max_memory_entries: int = 100) -> HashCacheManager:
+        monkeypatch.setattr(HashCacheManager, "_instance", None)
+        manager = HashCacheManager(str(tmp_path / "hash_cache.jsonl"), max_memory_entries)
+        managers.append(manager)
+        return manager
+
+    yield open_manager
+    for manager in managers:
+        manager.flush()
+
+
+def make_file(tmp_path: Path, name: str, content: bytes = b"model") -> str:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def log_records(tmp_path: Path):
+    with open(tmp_path / "hash_cache.jsonl", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_hashes_are_appended_and_reloaded(tmp_path, open_cache):
+    files = [make_file(tmp_path, f"model_{i}.safetensors", os.urandom(64)) for i in range(3)]
+    cache = open_cache()
+    hashes = [cache.calculate_and_cache_hash(path) for path in files]
+    assert cache.get_stats()['pending_writes'] == 3
+
+    cache.flush()
+    assert [record['path'] for record in log_records(tmp_path)] == files
+
+    reopened = open_cache()
+    assert [reopened.get_hash(path) for path in files] == hashes
+    assert reopened.get_stats()['compactions'] == 0
+
+
+def test_unchanged_hash_is_not_logged_twice(tmp_path, open_cache):
+    path = make_file(tmp_path, "model.safetensors")
+    cache = open_cache()
+    cache.set_hash(path, "abc1234567")
+    cache.set_hash(path, "abc1234567")
+    cache.flush()
+    assert len(log_records(tmp_path)) == 1
+
+
+def test_modified_file_misses_and_keeps_both_versions(tmp_path, open_cache):
+    path = make_file(tmp_path, "model.safetensors", b"v1")
+    cache = open_cache()
+    cache.set_hash(path, "hash_v1")
+
+    Path(path).write_bytes(b"version 2")
+    assert cache.get_hash(path) is None
+    cache.set_hash(path, "hash_v2")
+    cache.flush()
+
+    # The log keeps both (size, mtime) versions of the file
+    reopened = open_cache()
+    assert reopened.get_hash(path) == "hash_v2"
+    assert reopened.get_stats()['disk_entries'] == 2
+
+
+def test_tombstone_removes_every_version(tmp_path, open_cache):
+    kept = make_file(tmp_path, "kept.safetensors")
+    removed = make_file(tmp_path, "removed.safetensors")
+    cache = open_cache()
+    cache.set_hash(kept, "kept_hash")
+    cache.set_hash(removed, "removed_hash")
+    cache.flush()
+
+    cache.remove_file_cache(removed)
+    cache.flush()
+    assert log_records(tmp_path)[-1] == {'path': removed, 'deleted': True}
+    assert cache.get_hash(removed) is None
+
+    # Startup drops the tombstone together with the records it deletes
+    reopened = open_cache()
+    assert reopened.get_hash(removed) is None
+    assert reopened.get_hash(kept) == "kept_hash"
+    assert reopened.get_stats()['compactions'] == 1
+    assert [record['path'] for record in log_records(tmp_path)] == [kept]
+
+
+def test_duplicate_records_are_compacted_on_startup(tmp_path, open_cache):
+    path = make_file(tmp_path, "model.safetensors")
+    size, mtime = os.stat(path).st_size, os.stat(path).st_mtime
+    record = {'path': path, 'size': size, 'mtime': mtime, 'hash': "same_hash"}
+    (tmp_path / "hash_cache.jsonl").write_text(
+        "".join(json.dumps(record) + "\n" for _ in range(5)), encoding="utf-8"
+    )
+
+    cache = open_cache()
+    assert cache.get_hash(path) == "same_hash"
+    assert cache.get_stats()['compactions'] == 1
+    assert log_records(tmp_path) == [record]
+
+
+def test_torn_last_line_is_dropped(tmp_path, open_cache):
+    path = make_file(tmp_path, "model.safetensors")
+    cache = open_cache()
+    cache.set_hash(path, "good_hash")
+    cache.flush()
+    with open(tmp_path / "hash_cache.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"path": "half-writ')
+
+    reopened = open_cache()
+    assert reopened.get_hash(path) == "good_hash"
+    assert reopened.get_stats()['compactions'] == 1
+    assert len(log_records(tmp_path)) == 1
+
+
+def test_evicted_entries_are_served_from_the_disk_index(tmp_path, open_cache):
+    files = [make_file(tmp_path, f"model_{i}.safetensors", os.urandom(32)) for i in range(4)]
+    cache = open_cache(max_memory_entries=2)
+    for i, path in enumerate(files):
+        cache.set_hash(path, f"hash_{i}")
+
+    assert cache.get_hash(files[0]) == "hash_0"
+    stats = cache.get_stats()
+    assert stats['disk_hits'] == 1
+    assert stats['memory_entries'] == 2
+
+
+def test_legacy_json_cache_is_migrated_and_deleted(tmp_path, open_cache):
+    valid = make_file(tmp_path, "valid.safetensors")
+    stale = make_file(tmp_path, "stale.safetensors")
+    legacy_file = tmp_path / "hash_cache.json"
+    legacy_file.write_text(json.dumps({
+        valid: {'mtime': os.stat(valid).st_mtime, 'hash': "legacy_hash"},
+        stale: {'mtime': os.stat(stale).st_mtime - 100, 'hash': "stale_hash"},
+        str(tmp_path / "missing.safetensors"): {'mtime': 1.0, 'hash': "missing_hash"},
+    }), encoding="utf-8")
+
+    cache = open_cache()
+    assert cache.get_hash(valid) == "legacy_hash"
+    assert cache.get_hash(stale) is None
+    assert not legacy_file.exists()
+    assert [record['path'] for record in log_records(tmp_path)] == [valid]
+
+
+def test_legacy_json_cache_without_valid_entries_is_deleted(tmp_path, open_cache):
+    legacy_file = tmp_path / "hash_cache.json"
+    legacy_file.write_text(json.dumps({
+        str(tmp_path / "missing.safetensors"): {'mtime': 1.0, 'hash': "missing_hash"},
+    }), encoding="utf-8")
+
+    cache = open_cache()
+    assert cache.get_stats()['disk_entries'] == 0
+    assert not legacy_file.exists()
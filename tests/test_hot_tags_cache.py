@@ -0,0 +1,43 @@
+"""
+HotTagsCache 数据库模式测试 - 同步接口不能在事件循环中阻塞
+"""
+import asyncio
+
+import pytest
+
+from py.shared.cache.memory_cache import HotTagsCache
+from py.shared.db.db_manager import TagDatabaseManager
+
+
+@pytest.fixture
+def cache(tmp_path):
+    db = TagDatabaseManager(str(tmp_path / "tags.db"))
+
+    async def setup():
+        await db.initialize_database()
+        await db.upsert_changed_tags([
+            {'tag': 'long_hair', 'category': 0, 'post_count': 900, 'translation_cn': '长发'},
+            {'tag': 'long_sleeves', 'category': 0, 'post_count': 800, 'translation_cn': '长袖'},
+        ])
+        await db.refresh_prefix_topk()
+
+    asyncio.run(setup())
+    cache = HotTagsCache(use_database_query=True)
+    cache.db_manager = db
+    yield cache
+    asyncio.run(db.close())
+
+
+def test_sync_search_works_without_a_running_loop(cache):
+    results = cache.search_optimized("long", limit=5, search_type="english")
+    assert [result.tag for result in results] == ["long_hair", "long_sleeves"]
+
+
+def test_sync_search_refuses_to_block_a_running_loop(cache):
+    async def route():
+        with pytest.raises(RuntimeError, match="_async"):
+            cache.search_by_prefix("long")
+        return await cache.search_by_prefix_async("long")
+
+    results = asyncio.run(route())
+    assert [result.tag for result in results] == ["long_hair", "long_sleeves"]
@@ -0,0 +1,95 @@
+"""
+PhraseAutomaton 测试 - 最左最长匹配、单字规则和分隔符插入
+"""
+from py.shared.translation.phrase_automaton import PhraseAutomaton, find_unmatched_cjk
+
+MAPPING = {
+    "白丝": "white_thighhighs",
+    "长发": "long_hair",
+    "长": "long",
+    "发": "hair",
+    "头": "head",
+    "金色长发": "blonde_hair, long_hair",
+    "金色": "blonde",
+    "猫": "cat",
+    "丝袜": "stockings",
+    "cat": "should_not_be_indexed",
+}
+
+
+def make_automaton():
+    return PhraseAutomaton(MAPPING)
+
+
+def phrases(matches):
+    return [phrase for _, _, phrase, _ in matches]
+
+
+def test_only_cjk_phrases_are_indexed():
+    automaton = make_automaton()
+    assert automaton.phrase_count == len(MAPPING) - 1
+    assert automaton.find_matches("cat") == []
+
+
+def test_longest_phrase_wins_at_same_start():
+    matches = make_automaton().find_matches("金色长发")
+    assert matches == [(0, 4, "金色长发", "blonde_hair, long_hair")]
+
+
+def test_leftmost_match_wins_over_overlapping_later_match():
+    # "白丝" 与 "丝袜" 重叠，先开始的 "白丝" 优先
+    matches = make_automaton().find_matches("白丝袜")
+    assert phrases(matches) == ["白丝"]
+
+
+def test_scan_continues_after_a_match():
+    matches = make_automaton().find_matches("金色的长发")
+    assert phrases(matches) == ["金色", "长发"]
+
+
+def test_matches_are_non_overlapping_and_ordered():
+    matches = make_automaton().find_matches("白丝长发白丝")
+    assert phrases(matches) == ["白丝", "长发", "白丝"]
+    ends = [end for _, end, _, _ in matches]
+    starts = [start for start, _, _, _ in matches]
+    assert all(start >= end for start, end in zip(starts[1:], ends))
+
+
+def test_single_character_only_matches_when_standalone():
+    automaton = make_automaton()
+    # "头发" 不能拆成 "head" + "hair"
+    assert automaton.find_matches("头发") == []
+    assert phrases(automaton.find_matches("猫, 头")) == ["猫", "头"]
+
+
+def test_replace_separates_adjacent_phrases():
+    text, _ = make_automaton().replace("白丝长发")
+    assert text == "white_thighhighs, long_hair"
+
+
+def test_replace_inserts_separator_next_to_ascii_text():
+    text, _ = make_automaton().replace("abc白丝def")
+    assert text == "abc, white_thighhighs, def"
+
+
+def test_replace_keeps_existing_separators_and_weight_syntax():
+    automaton = make_automaton()
+    assert automaton.replace("1girl, 白丝, 猫")[0] == "1girl, white_thighhighs, cat"
+    assert automaton.replace("(长发:1.2)")[0] == "(long_hair:1.2)"
+
+
+def test_replace_applies_transform():
+    text, _ = make_automaton().replace("白丝", transform=lambda value: value.replace("_", " "))
+    assert text == "white thighhighs"
+
+
+def test_replace_without_matches_returns_text_unchanged():
+    text, matches = make_automaton().replace("头发很多")
+    assert text == "头发很多"
+    assert matches == []
+
+
+def test_find_unmatched_cjk_collects_uncovered_runs():
+    text = "白丝和很多猫咪"
+    matches = make_automaton().find_matches(text)
+    assert find_unmatched_cjk(text, matches) == ["和很多猫咪"]
@@ -0,0 +1,95 @@
+"""
+派生搜索索引增量刷新测试 - 只刷新变化标签的行，结果与全量重建一致
+"""
+import asyncio
+
+from sync_helpers import stub_sync_manager
+
+DERIVED_TABLES = {
+    "tag_aliases": "alias, tag",
+    "prefix_topk": "prefix, rank, tag",
+    "translation_grams": "gram, post_count, tag",
+    "pinyin_index": "key, kind, tag, translation_cn, post_count",
+}
+
+BASE_TAGS = [
+    ("long_hair", "长发", 9000), ("short_hair", "短发", 8000), ("white_thighhighs", "白丝", 7000),
+    ("black_thighhighs", "黑丝", 6000), ("smile", "微笑", 5000), ("school_uniform", "校服", 4000),
+    ("sky", "天空", 3000), ("skirt", "裙子", 2000), ("solo", None, 1000),
+]
+
+
+def use_translations(manager, monkeypatch):
+    """Small cn_to_en table instead of the bundled translation files"""
+    loader = manager.translation_loader
+    monkeypatch.setattr(loader, "_loaded", True)
+    monkeypatch.setattr(loader, "cn_to_en", {"白色过膝袜": "white_thighhighs", "微笑": "smile", "笑容": "smile"})
+
+
+def tag_rows(tags):
+    return [{'tag': tag, 'category': 0, 'post_count': count, 'translation_cn': translation}
+            for tag, translation, count in tags]
+
+
+async def snapshot(db):
+    conn = await db.get_read_connection()
+    tables = {}
+    for table, columns in DERIVED_TABLES.items():
+        cursor = await conn.execute(f"SELECT {columns} FROM {table} ORDER BY {columns}")
+        tables[table] = [tuple(row) for row in await cursor.fetchall()]
+    return tables
+
+
+def test_delta_refresh_matches_full_rebuild(tmp_path, monkeypatch):
+    async def run():
+        async with stub_sync_manager(tmp_path) as (manager, _):
+            use_translations(manager, monkeypatch)
+            db = manager.db_manager
+            await db.upsert_changed_tags(tag_rows(BASE_TAGS))
+            await db.update_tag_relations("aliases", [("longhair", "long_hair"), ("sk", "sky")], [])
+            await manager._refresh_search_indexes()
+
+            # Delta: new tag, changed translation, changed count, re-pointed and removed aliases
+            changed = set()
+            await db.upsert_changed_tags(tag_rows([
+                ("sleeping", "睡觉", 9500),
+                ("smile", "笑容", 5000),
+                ("skirt", "裙子", 10000),
+                ("sky", "天空", 3000),
+            ]), changed_tags=changed)
+            assert changed == {"sleeping", "smile", "skirt"}
+
+            await db.update_tag_relations("aliases", [("longhair", "short_hair")], [("sk", "sky")],
+                                          alias_targets=changed)
+            assert {"long_hair", "short_hair", "sky"} <= changed
+
+            await manager._refresh_search_indexes(changed)
+            incremental = await snapshot(db)
+
+            await manager._refresh_search_indexes()
+            assert incremental == await snapshot(db)
+
+    asyncio.run(run())
+
+
+def test_delta_refresh_leaves_other_rows_untouched(tmp_path, monkeypatch):
+    async def run():
+        async with stub_sync_manager(tmp_path) as (manager, _):
+            use_translations(manager, monkeypatch)
+            db = manager.db_manager
+            await db.upsert_changed_tags(tag_rows(BASE_TAGS))
+            await manager._refresh_search_indexes()
+            before = await snapshot(db)
+
+            changed = set()
+            await db.upsert_changed_tags(tag_rows([("smile", "笑脸", 5000)]), changed_tags=changed)
+            await manager._refresh_search_indexes(changed)
+            after = await snapshot(db)
+
+            for table in ("translation_grams", "pinyin_index"):
+                assert [row for row in after[table] if "smile" not in row] == \
+                       [row for row in before[table] if "smile" not in row]
+            assert ("笑", 5000, "smile") in after["translation_grams"]
+            assert ("微", 5000, "smile") not in after["translation_grams"]
+
+    asyncio.run(run())
@@ -0,0 +1,106 @@
+"""
+全量同步日志测试 - 按页提交、中断后续传、完成时清理
+"""
+import asyncio
+
+import pytest
+
+from sync_helpers import TAGS_PER_PAGE, count_rows, stub_sync_manager
+
+
+class Interrupted(Exception):
+    """Raised by the progress callback to simulate a restart mid-sync"""
+
+
+def interrupt_after(pages: int):
+    """Progress callback that stops the sync after a number of committed pages"""
+    committed = []
+
+    def callback(page, saved, total):
+        committed.append(page)
+        if len(committed) >= pages:
+            raise Interrupted()
+
+    return callback
+
+
+def test_journal_page_is_committed_with_its_rows(tmp_path):
+    async def run():
+        async with stub_sync_manager(tmp_path) as (manager, _):
+            db = manager.db_manager
+            await db.begin_sync_generation({'mode': 'full', 'started_at': 1.0})
+            tags = [{'tag': f'tag_{i}', 'category': 0, 'post_count': 100 - i, 'translation_cn': None}
+                    for i in range(5)]
+            await db.upsert_changed_tags(tags, journal_page=3)
+
+            assert await db.get_sync_journal() == {3: 5}
+            assert await count_rows(db, "hot_tags") == 5
+
+            # A new generation starts with an empty journal
+            await db.begin_sync_generation({'mode': 'full', 'started_at': 2.0})
+            assert await db.get_sync_journal() == {}
+            assert (await db.get_sync_progress())['started_at'] == 2.0
+
+    asyncio.run(run())
+
+
+def test_complete_sync_generation_clears_journal_and_progress(tmp_path):
+    async def run():
+        async with stub_sync_manager(tmp_path) as (manager, _):
+            db = manager.db_manager
+            await db.begin_sync_generation({'mode': 'full', 'started_at': 123.0})
+            await db.upsert_changed_tags([{'tag': 'a', 'category': 0, 'post_count': 1}], journal_page=1)
+
+            await db.complete_sync_generation(123.0)
+
+            assert await db.get_sync_journal() == {}
+            assert await db.get_sync_progress() == {}
+            assert await db.get_delta_cursor() == 123.0
+            assert not await manager.has_pending_full_sync()
+
+    asyncio.run(run())
+
+
+def test_interrupted_full_sync_resumes_from_journal(tmp_path):
+    async def run():
+        async with stub_sync_manager(tmp_path, max_tags=500) as (manager, server):
+            with pytest.raises(Interrupted):
+                await manager.stream_full_sync(interrupt_after(2))
+
+            assert await manager.has_pending_full_sync()
+            assert await manager.db_manager.get_sync_journal() == {1: TAGS_PER_PAGE, 2: TAGS_PER_PAGE}
+            started_at = (await manager.db_manager.get_sync_progress())['started_at']
+
+            requests_before = server.stats['requests']
+            generation, saved = await manager.stream_full_sync(lambda page, saved, total: None)
+
+            # Only pages 3-5 are fetched again, pages 1-2 come from the journal
+            assert server.stats['requests'] - requests_before == 3
+            assert generation['started_at'] == started_at
+            assert saved == 500
+            assert await count_rows(manager.db_manager, "hot_tags") == 500
+            assert set(await manager.db_manager.get_sync_journal()) == {1, 2, 3, 4, 5}
+
+            await manager.db_manager.complete_sync_generation(generation['started_at'])
+            assert not await manager.has_pending_full_sync()
+
+    asyncio.run(run())
+
+
+def test_changed_sync_settings_start_a_new_generation(tmp_path):
+    async def run():
+        async with stub_sync_manager(tmp_path, max_tags=500) as (manager, server):
+            with pytest.raises(Interrupted):
+                await manager.stream_full_sync(interrupt_after(2))
+
+            # The journal of a different max_tags does not describe the same pages
+            manager.config['tag_sync']['max_tags'] = 300
+            requests_before = server.stats['requests']
+            generation, saved = await manager.stream_full_sync(lambda page, saved, total: None)
+
+            assert server.stats['requests'] - requests_before == 3
+            assert generation['max_tags'] == 300
+            assert saved == 300
+            assert set(await manager.db_manager.get_sync_journal()) == {1, 2, 3}
+
+    asyncio.run(run())
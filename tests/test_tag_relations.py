@@ -0,0 +1,97 @@
+"""
+标签别名/蕴含导入测试 - 增删记录、别名解析、蕴含链展开、增量导入
+"""
+import asyncio
+import time
+
+import pytest
+
+from danbooru_stub_server import iso_time
+from sync_helpers import count_rows, stub_sync_manager
+
+
+def test_update_tag_relations_adds_and_removes_aliases(tmp_path):
+    async def run():
+        async with stub_sync_manager(tmp_path) as (manager, _):
+            db = manager.db_manager
+            changes = await db.update_tag_relations("aliases", [("kitty", "cat"), ("doggo", "dog")], [])
+            assert changes == 2
+            assert await db.resolve_aliases(["Kitty", "doggo", "cat"]) == {"kitty": "cat", "doggo": "dog"}
+
+            # A re-pointed alias replaces its old target, a removed one disappears
+            await db.update_tag_relations("aliases", [("kitty", "cat_ears")], [("doggo", "dog")])
+            assert await db.resolve_aliases(["kitty", "doggo"]) == {"kitty": "cat_ears"}
+
+            # Re-importing an unchanged alias is not a change
+            assert await db.update_tag_relations("aliases", [("kitty", "cat_ears")], []) == 0
+
+    asyncio.run(run())
+
+
+def test_update_tag_relations_writes_metadata_with_the_page(tmp_path):
+    async def run():
+        async with stub_sync_manager(tmp_path) as (manager, _):
+            db = manager.db_manager
+            await db.update_tag_relations("implications", [("a", "b")], [],
+                                          metadata={"implications_sync_progress": '{"page_cursor": "b5"}'})
+            assert await db.get_metadata("implications_sync_progress") == '{"page_cursor": "b5"}'
+
+    asyncio.run(run())
+
+
+def test_get_implied_tags_follows_chains_and_stops_at_cycles(tmp_path):
+    async def run():
+        async with stub_sync_manager(tmp_path) as (manager, _):
+            db = manager.db_manager
+            await db.update_tag_relations("implications", [
+                ("black_thighhighs", "thighhighs"),
+                ("thighhighs", "legwear"),
+                ("loop_a", "loop_b"),
+                ("loop_b", "loop_a"),
+            ], [])
+
+            implied = await db.get_implied_tags(["Black_Thighhighs", "loop_a", "unrelated"])
+            assert sorted(implied["black_thighhighs"]) == ["legwear", "thighhighs"]
+            assert implied["loop_a"] == ["loop_b"]
+            assert "unrelated" not in implied
+
+            await db.update_tag_relations("implications", [], [("thighhighs", "legwear")])
+            implied = await db.get_implied_tags(["black_thighhighs"])
+            assert implied == {"black_thighhighs": ["thighhighs"]}
+
+    asyncio.run(run())
+
+
+def test_unknown_relation_kind_raises(tmp_path):
+    async def run():
+        async with stub_sync_manager(tmp_path) as (manager, _):
+            with pytest.raises(ValueError):
+                await manager.db_manager.update_tag_relations("synonyms", [("a", "b")], [])
+
+    asyncio.run(run())
+
+
+def test_sync_tag_relations_imports_active_records_then_deltas(tmp_path):
+    async def run():
+        async with stub_sync_manager(tmp_path, relation_count=30) as (manager, server):
+            fixtures = server.fixtures
+            db = manager.db_manager
+
+            await manager.sync_tag_relations()
+            active_aliases = [r for r in fixtures.aliases if r["status"] == "active"]
+            active_implications = [r for r in fixtures.implications if r["status"] == "active"]
+            assert await count_rows(db, "remote_tag_aliases") == len(active_aliases)
+            assert await count_rows(db, "tag_implications") == len(active_implications)
+            assert await db.get_metadata("aliases_sync_cursor")
+            assert await db.get_metadata("aliases_sync_progress") is None
+
+            # Delete one alias on the server, the next run only fetches changed records
+            deleted = active_aliases[0]
+            now = time.time()
+            deleted.update(status="deleted", updated_at=iso_time(now), _updated=now)
+
+            await manager.sync_tag_relations()
+            assert await count_rows(db, "remote_tag_aliases") == len(active_aliases) - 1
+            assert await db.resolve_aliases([deleted["antecedent_name"]]) == {}
+
+    asyncio.run(run())
@@ -0,0 +1,88 @@
+"""
+Benchmark tag database load time: per-page upserts vs bulk-load fast path
+
+The per-page path is what full syncs use (upsert_changed_tags with a journal
+row per 1000-tag page); the bulk-load path only serves dump imports.
+
+Usage:
+    python tools/benchmark_bulk_load.py [tag_count]
+"""
+import asyncio
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from py.shared.db.db_manager import TagDatabaseManager
+
+
+def generate_tags(count: int):
+    """Generate deterministic synthetic tags"""
+    rng = random.Random(42)
+    alphabet = string.ascii_lowercase + "_"
+    tags = {}
+    while len(tags) < count:
+        name = ''.join(rng.choice(alphabet) for _ in range(rng.randint(3, 20)))
+        tags[name] = {
+            'tag': name,
+            'category': rng.choice([0, 1, 3, 4, 5]),
+            'post_count': rng.randint(100, 5_000_000),
+            'translation_cn': f"标签{len(tags)}" if rng.random() < 0.4 else None,
+        }
+    return list(tags.values())
+
+
+async def load_paged(db: TagDatabaseManager, tags):
+    """Full-sync path: 1000-row pages upserted and journaled, one commit each"""
+    for page, i in enumerate(range(0, len(tags), 1000), start=1):
+        await db.upsert_changed_tags(tags[i:i + 1000], journal_page=page)
+
+
+async def load_bulk(db: TagDatabaseManager, tags):
+    """Bulk-load fast path (dump import)"""
+    await db.bulk_load_tags(tags)
+
+
+async def run_case(name: str, loader, tags) -> float:
+    """Load tags into a fresh database and return elapsed seconds"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = TagDatabaseManager(str(Path(tmp_dir) / "bench.db"))
+        await db.initialize_database()
+
+        start = time.perf_counter()
+        await loader(db, tags)
+        elapsed = time.perf_counter() - start
+
+        count = await db.get_tags_count()
+        fts_rows = await (await (await db.get_connection()).execute(
+            "SELECT COUNT(*) FROM hot_tags_fts WHERE hot_tags_fts MATCH '标签1'"
+        )).fetchone()
+        await db.close()
+
+    print(f"  {name:<10} {elapsed:8.2f}s  ({count} tags, fts check {fts_rows[0]} rows)")
+    return elapsed
+
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print("=" * 60)
+    print(f"Tag database load benchmark ({count} tags)")
+    print("=" * 60)
+
+    tags = generate_tags(count)
+
+    paged = await run_case("paged", load_paged, tags)
+    bulk = await run_case("bulk", load_bulk, tags)
+
+    print("-" * 60)
+    print(f"  speedup    {paged / bulk:8.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
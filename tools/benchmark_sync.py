@@ -0,0 +1,215 @@
+"""
+Offline sync benchmark suite against the local Danbooru stand-in
+
+Cases:
+    full          Full sync (fetch → translate → upsert pipeline, relations, index build)
+    delta         Delta sync after simulated site activity
+    autocomplete  Tag search latency under concurrent load
+    gallery       posts.json page fetch latency and throughput
+
+Usage:
+    python tools/benchmark_sync.py [--cases full,delta,autocomplete,gallery] [--tags 20000]
+                                   [--rate-limit 0] [--concurrency 4] [--latency 50]
+                                   [--rate-limited 0.02] [--failures 0.01]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from danbooru_stub_server import DanbooruStubServer, add_fixture_arguments, server_from_args
+from py.shared.db.db_manager import TagDatabaseManager
+from py.shared.fetcher.tag_fetcher import DanbooruTagFetcher
+from py.shared.sync.tag_sync_manager import TagSyncManager
+
+CASES = ("full", "delta", "autocomplete", "gallery")
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a list of seconds, in milliseconds"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index] * 1000
+
+
+def print_latency(name: str, samples, elapsed: float):
+    """Print throughput and latency percentiles of one case"""
+    print(f"  {name:<14} {len(samples) / elapsed:9.1f} req/s  "
+          f"p50 {percentile(samples, 50):7.2f} ms  p95 {percentile(samples, 95):7.2f} ms  "
+          f"p99 {percentile(samples, 99):7.2f} ms  ({len(samples)} requests)")
+
+
+def print_metrics(name: str, summary):
+    """Print a SyncMetrics summary"""
+    print(f"  {name:<14} {summary['elapsed']:8.2f}s  {summary['rows']} rows "
+          f"({summary['rows_per_sec']:.0f} rows/s), {summary['requests']} requests, "
+          f"{summary['bytes_downloaded'] / 1024 / 1024:.1f} MB, {summary['rate_limited']}x 429, "
+          f"{summary['retries']} retries, DB {summary['db_write_ms_per_page']:.1f} ms/page")
+
+
+def build_manager(tmp_dir: str, base_url: str, args) -> TagSyncManager:
+    """TagSyncManager on a scratch database, fetching from the stand-in"""
+    manager = TagSyncManager(config_path=str(Path(tmp_dir) / "config.json"))
+    manager.config['tag_sync'].update({
+        'max_tags': args.tags,
+        'min_post_count': 1,
+        'api_rate_limit': args.rate_limit,
+        'fetch_concurrency': args.concurrency,
+    })
+    manager.db_manager = TagDatabaseManager(str(Path(tmp_dir) / "bench.db"))
+    manager.fetcher = DanbooruTagFetcher(rate_limit=args.rate_limit, concurrency=args.concurrency)
+    manager.fetcher.API_BASE = base_url
+    return manager
+
+
+async def bench_full(manager: TagSyncManager):
+    """Full sync as run by the background sync, without memory preload and maintenance"""
+    await manager.db_manager.initialize_database()
+    manager.begin_metrics("full")
+
+    generation, saved = await manager.stream_full_sync(lambda page, saved, total: None)
+    index_start = time.perf_counter()
+    await manager.finish_full_sync(generation)
+    index_time = time.perf_counter() - index_start
+
+    print_metrics("full sync", await manager.save_metrics("completed"))
+    print(f"  {'index build':<14} {index_time:8.2f}s  (relations, FTS optimize, derived indexes)")
+    return saved
+
+
+async def bench_delta(manager: TagSyncManager, server: DanbooruStubServer, changed: int, added: int):
+    """Delta sync after changing and adding tags on the stand-in"""
+    server.fixtures.touch_tags(changed, added)
+    manager.begin_metrics("incremental")
+    await manager._incremental_update(lambda page, saved, total: None)
+    print_metrics("delta sync", await manager.save_metrics("completed"))
+
+
+async def bench_autocomplete(db: TagDatabaseManager, names, workers: int, requests_per_worker: int):
+    """Concurrent autocomplete queries with prefixes of real tag names"""
+    rng = random.Random(7)
+    queries = [name[:rng.randint(1, min(6, len(name)))] for name in rng.sample(names, min(len(names), 2000))]
+
+    async def worker(worker_id: int, samples):
+        local_rng = random.Random(worker_id)
+        for _ in range(requests_per_worker):
+            query = local_rng.choice(queries)
+            start = time.perf_counter()
+            await db.search_tags_optimized(query, limit=10)
+            samples.append(time.perf_counter() - start)
+
+    # Warm up the reader pool and page cache
+    for query in queries[:50]:
+        await db.search_tags_optimized(query, limit=10)
+
+    samples = []
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i, samples) for i in range(workers)))
+    print_latency(f"autocomplete x{workers}", samples, time.perf_counter() - start)
+
+
+async def bench_gallery(base_url: str, names, workers: int, requests_per_worker: int):
+    """posts.json pages requested like DanbooruGalleryNode.get_posts_internal"""
+    rng = random.Random(11)
+    popular = names[:200]
+    samples = []
+    byte_count = 0
+
+    async def worker(session: aiohttp.ClientSession):
+        nonlocal byte_count
+        for _ in range(requests_per_worker):
+            tags = rng.choice(["", rng.choice(popular), f"{rng.choice(popular)} rating:general"])
+            params = {"tags": tags, "limit": 100, "page": rng.randint(1, 5)}
+            start = time.perf_counter()
+            async with session.get(f"{base_url}/posts.json", params=params) as response:
+                body = await response.read()
+            if response.status == 200:
+                json.loads(body)
+                byte_count += len(body)
+            samples.append(time.perf_counter() - start)
+
+    async with aiohttp.ClientSession() as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(workers)))
+        elapsed = time.perf_counter() - start
+
+    print_latency(f"gallery x{workers}", samples, elapsed)
+    print(f"  {'':<14} {byte_count / 1024 / 1024 / elapsed:9.1f} MB/s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Offline sync benchmark suite")
+    parser.add_argument("--cases", default=",".join(CASES), help=f"Comma separated cases ({', '.join(CASES)})")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Fetcher requests per second (0 = unlimited)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Fetcher concurrency")
+    parser.add_argument("--delta-changed", type=int, default=2000, help="Tags changed before the delta sync")
+    parser.add_argument("--delta-added", type=int, default=200, help="Tags added before the delta sync")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent autocomplete/gallery clients")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client")
+    add_fixture_arguments(parser)
+    parser.set_defaults(tags=20000)
+    args = parser.parse_args()
+
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    print("=" * 72)
+    print(f"Sync benchmark ({args.tags} tags, {args.posts} posts, latency {args.latency:.0f} ms, "
+          f"429 {args.rate_limited:.0%}, 500 {args.failures:.0%})")
+    print("=" * 72)
+
+    server = server_from_args(args)
+    base_url = await server.start()
+    names = [tag["name"] for tag in server.fixtures.tags_by_count]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = build_manager(tmp_dir, base_url, args)
+        try:
+            # Delta sync and autocomplete need a populated database
+            if "full" in cases or "delta" in cases or "autocomplete" in cases:
+                if "full" in cases:
+                    await bench_full(manager)
+                else:
+                    await manager.db_manager.initialize_database()
+                    await manager.db_manager.bulk_load_tags([{
+                        'tag': tag['name'], 'category': tag['category'],
+                        'post_count': tag['post_count'], 'translation_cn': None,
+                    } for tag in server.fixtures.tags_by_count[:args.tags]])
+                    await manager.db_manager.complete_sync_generation(time.time())
+                    await manager._refresh_search_indexes()
+
+            if "delta" in cases:
+                await bench_delta(manager, server, args.delta_changed, args.delta_added)
+
+            if "autocomplete" in cases:
+                await bench_autocomplete(manager.db_manager, names, args.workers, args.requests)
+
+            if "gallery" in cases:
+                await bench_gallery(base_url, names, args.workers, args.requests)
+        finally:
+            await manager.fetcher.close()
+            await manager.db_manager.close()
+            await server.stop()
+
+    print("-" * 72)
+    print(f"  stand-in served {server.stats['requests']} requests "
+          f"({server.stats['429']}x 429, {server.stats['500']}x 500)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
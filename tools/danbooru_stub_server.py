@@ -0,0 +1,504 @@
+"""
+Local Danbooru API stand-in for offline tests and benchmarks
+
+Serves deterministic fixtures for the endpoints the plugin uses:
+/tags.json, /posts.json, /favorites.json, /profile.json,
+/tag_aliases.json and /tag_implications.json, with the query parameters
+the fetcher and gallery send (numeric and `page=b<id>` paging,
+search[post_count], search[updated_at], search[status], search[name]).
+Latency, HTTP 429 and HTTP 500 responses can be injected.
+
+Usage:
+    python tools/danbooru_stub_server.py [--port 8765] [--tags 100000] [--posts 5000]
+                                         [--latency 50] [--rate-limited 0.05] [--failures 0.01]
+
+Then point the fetcher at it, e.g.:
+    python -m py.shared.fetcher.tag_fetcher http://127.0.0.1:8765
+"""
+import argparse
+import asyncio
+import bisect
+import fnmatch
+import random
+import string
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+# Danbooru caps limit at 1000 for every endpoint
+MAX_LIMIT = 1000
+
+RATINGS = ("g", "s", "q", "e")
+
+
+def iso_time(timestamp: float) -> str:
+    """Format a Unix timestamp the way Danbooru does"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="milliseconds")
+
+
+def parse_iso(value: str) -> float:
+    """Parse an ISO 8601 timestamp (Z or offset) to a Unix timestamp"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def parse_range(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Split a Danbooru range filter like '>=100' into ('>=', '100')"""
+    if not value:
+        return None
+    for op in (">=", "<=", ">", "<"):
+        if value.startswith(op):
+            return op, value[len(op):]
+    return "=", value
+
+
+def compare(left, op: str, right) -> bool:
+    """Apply a parse_range operator"""
+    if op == ">=":
+        return left >= right
+    if op == "<=":
+        return left <= right
+    if op == ">":
+        return left > right
+    if op == "<":
+        return left < right
+    return left == right
+
+
+@dataclass
+class FaultConfig:
+    """Injected server behaviour"""
+    latency: float = 0.0          # Seconds added to every response
+    jitter: float = 0.0           # Extra random latency, 0..jitter seconds
+    rate_limited: float = 0.0     # Probability of an HTTP 429 response
+    failures: float = 0.0         # Probability of an HTTP 500 response
+    seed: int = 42
+
+
+class DanbooruFixtures:
+    """Deterministic synthetic tags, posts, favorites and tag relations"""
+
+    def __init__(self, tag_count: int = 100000, post_count: int = 5000,
+                 relation_count: int = 2000, seed: int = 42,
+                 base_time: Optional[float] = None):
+        """
+        Generate fixtures
+
+        Args:
+            tag_count: Number of tags
+            post_count: Number of posts
+            relation_count: Number of aliases and of implications
+            seed: Random seed, the same seed always gives the same data
+            base_time: Newest updated_at of the generated records (default: one day ago)
+        """
+        self.rng = random.Random(seed)
+        self.base_time = base_time if base_time is not None else time.time() - 86400
+
+        self.tags: List[Dict] = self._generate_tags(tag_count)
+        self.tags_by_name = {tag["name"]: tag for tag in self.tags}
+        self._next_tag_id = len(self.tags) + 1
+        self._sort_tags()
+
+        self.posts: List[Dict] = self._generate_posts(post_count)
+        self.aliases: List[Dict] = self._generate_relations(relation_count)
+        self.implications: List[Dict] = self._generate_relations(relation_count)
+        self.favorites: Dict[int, Dict] = {}
+        self._next_favorite_id = 1
+
+    def _random_name(self) -> str:
+        alphabet = string.ascii_lowercase + "_"
+        return "".join(self.rng.choice(alphabet) for _ in range(self.rng.randint(3, 20)))
+
+    def _generate_tags(self, count: int) -> List[Dict]:
+        tags = {}
+        while len(tags) < count:
+            name = self._random_name()
+            if name in tags:
+                continue
+            # Roughly Zipf-shaped counts, like the real tag distribution
+            rank = len(tags) + 1
+            updated_at = self.base_time - self.rng.uniform(0, 365 * 86400)
+            tags[name] = {
+                "id": rank,
+                "name": name,
+                "post_count": max(1, int(5_000_000 / rank ** 0.9) + self.rng.randint(0, 50)),
+                "category": self.rng.choice((0, 0, 0, 1, 3, 4, 5)),
+                "is_deprecated": False,
+                "created_at": iso_time(updated_at - self.rng.uniform(0, 365 * 86400)),
+                "updated_at": iso_time(updated_at),
+                "_updated": updated_at,
+            }
+        return list(tags.values())
+
+    def _sort_tags(self):
+        """Rebuild the orderings used by /tags.json"""
+        # order=count: post_count desc, ties by id desc
+        self.tags_by_count = sorted(self.tags, key=lambda t: (-t["post_count"], -t["id"]))
+        self._count_keys = [-t["post_count"] for t in self.tags_by_count]
+        # Default order and b<id> paging: id desc
+        self.tags_by_id = sorted(self.tags, key=lambda t: -t["id"])
+
+    def _generate_posts(self, count: int) -> List[Dict]:
+        # Posts mostly use popular tags
+        popular = [t for t in self.tags_by_count[:2000]]
+        posts = []
+        for post_id in range(count, 0, -1):
+            picked = {self.rng.choice(popular)["name"] for _ in range(self.rng.randint(5, 30))}
+            by_category = {0: [], 1: [], 3: [], 4: [], 5: []}
+            for name in sorted(picked):
+                by_category[self.tags_by_name[name]["category"]].append(name)
+            md5 = "%032x" % self.rng.getrandbits(128)
+            width, height = self.rng.choice(((832, 1216), (1024, 1024), (1216, 832), (2048, 1536)))
+            created = self.base_time - (count - post_id) * 600
+            posts.append({
+                "id": post_id,
+                "created_at": iso_time(created),
+                "updated_at": iso_time(created),
+                "rating": self.rng.choice(RATINGS),
+                "score": self.rng.randint(0, 500),
+                "fav_count": self.rng.randint(0, 1000),
+                "md5": md5,
+                "file_ext": "jpg",
+                "image_width": width,
+                "image_height": height,
+                "tag_string": " ".join(sorted(picked)),
+                "tag_string_general": " ".join(by_category[0]),
+                "tag_string_artist": " ".join(by_category[1]),
+                "tag_string_copyright": " ".join(by_category[3]),
+                "tag_string_character": " ".join(by_category[4]),
+                "tag_string_meta": " ".join(by_category[5]),
+                "file_url": f"https://cdn.donmai.us/original/{md5[:2]}/{md5[2:4]}/{md5}.jpg",
+                "large_file_url": f"https://cdn.donmai.us/sample/{md5[:2]}/{md5[2:4]}/sample-{md5}.jpg",
+                "preview_file_url": f"https://cdn.donmai.us/180x180/{md5[:2]}/{md5[2:4]}/{md5}.jpg",
+            })
+        return posts
+
+    def _generate_relations(self, count: int) -> List[Dict]:
+        targets = self.tags_by_count[:max(1, min(len(self.tags), count * 2))]
+        records = []
+        seen = set()
+        for relation_id in range(count, 0, -1):
+            antecedent = self._random_name()
+            if antecedent in seen or antecedent in self.tags_by_name:
+                continue
+            seen.add(antecedent)
+            updated_at = self.base_time - self.rng.uniform(0, 365 * 86400)
+            records.append({
+                "id": relation_id,
+                "antecedent_name": antecedent,
+                "consequent_name": self.rng.choice(targets)["name"],
+                "status": "active" if self.rng.random() < 0.9 else "deleted",
+                "created_at": iso_time(updated_at),
+                "updated_at": iso_time(updated_at),
+                "_updated": updated_at,
+            })
+        return records
+
+    def touch_tags(self, changed: int, added: int = 0, now: Optional[float] = None) -> float:
+        """
+        Simulate activity on the site for delta sync benchmarks
+
+        Args:
+            changed: Existing tags whose post_count changes
+            added: New tags created
+            now: updated_at of the changed records (default: current time)
+
+        Returns:
+            The updated_at timestamp used
+        """
+        now = now if now is not None else time.time()
+        for tag in self.rng.sample(self.tags, min(changed, len(self.tags))):
+            tag["post_count"] += self.rng.randint(1, 100)
+            tag["updated_at"] = iso_time(now)
+            tag["_updated"] = now
+
+        for _ in range(added):
+            name = self._random_name()
+            if name in self.tags_by_name:
+                continue
+            tag = {
+                "id": self._next_tag_id,
+                "name": name,
+                "post_count": self.rng.randint(100, 5000),
+                "category": self.rng.choice((0, 1, 3, 4, 5)),
+                "is_deprecated": False,
+                "created_at": iso_time(now),
+                "updated_at": iso_time(now),
+                "_updated": now,
+            }
+            self._next_tag_id += 1
+            self.tags.append(tag)
+            self.tags_by_name[name] = tag
+
+        self._sort_tags()
+        return now
+
+    # ---- queries ----
+
+    @staticmethod
+    def _public(record: Dict) -> Dict:
+        return {key: value for key, value in record.items() if not key.startswith("_")}
+
+    @staticmethod
+    def _page(records: List[Dict], page: str, limit: int) -> List[Dict]:
+        """Apply numeric or b<id>/a<id> paging to id-desc or otherwise ordered records"""
+        if page.startswith("b"):
+            before = int(page[1:])
+            return [r for r in records if r["id"] < before][:limit]
+        if page.startswith("a"):
+            after = int(page[1:])
+            return sorted((r for r in records if r["id"] > after), key=lambda r: r["id"])[:limit]
+        offset = (max(int(page or 1), 1) - 1) * limit
+        return records[offset:offset + limit]
+
+    def query_tags(self, params) -> List[Dict]:
+        """/tags.json"""
+        limit = min(int(params.get("limit", 20)), MAX_LIMIT)
+        page = params.get("page", "1")
+
+        name = params.get("search[name]")
+        if name:
+            tag = self.tags_by_name.get(name.lower())
+            return [self._public(tag)] if tag else []
+
+        count_filter = parse_range(params.get("search[post_count]"))
+        updated_filter = parse_range(params.get("search[updated_at]"))
+        name_matches = params.get("search[name_matches]")
+
+        if params.get("search[order]") == "count" and not updated_filter and not name_matches and not page.startswith(("a", "b")):
+            # Fast path for the full sync crawl: slice the count ordering
+            records = self.tags_by_count
+            if count_filter and count_filter[0] == ">=":
+                records = records[:bisect.bisect_right(self._count_keys, -int(count_filter[1]))]
+            return [self._public(t) for t in self._page(records, page, limit)]
+
+        records = self.tags_by_count if params.get("search[order]") == "count" else self.tags_by_id
+        if count_filter:
+            op, value = count_filter
+            records = [t for t in records if compare(t["post_count"], op, int(value))]
+        if updated_filter:
+            op, value = updated_filter
+            since = parse_iso(value)
+            records = [t for t in records if compare(t["_updated"], op, since)]
+        if name_matches:
+            pattern = name_matches.lower()
+            records = [t for t in records if fnmatch.fnmatchcase(t["name"], pattern)]
+        if params.get("search[hide_empty]") == "true":
+            records = [t for t in records if t["post_count"] > 0]
+
+        return [self._public(t) for t in self._page(records, page, limit)]
+
+    def query_relations(self, records: List[Dict], params) -> List[Dict]:
+        """/tag_aliases.json and /tag_implications.json"""
+        limit = min(int(params.get("limit", 20)), MAX_LIMIT)
+        status = params.get("search[status]")
+        if status:
+            records = [r for r in records if r["status"] == status.lower()]
+        updated_filter = parse_range(params.get("search[updated_at]"))
+        if updated_filter:
+            op, value = updated_filter
+            since = parse_iso(value)
+            records = [r for r in records if compare(r["_updated"], op, since)]
+        return [self._public(r) for r in self._page(records, params.get("page", "1"), limit)]
+
+    def query_posts(self, params) -> List[Dict]:
+        """/posts.json with plain tags and rating:/date: metatags"""
+        limit = min(int(params.get("limit", 20)), 200)
+        required = []
+        rating = None
+        for term in params.get("tags", "").split():
+            if term.startswith("rating:"):
+                rating = term[len("rating:"):][:1].lower()
+            elif ":" in term:
+                # Other metatags (date:, order:, ...) are accepted but not applied
+                continue
+            else:
+                required.append(term.lower())
+
+        records = self.posts
+        if rating:
+            records = [p for p in records if p["rating"] == rating]
+        for tag in required:
+            records = [p for p in records if f" {tag} " in f" {p['tag_string']} "]
+        return self._page(records, params.get("page", "1"), limit)
+
+    def add_favorite(self, post_id: int) -> Dict:
+        for favorite in self.favorites.values():
+            if favorite["post_id"] == post_id:
+                return favorite
+        favorite = {
+            "id": self._next_favorite_id,
+            "user_id": 1,
+            "post_id": post_id,
+            "created_at": iso_time(time.time()),
+        }
+        self.favorites[favorite["id"]] = favorite
+        self._next_favorite_id += 1
+        return favorite
+
+    def remove_favorite(self, post_id: int) -> bool:
+        for favorite_id, favorite in list(self.favorites.items()):
+            if favorite["post_id"] == post_id:
+                del self.favorites[favorite_id]
+                return True
+        return False
+
+
+class DanbooruStubServer:
+    """aiohttp application serving DanbooruFixtures"""
+
+    def __init__(self, fixtures: DanbooruFixtures, faults: Optional[FaultConfig] = None):
+        self.fixtures = fixtures
+        self.faults = faults or FaultConfig()
+        self._fault_rng = random.Random(self.faults.seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url: Optional[str] = None
+
+        # Request counters by status code
+        self.stats: Dict[str, int] = {"requests": 0, "429": 0, "500": 0}
+
+        self.app = web.Application(middlewares=[self._fault_middleware])
+        self.app.router.add_get("/tags.json", self.handle_tags)
+        self.app.router.add_get("/posts.json", self.handle_posts)
+        self.app.router.add_get("/favorites.json", self.handle_favorites)
+        self.app.router.add_post("/favorites.json", self.handle_add_favorite)
+        self.app.router.add_delete("/favorites/{post_id}.json", self.handle_remove_favorite)
+        self.app.router.add_get("/profile.json", self.handle_profile)
+        self.app.router.add_get("/tag_aliases.json", self.handle_aliases)
+        self.app.router.add_get("/tag_implications.json", self.handle_implications)
+
+    @web.middleware
+    async def _fault_middleware(self, request, handler):
+        self.stats["requests"] += 1
+        delay = self.faults.latency
+        if self.faults.jitter:
+            delay += self._fault_rng.uniform(0, self.faults.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        roll = self._fault_rng.random()
+        if roll < self.faults.rate_limited:
+            self.stats["429"] += 1
+            return web.json_response({"success": False, "message": "Rate limited"}, status=429)
+        if roll < self.faults.rate_limited + self.faults.failures:
+            self.stats["500"] += 1
+            return web.json_response({"success": False, "message": "Injected failure"}, status=500)
+        return await handler(request)
+
+    async def handle_tags(self, request):
+        return web.json_response(self.fixtures.query_tags(request.query))
+
+    async def handle_posts(self, request):
+        return web.json_response(self.fixtures.query_posts(request.query))
+
+    async def handle_favorites(self, request):
+        favorites = sorted(self.fixtures.favorites.values(), key=lambda f: -f["id"])
+        limit = min(int(request.query.get("limit", 20)), MAX_LIMIT)
+        return web.json_response(favorites[:limit])
+
+    async def handle_add_favorite(self, request):
+        post_id = request.query.get("post_id")
+        if post_id is None and request.can_read_body:
+            data = await request.post()
+            post_id = data.get("post_id")
+        if not post_id:
+            return web.json_response({"success": False, "message": "post_id required"}, status=422)
+        return web.json_response(self.fixtures.add_favorite(int(post_id)), status=201)
+
+    async def handle_remove_favorite(self, request):
+        if self.fixtures.remove_favorite(int(request.match_info["post_id"])):
+            return web.Response(status=204)
+        return web.json_response({"success": False, "message": "Not found"}, status=404)
+
+    async def handle_profile(self, request):
+        if request.headers.get("Authorization") is None:
+            return web.json_response({"success": False, "message": "Unauthorized"}, status=401)
+        return web.json_response({"id": 1, "name": "stub_user", "level": 20})
+
+    async def handle_aliases(self, request):
+        return web.json_response(self.fixtures.query_relations(self.fixtures.aliases, request.query))
+
+    async def handle_implications(self, request):
+        return web.json_response(self.fixtures.query_relations(self.fixtures.implications, request.query))
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Start serving in the running event loop
+
+        Args:
+            host: Bind address
+            port: Port, 0 picks a free one
+
+        Returns:
+            Base URL to use as the API base
+        """
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self):
+        """Stop serving"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def add_fixture_arguments(parser: argparse.ArgumentParser):
+    """Command line options shared with the benchmark suite"""
+    parser.add_argument("--tags", type=int, default=100000, help="Number of fixture tags")
+    parser.add_argument("--posts", type=int, default=5000, help="Number of fixture posts")
+    parser.add_argument("--relations", type=int, default=2000, help="Number of aliases and of implications")
+    parser.add_argument("--seed", type=int, default=42, help="Fixture and fault seed")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per response (ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency per response (ms)")
+    parser.add_argument("--rate-limited", type=float, default=0.0, help="Probability of an HTTP 429 response")
+    parser.add_argument("--failures", type=float, default=0.0, help="Probability of an HTTP 500 response")
+
+
+def server_from_args(args) -> DanbooruStubServer:
+    """Build fixtures and server from add_fixture_arguments options"""
+    fixtures = DanbooruFixtures(args.tags, args.posts, args.relations, seed=args.seed)
+    faults = FaultConfig(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        rate_limited=args.rate_limited,
+        failures=args.failures,
+        seed=args.seed,
+    )
+    return DanbooruStubServer(fixtures, faults)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Local Danbooru API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_fixture_arguments(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    server = server_from_args(args)
+    print(f"Generated {len(server.fixtures.tags)} tags, {len(server.fixtures.posts)} posts, "
+          f"{len(server.fixtures.aliases)} aliases, {len(server.fixtures.implications)} implications "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    base_url = await server.start(args.host, args.port)
+    print(f"Serving Danbooru stand-in at {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,55 @@
+"""
+Export / import the tag database as a compressed dump file
+
+Usage:
+    python tools/tag_dump.py export [dump_path] [--db DB_PATH]
+    python tools/tag_dump.py import [dump_path] [--db DB_PATH]
+
+dump_path defaults to py/shared/data/tags_dump.jsonl.gz. A dump placed there is
+imported automatically on first startup instead of crawling Danbooru.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from py.shared.db.db_manager import TagDatabaseManager
+from py.shared.sync.tag_sync_manager import get_sync_manager
+
+
+def print_progress(saved: int, total: int):
+    """Print bulk-load progress on one line"""
+    print(f"\r  saved {saved}/{total}", end="", flush=True)
+    if saved >= total:
+        print()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Export/import the tag database dump")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("dump_path", nargs="?", default=None,
+                        help="Dump file (default: py/shared/data/tags_dump.jsonl.gz)")
+    parser.add_argument("--db", default=None, help="Database path (default: py/shared/data/tags_cache.db)")
+    args = parser.parse_args()
+
+    manager = get_sync_manager()
+    if args.db:
+        manager.db_manager = TagDatabaseManager(args.db)
+
+    try:
+        if args.action == "export":
+            result = await manager.export_dump(args.dump_path)
+            print(f"Exported {result['tag_count']} tags to {result['path']} "
+                  f"({result['size_bytes'] / 1024 / 1024:.1f} MB, {result['elapsed']:.1f}s)")
+        else:
+            result = await manager.import_dump(args.dump_path, progress_callback=print_progress)
+            print(f"Imported {result['tag_count']} tags from {result['path']} ({result['elapsed']:.1f}s)")
+    finally:
+        await manager.db_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())